@@ -19,6 +19,7 @@ version_text = '.'.join(map(str, bl_info["version"]))
 #for hot reload of the addon from within Blender
 if "bpy" in locals():
     print("Reloading ESEC Addons - " + version_text)
+    logger = reload(logger)
     properties = reload(properties)
     preferences = reload(preferences)
     ui = reload(ui)
@@ -27,6 +28,7 @@ if "bpy" in locals():
     esec_sensor_plan_pro = reload(esec_sensor_plan_pro)
 else:
     print("Loading ESEC Addons - " + version_text)
+    from . import logger
     from . import properties
     from . import preferences
     from . import ui    
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from .archilogic_client import ArchilogicError
+
+# On-disk cache of the Archilogic floor and space responses.
+# Every response is stored as its own JSON file, keyed by floor id and space id:
+#   <directory>/<floor>/floor.json
+#   <directory>/<floor>/spaces/<space>.json
+# next to the parsed data the file keeps the time it was fetched and the revision of the
+# response (ETag, Last-Modified). Entries younger than the TTL are used without a request,
+# older ones are revalidated with a conditional request, so an unchanged space costs a
+# 304 instead of its geo-json. Without a client (offline) only the cache is read.
+
+FLOOR_FILE = "floor.json"
+SPACES_DIRECTORY = "spaces"
+
+
+def safe_name(key):
+    """A file name for an id, ids with other characters than [A-Za-z0-9_-] are hashed."""
+    if key and all(char.isalnum() or char in "-_" for char in key):
+        return key
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class ArchilogicCache:
+    """Floors and spaces on disk, ttl in seconds.
+
+        cache = ArchilogicCache(directory, ttl)
+        with ArchilogicClient(token) as client:
+            floor, spaces = cache.get_floor_spaces(floor_id, client)
+        floor, spaces = cache.get_floor_spaces(floor_id)  # offline
+    """
+
+    def __init__(self, directory, ttl):
+        self.directory = directory
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def get_path(self, floor_id, space_id=None):
+        floor_directory = os.path.join(self.directory, safe_name(floor_id))
+        if space_id is None:
+            return os.path.join(floor_directory, FLOOR_FILE)
+        return os.path.join(floor_directory, SPACES_DIRECTORY, safe_name(space_id) + ".json")
+
+    def read(self, floor_id, space_id=None):
+        """The cache entry {"fetched", "revision", "data"}, None if missing or unreadable."""
+        try:
+            with open(self.get_path(floor_id, space_id), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def write(self, floor_id, space_id, data, revision):
+        path = self.get_path(floor_id, space_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write next to the entry and swap, a crash never leaves half an entry behind
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({"fetched": time.time(), "revision": revision or {}, "data": data}, file, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    def is_fresh(self, entry):
+        return time.time() - entry.get("fetched", 0) < self.ttl
+
+    def invalidate(self, floor_id=None):
+        """Delete the cached floor with its spaces, or the whole cache without floor_id."""
+        path = os.path.join(self.directory, safe_name(floor_id)) if floor_id else self.directory
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def get(self, floor_id, space_id, fetch):
+        """Data of the floor (space_id None) or space, fetch(id, revision) is None when offline."""
+        entry = self.read(floor_id, space_id)
+        if entry and (fetch is None or self.is_fresh(entry)):
+            self._count("cached")
+            return entry["data"]
+        if fetch is None:
+            what = f"Space {space_id}" if space_id else f"Floor {floor_id}"
+            raise ArchilogicError(f"{what} is not in the cache, get the floor data online first")
+
+        data, revision = fetch(space_id or floor_id, entry["revision"] if entry else None)
+        if data is None:
+            # 304, the cached data is still current
+            self._count("revalidated")
+            data = entry["data"]
+        else:
+            self._count("downloaded")
+        self.write(floor_id, space_id, data, revision)
+        return data
+
+    def get_floor(self, floor_id, client=None):
+        """The floor, from the cache only without client. Starts new stats."""
+        self.stats = {}
+        return self.get(floor_id, None, client.fetch_floor if client else None)
+
+    def iter_spaces(self, floor_id, space_ids, client=None):
+        """Yield the spaces in the order of space_ids while they are downloaded, from the cache only without client."""
+        if client:
+            return client.iter_map(lambda space_id: self.get(floor_id, space_id, client.fetch_space), space_ids)
+        return (self.get(floor_id, space_id, None) for space_id in space_ids)
+
+    def get_floor_spaces(self, floor_id, client=None):
+        """The floor and its spaces in resourceRelations.spaces order, from the cache only without client."""
+        floor = self.get_floor(floor_id, client)
+        return floor, list(self.iter_spaces(floor_id, floor["resourceRelations"]["spaces"], client))
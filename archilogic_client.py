@@ -0,0 +1,217 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+
+# HTTP client of the Archilogic API.
+# All requests of a floor share one requests.Session, so the connections are pooled and
+# reused instead of a new TLS handshake per space. The space geo-json is fetched by a
+# bounded thread pool, every request has a timeout, failures which may go away (connection
+# errors, timeouts, 429 and 5xx) are retried with exponential back-off, and a token bucket
+# limits the request rate of all threads together.
+# The module doesn't depend on bpy, tools/archilogic_stub.py runs it against a local stub
+# server. requests is imported when the first client is created.
+
+DEFAULT_BASE_URL = "https://api.archilogic.com/v2"
+DEFAULT_MAX_WORKERS = 8
+# (connect, read) timeout in seconds
+DEFAULT_TIMEOUT = (5, 30)
+DEFAULT_RETRIES = 4
+# seconds before the first retry, doubled for every further retry
+DEFAULT_BACKOFF = 0.5
+# requests per second, 0 for no limit
+DEFAULT_RATE_LIMIT = 10.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+SPACE_PARAMS = {
+    "includeCustomFields": "true",
+    "includeCustomAttributes": "true"
+}
+
+log = logging.getLogger("esec.archilogic")
+
+
+class ArchilogicError(Exception):
+    pass
+
+
+class TokenBucket:
+    """Thread-safe token bucket, acquire() blocks until a token is free.
+
+    Tokens refill at rate per second up to capacity, so short bursts of capacity
+    requests are allowed and the mean rate stays at rate.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def parse_retry_after(value):
+    """Seconds of a Retry-After header (seconds or HTTP date), None if missing or invalid."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class ArchilogicClient:
+    """Fetch floors and spaces from the Archilogic API.
+
+        with ArchilogicClient(token) as client:
+            floor, spaces = client.get_floor_spaces(floor_id)
+    """
+
+    def __init__(self, token, base_url=DEFAULT_BASE_URL, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, rate_limit=DEFAULT_RATE_LIMIT):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max(int(max_workers), 1)
+        self.timeout = timeout
+        self.retries = max(int(retries), 0)
+        self.backoff = backoff
+        self.bucket = TokenBucket(rate_limit)
+
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"AL-Secret-Token {token}"
+        # one pooled connection per worker thread
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        self.session.close()
+
+    def request(self, path, params=None, revision=None):
+        """GET base_url/path, retry transient failures and return (parsed JSON, revision).
+
+        revision is {"etag": ..., "last_modified": ...} of the response. Given the revision of
+        an earlier response the request is conditional, the JSON is None if the server
+        answers 304 Not Modified.
+        """
+        import requests
+
+        url = f"{self.base_url}/{path}"
+        headers = {}
+        if revision and revision.get("etag"):
+            headers["If-None-Match"] = revision["etag"]
+        if revision and revision.get("last_modified"):
+            headers["If-Modified-Since"] = revision["last_modified"]
+        failure = None
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            retry_after = None
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as error:
+                failure = f"{type(error).__name__}: {error}"
+            except requests.RequestException as error:
+                # not transient, e.g. an invalid base URL
+                raise ArchilogicError(f"GET {url} failed ({type(error).__name__}: {error})") from error
+            else:
+                if response.status_code == 304 and headers:
+                    return None, revision
+                if response.status_code == 200:
+                    try:
+                        data = response.json()
+                    except ValueError as error:
+                        raise ArchilogicError(f"GET {url} returned no valid JSON ({error})") from error
+                    return data, {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    }
+                if response.status_code not in RETRY_STATUS:
+                    raise ArchilogicError(f"GET {url} failed with status {response.status_code}")
+                failure = f"status {response.status_code}"
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+            if attempt < self.retries:
+                # exponential back-off with jitter, so the workers don't retry in lockstep
+                delay = retry_after if retry_after is not None else self.backoff * 2 ** attempt * random.uniform(0.5, 1.0)
+                log.debug(f"GET {url} failed ({failure}), retry {attempt + 1}/{self.retries} in {delay:.2f}s")
+                time.sleep(delay)
+        raise ArchilogicError(f"GET {url} failed after {self.retries + 1} attempts ({failure})")
+
+    def get_json(self, path, params=None):
+        return self.request(path, params)[0]
+
+    def fetch_floor(self, floor_id, revision=None):
+        return self.request(f"floor/{floor_id}", revision=revision)
+
+    def fetch_space(self, space_id, revision=None):
+        return self.request(f"space/{space_id}/geo-json", SPACE_PARAMS, revision)
+
+    def get_floor(self, floor_id):
+        return self.fetch_floor(floor_id)[0]
+
+    def get_space_geojson(self, space_id):
+        return self.fetch_space(space_id)[0]
+
+    def iter_map(self, function, items):
+        """Yield function(item) for every item, computed on the worker threads, in the order of items.
+
+        Every result is yielded as soon as it and the ones before it are done, so the caller
+        can process the first results while the rest is still downloading. The first
+        exception is raised, closing the generator or an exception cancels the calls not
+        started yet.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="archilogic")
+        try:
+            futures = [executor.submit(function, item) for item in items]
+            for future in futures:
+                yield future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def map(self, function, items):
+        """[function(item) for item in items] on the worker threads, see iter_map()."""
+        return list(self.iter_map(function, items))
+
+    def get_spaces(self, space_ids):
+        """geo-json of the spaces, in the order of space_ids.
+
+        The first failed space raises ArchilogicError, the requests not started yet are cancelled.
+        """
+        return self.map(self.get_space_geojson, space_ids)
+
+    def get_floor_spaces(self, floor_id):
+        """The floor and the geo-json of its spaces in resourceRelations.spaces order."""
+        floor = self.get_floor(floor_id)
+        space_ids = floor["resourceRelations"]["spaces"]
+        start = time.perf_counter()
+        spaces = self.get_spaces(space_ids)
+        log.info(f"Fetched {len(spaces)} spaces of floor {floor_id} in {time.perf_counter() - start:.2f}s")
+        return floor, spaces
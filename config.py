@@ -6,4 +6,12 @@ ICONS_DIRECTORY = 'icons'
 MODELS_LOW_DIRECTORY = 'models_low'
 MODELS_HIGH_DIRECTORY = 'models_high'
 HDRI_DIRECTORY = 'hdri'
+PROTOTYPE_COLLECTION_PREFIX = 'ESEC_Prototype_'
+LIBRARY_COLLECTION_NAME = 'ESEC_Library'
+MODEL_CACHE_MAX_ENTRIES = 16
+ASSET_LIBRARY_DIRECTORY = 'library'
+ASSET_LIBRARY_FILE = 'furniture_library.blend'
+ASSET_LIBRARY_MANIFEST = 'manifest.json'
+# libraries of an older version are ignored, version 2 has the import rotation applied to the meshes
+ASSET_LIBRARY_VERSION = 2
 PIP_PACKAGES = []
@@ -0,0 +1,141 @@
+import bpy
+import re
+from typing import NamedTuple, Optional
+
+
+class DxfRule(NamedTuple):
+    key: str
+    needles: tuple
+    model_name: Optional[str] = None
+    collection_name: Optional[str] = None
+    ignore_keyword: Optional[str] = None
+    case_sensitive: bool = False
+
+
+# 3D models placed by create3D_Objects(), keyed by model name
+FURNITURE_RULES = [
+    DxfRule('office_chair', ('TaskChair', 'ConferenceChair', 'Genericofficechair'), 'office_chair', 'Office_chairs'),
+    DxfRule('dining_chair', ('DiningChair', 'GenericChair'), 'dining_chair', 'Dining_chairs'),
+    DxfRule('arm_chair', ('LoungeChair', 'Armchair'), 'arm_chair', 'Arm_chairs', ignore_keyword='Outdoor'),
+    DxfRule('bar_stool', ('BarStool',), 'bar_stool', 'Bar_Stools'),
+    DxfRule('printer', ('Printer',), 'printer', 'printer'),
+    DxfRule('couch_76x76x45_round', ('Sofa',), 'couch_76x76x45_round', 'Sofas', ignore_keyword='Corner'),
+    DxfRule('couch_76x76x45_round_corner', ('CornerSofa',), 'couch_76x76x45_round_corner', 'Sofas'),
+    DxfRule('outdoor_bench', ('OutdoorBench',), 'outdoor_bench', 'outdoor_bench'),
+    DxfRule('outdoor_chair', ('OutdoorChair', 'OutdoorArmchair'), 'outdoor_chair', 'outdoor_chair'),
+    DxfRule('sink', ('Sink',), 'sink', 'Bathroom'),
+    DxfRule('toilet', ('Toilet',), 'toilet', 'Bathroom'),
+    DxfRule('urinal', ('Urinal',), 'urinal', 'Bathroom'),
+    DxfRule('pouf', ('BumperSmallOttoman',), 'pouf', 'Sofas'),
+]
+
+# table tops, matched case-insensitive like create_tabletops_from_dxf_collection() always did
+TABLE_RULES = [
+    DxfRule('desk', ('desk',), collection_name='tables'),
+    DxfRule('table', ('table',), collection_name='tables'),
+]
+
+# boxes (storage, sideboards, ...), matched case-sensitive and written to a collection named like the needle
+BOX_RULES = [
+    DxfRule(needle, (needle,), collection_name=needle, case_sensitive=True)
+    for needle in ('Storage', 'Sideboard', 'Genericsideboard', 'RollingContainer', 'Locker')
+]
+
+# simple stools of create_stools_from_dxf_collection()
+STOOL_RULES = [
+    DxfRule('stool', ('chair', 'Chair'), collection_name='chairs', case_sensitive=True),
+]
+
+DEFAULT_RULES = FURNITURE_RULES + TABLE_RULES + BOX_RULES + STOOL_RULES
+
+
+class KeywordMatcher:
+    """Precompiled multi-keyword matcher.
+
+    Finds every keyword contained in a string with a single regex scan instead of
+    one substring test per keyword. Matching is case-insensitive.
+    """
+
+    def __init__(self, keywords):
+        # longest first, so the alternation prefers 'cornersofa' over 'sofa' at the same position
+        self.keywords = sorted({keyword.lower() for keyword in keywords}, key=len, reverse=True)
+        pattern = "|".join(re.escape(keyword) for keyword in self.keywords)
+        # the lookahead makes the matches overlap, 'cornersofa' also reports 'sofa'
+        self._regex = re.compile(f"(?=({pattern}))") if self.keywords else None
+        # keywords that start at the same position as a longer one are hidden by the alternation
+        self._prefixes = {
+            keyword: [other for other in self.keywords if other != keyword and keyword.startswith(other)]
+            for keyword in self.keywords
+        }
+
+    def find_all(self, text):
+        """Return the set of (lower-case) keywords contained in text."""
+        found = set()
+        if self._regex is None:
+            return found
+        for match in self._regex.finditer(text.lower()):
+            keyword = match.group(1)
+            found.add(keyword)
+            found.update(self._prefixes[keyword])
+        return found
+
+    def search(self, text):
+        """Return True if any keyword is contained in text."""
+        return self._regex is not None and self._regex.search(text.lower()) is not None
+
+
+class DxfIndex:
+    """Classification of the objects of the 'dxf' collection, built in one pass.
+
+    Every object name is lower-cased and scanned once. The result maps each rule key
+    to the list of objects it applies to (its bucket) and each object name to the
+    rules it matched.
+    """
+
+    def __init__(self, objects, rules=None):
+        self.rules = {rule.key: rule for rule in (rules or DEFAULT_RULES)}
+        self.buckets = {key: [] for key in self.rules}
+        self.by_object = {}
+
+        rules_by_needle = {}
+        for rule in self.rules.values():
+            for needle in rule.needles:
+                rules_by_needle.setdefault(needle.lower(), []).append((rule, needle))
+
+        self.matcher = KeywordMatcher(rules_by_needle)
+
+        for obj in objects:
+            name = obj.name
+            name_lower = name.lower()
+            matched = []
+            for keyword in self.matcher.find_all(name_lower):
+                for rule, needle in rules_by_needle[keyword]:
+                    if rule.case_sensitive and needle not in name:
+                        continue
+                    if rule.ignore_keyword and rule.ignore_keyword.lower() in name_lower:
+                        continue
+                    if rule.key not in matched:
+                        matched.append(rule.key)
+            for key in matched:
+                self.buckets[key].append(obj)
+            if matched:
+                self.by_object[name] = matched
+
+    def bucket(self, key):
+        """Return the objects classified under the rule key, in collection order."""
+        return self.buckets.get(key, [])
+
+    def rule(self, key):
+        return self.rules.get(key)
+
+    def categories_of(self, obj):
+        """Return the rules matched by a DXF object."""
+        return [self.rules[key] for key in self.by_object.get(obj.name, [])]
+
+
+def build_dxf_index(collection_name="dxf", rules=None):
+    """Build the classification index for the given collection, or None if it doesn't exist."""
+    collection = bpy.data.collections.get(collection_name)
+    if not collection:
+        return None
+    return DxfIndex(collection.objects, rules)
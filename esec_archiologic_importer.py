@@ -11,59 +11,114 @@ bl_info = {
 }
 
 import bpy
-import requests
 import os
 import json
-import math
-from statistics import mean
+import time
+from .archilogic_client import ArchilogicClient, ArchilogicError
+from .archilogic_cache import ArchilogicCache
+from .geo_projection import GeoProjector
+from .floor_mesh import FloorMeshBuilder, is_floor_mesh, split_floor_mesh
+from .instanced_labels import create_labels
+from .logger import log
 
-global spaces_json_data
+CACHE_DIRECTORY = "esec_archilogic"
 
-def get_floor_data(floor_id):
+# parsed geo-json of the spaces of the last floor fetched in this session
+floor_spaces = None
 
+def get_client():
+    """Archilogic client with the token and connection settings of the addon preferences."""
     preferences = bpy.context.preferences.addons[__package__].preferences
-    token = preferences.archiologic_token
-    
-    global spaces_json_data
-    headers = {
-        "Authorization": f"AL-Secret-Token {token}"
-    }
-
-    response = requests.get(f"https://api.archilogic.com/v2/floor/{floor_id}", headers=headers)
-
-    if response.status_code == 200:
-        data = response.json()
-        space_ids = data["resourceRelations"]["spaces"]
-        spaces_data = []
-
-        for space_id in space_ids:
-            params = {
-                "includeCustomFields": "true",
-                "includeCustomAttributes": "true"
-            }
-
-            response = requests.get(f"https://api.archilogic.com/v2/space/{space_id}/geo-json", headers=headers, params=params)
-
-            if response.status_code == 200:
-                space_data = response.json()
-                spaces_data.append(space_data)
-            else:
-                print(f"Failed to get data for space {space_id}")
-                return None
-
-        spaces_json = json.dumps(spaces_data, indent=4)
-        print(spaces_json)
-        spaces_json_data = spaces_json  # Save the data to the global variable
-        return spaces_json
-
-    else:
-        print("Failed to get floor data")
+    return ArchilogicClient(
+        preferences.archiologic_token,
+        base_url=preferences.archilogic_base_url,
+        max_workers=preferences.archilogic_workers,
+        rate_limit=preferences.archilogic_rate_limit,
+    )
+
+def get_cache():
+    """The on-disk cache of the floor data in Blender's user datafiles directory."""
+    preferences = bpy.context.preferences.addons[__package__].preferences
+    # not the session temp directory, the cache has to outlive Blender for offline work
+    directory = bpy.utils.user_resource('DATAFILES', path=CACHE_DIRECTORY, create=True)
+    return ArchilogicCache(directory, preferences.archilogic_cache_ttl * 3600)
+
+def iter_floor_spaces(floor_id, offline=False, json_path=""):
+    """Yield the parsed geo-json of the spaces of the floor while they are downloaded.
+
+    The spaces come from the on-disk cache, only offline without any request. With json_path
+    they are also written to that file as one compact geo-json FeatureCollection, the file is
+    only replaced once all spaces arrived.
+    Raises ArchilogicError if the floor or a space can't be fetched.
+    """
+    start = time.perf_counter()
+    cache = get_cache()
+    client = None if offline else get_client()
+    json_file = None
+    count = 0
+    try:
+        floor = cache.get_floor(floor_id, client)
+        if json_path:
+            # written next to the file and swapped in once complete, a failed download keeps the old file
+            json_path = bpy.path.abspath(json_path)
+            json_file = open(json_path + ".tmp", "w", encoding="utf-8")
+            json_file.write('{"type":"FeatureCollection","features":[')
+        for space in cache.iter_spaces(floor_id, floor["resourceRelations"]["spaces"], client):
+            if json_file:
+                json_file.write(("," if count else "") + json.dumps(space, separators=(",", ":")))
+            count += 1
+            yield space
+        if json_file:
+            json_file.write("]}")
+            json_file.close()
+            os.replace(json_file.name, json_path)
+            json_file = None
+    finally:
+        if json_file:
+            json_file.close()
+            os.remove(json_file.name)
+        if client:
+            client.close()
+
+    stats = cache.stats
+    log.info(f"Floor {floor_id}: {count} spaces in {time.perf_counter() - start:.2f}s, {stats.get('downloaded', 0)} downloaded, "
+             f"{stats.get('revalidated', 0)} unchanged, {stats.get('cached', 0)} from the cache")
+
+def remember_spaces(spaces):
+    """Pass the spaces through and keep them as floor_spaces once all of them arrived."""
+    global floor_spaces
+
+    received = []
+    for space in spaces:
+        received.append(space)
+        yield space
+    floor_spaces = received
+
+def get_floor_data(floor_id, offline=False, json_path=""):
+    """Fetch the spaces of the floor into floor_spaces, return them or None if the fetch failed."""
+    try:
+        for _ in remember_spaces(iter_floor_spaces(floor_id, offline, json_path)):
+            pass
+    except ArchilogicError as error:
+        log.error(f"Failed to get floor data: {error}")
         return None
-    
-def create_3d():
-    # parse json data
-    spaces = json.loads(spaces_json_data)
-
+    return floor_spaces
+
+def get_spaces_to_create(context):
+    """The spaces fetched in this session, otherwise the spaces of the floor while they are downloaded."""
+    if floor_spaces is not None:
+        return floor_spaces
+    scene = context.scene
+    return remember_spaces(iter_floor_spaces(scene.floorID, scene.archilogic_offline, scene.archilogic_json_path))
+
+def create_3d(spaces, single_mesh=False, floor_name="Floor", instanced_labels=False):
+    """Create the space meshes and name labels, spaces is any iterable of geo-json features.
+
+    Every space is built when it arrives, a generator streams the spaces from the download
+    to the meshes. With single_mesh all spaces go into one mesh object floor_name, see
+    floor_mesh.py. With instanced_labels all names are drawn by one object, see
+    instanced_labels.py. Returns the number of created spaces.
+    """
     # Create or get the collections
     space_collection_name = "spaces"
     text_collection_name = "space_names"
@@ -82,17 +137,31 @@ def create_3d():
         bpy.context.scene.collection.children.link(text_collection)
 
 
+    scene = bpy.context.scene
+    # local metres around the geo origin of the scene, set by the first space if missing
+    projector = GeoProjector.from_scene(scene)
+    builder = FloorMeshBuilder() if single_mesh else None
+    pending = []
+    # (name, location) of the instanced labels, created together after the loop
+    labels = [] if instanced_labels else None
+    count = 0
     # iterate over the spaces in the JSON
     for space in spaces:
+        count += 1
         # get the name from the properties if it exists, otherwise get the id
         name = space["properties"].get("name", space["id"])
 
-        # get the coordinates from the geometry
-        coordinates = space["geometry"]["coordinates"][0]
+        # get the (lon, lat) coordinates from the geometry
+        ring = space["geometry"]["coordinates"][0]
+        if projector is None:
+            projector = GeoProjector.from_scene(scene, ring[0])
 
-        # convert to tuples and swap (lat, lon) to (x, y)
-        # convert lat/lon to meters using a local tangent plane approximation
-        coordinates = [(lon * 111.32 * 1000 * math.cos(math.radians(lat)), lat * 111.32 * 1000, 0) for lon, lat in coordinates]
+        if builder:
+            # projected and written into the floor mesh at once after the loop
+            pending.append((space, name, ring))
+            continue
+
+        coordinates = projector.project(ring)
 
         # create a new mesh and a new object
         mesh = bpy.data.meshes.new(name=name)
@@ -102,25 +171,52 @@ def create_3d():
         space_collection.objects.link(obj)
 
         # create the mesh from python data
-        mesh.from_pydata(coordinates, [], [list(range(len(coordinates)))])
+        mesh.from_pydata(coordinates.tolist(), [], [list(range(len(coordinates)))])
 
         # update the mesh with the new data
         mesh.update()
 
-        # calculate left centered position of the text
-        x_min = min(coordinates, key=lambda x: x[0])[0]
-        y_center = mean(coord[1] for coord in coordinates)
-        x_margin = x_min + (0.10 * (max(coordinates, key=lambda x: x[0])[0] - x_min))
+        if labels is not None:
+            labels.append((name, get_label_location(coordinates)))
+        else:
+            create_space_label(text_collection, name, coordinates)
+
+    if builder:
+        outlines = projector.project_rings([ring for _, _, ring in pending]) if pending else []
+        for (space, name, _), coordinates in zip(pending, outlines):
+            builder.add(coordinates, space["id"], name, space["properties"].get("usage", ""))
+            if labels is not None:
+                labels.append((name, get_label_location(coordinates)))
+            else:
+                create_space_label(text_collection, name, coordinates)
+        obj = bpy.data.objects.new(floor_name, builder.build(floor_name))
+        space_collection.objects.link(obj)
+
+    if labels:
+        create_labels(text_collection, labels)
+
+    log.info(f"Created {count} spaces" + (f" in the mesh {floor_name}" if builder else ""))
+    return count
+
+def get_label_location(coordinates):
+    """Left centered position of the label in the space outline coordinates (n, 3)."""
+    x_min = coordinates[:, 0].min()
+    y_center = coordinates[:, 1].mean()
+    x_margin = x_min + (0.10 * (coordinates[:, 0].max() - x_min))
+    return (float(x_margin), float(y_center), 0.0)
 
-        # create a new text object
-        font_curve = bpy.data.curves.new(type="FONT", name=f"{name}_text")
-        text_obj = bpy.data.objects.new(f"{name}_text", font_curve)
-        text_obj.data.body = name
-        text_obj.location = (x_margin, y_center, 0)
-        text_obj.scale = (0.5, 0.5, 0.5)  # make the text half the size
+def create_space_label(text_collection, name, coordinates):
+    """Text object with the space name, left in the space outline coordinates (n, 3)."""
+    # create a new text object
+    font_curve = bpy.data.curves.new(type="FONT", name=f"{name}_text")
+    text_obj = bpy.data.objects.new(f"{name}_text", font_curve)
+    text_obj.data.body = name
+    text_obj.location = get_label_location(coordinates)
+    text_obj.scale = (0.5, 0.5, 0.5)  # make the text half the size
 
-        # link the text object to the text collection
-        text_collection.objects.link(text_obj)
+    # link the text object to the text collection
+    text_collection.objects.link(text_obj)
+    return text_obj
 
 class ESEC_ARCHIOLOGIC_PT_main_panel(bpy.types.Panel):
     bl_label = "ESEC Archiologic import v"+ str(bl_info['version'])
@@ -132,12 +228,23 @@ class ESEC_ARCHIOLOGIC_PT_main_panel(bpy.types.Panel):
     def draw(self, context):
         layout = self.layout
         layout.prop(context.scene, "floorID")
-        layout.operator("esec.get_floor_data")
+        row = layout.row()
+        row.operator("esec.get_floor_data")
+        row.prop(context.scene, "archilogic_offline")
+        row = layout.row()
+        row.operator("esec.invalidate_archilogic_cache")
+        row.operator("esec.invalidate_archilogic_cache", text="Clear All Floor Caches").all_floors = True
+        layout.prop(context.scene, "archilogic_json_path")
         layout.separator()
         layout.prop(context.scene, "create_rooms")
         layout.prop(context.scene, "create_walls")
         layout.prop(context.scene, "create_windows_doors")
-        layout.operator("esec.create")
+        row = layout.row()
+        row.prop(context.scene, "archilogic_single_mesh")
+        row.prop(context.scene, "archilogic_instanced_labels")
+        row = layout.row()
+        row.operator("esec.create")
+        row.operator("esec.split_archilogic_floor")
         layout.separator()        
         layout.operator("esec.delete_all")
 
@@ -146,14 +253,35 @@ class ESEC_ARCHIOLOGIC_OT_get_floor_data(bpy.types.Operator):
     bl_idname = "esec.get_floor_data"
 
     def execute(self, context):
-        print("Get Floor Data")
+        log.debug("Get Floor Data")
         
         # Get floorID from the input fields
         floor_id = context.scene.floorID
 
         # Call the separate function to get floor data
-        get_floor_data(floor_id)  
-              
+        if get_floor_data(floor_id, offline=context.scene.archilogic_offline, json_path=context.scene.archilogic_json_path) is None:
+            self.report({'ERROR'}, "Failed to get floor data, see the console")
+            return {'CANCELLED'}
+
+        return {'FINISHED'}
+
+class ESEC_ARCHIOLOGIC_OT_invalidate_cache(bpy.types.Operator):
+    """Delete the cached data of the floor, the next 'Get Floor Data' downloads everything again"""
+    bl_label = "Clear Floor Cache"
+    bl_idname = "esec.invalidate_archilogic_cache"
+
+    all_floors: bpy.props.BoolProperty(name="All Floors", description="Clear the cached data of every floor")
+
+    def execute(self, context):
+        global floor_spaces
+
+        floor_id = None if self.all_floors else context.scene.floorID
+        if not self.all_floors and not floor_id:
+            self.report({'WARNING'}, "No Floor ID")
+            return {'CANCELLED'}
+        get_cache().invalidate(floor_id)
+        floor_spaces = None
+        self.report({'INFO'}, "Cleared the cache of " + ("all floors" if self.all_floors else f"floor {floor_id}"))
         return {'FINISHED'}
 
 class ESEC_ARCHIOLOGIC_OT_delete_all(bpy.types.Operator):
@@ -161,7 +289,7 @@ class ESEC_ARCHIOLOGIC_OT_delete_all(bpy.types.Operator):
     bl_idname = "esec.delete_all"
 
     def execute(self, context):
-        print("Delete All")        
+        log.debug("Delete All")
         bpy.ops.object.select_all(action='SELECT')
         bpy.ops.object.delete(use_global=False, confirm=False)
         
@@ -172,17 +300,54 @@ class ESEC_ARCHIOLOGIC_OT_create(bpy.types.Operator):
     bl_idname = "esec.create"
 
     def execute(self, context):
-        print("Create")        
-        create_3d()
+        log.debug("Create")
+        try:
+            create_3d(get_spaces_to_create(context), context.scene.archilogic_single_mesh,
+                      f"Floor_{context.scene.floorID}" if context.scene.floorID else "Floor",
+                      context.scene.archilogic_instanced_labels)
+        except ArchilogicError as error:
+            log.error(f"Failed to get floor data: {error}")
+            self.report({'ERROR'}, "Failed to get floor data, see the console")
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+class ESEC_ARCHIOLOGIC_OT_split_floor(bpy.types.Operator):
+    """Split the selected single-mesh floors into one object per space"""
+    bl_label = "Split Floor"
+    bl_idname = "esec.split_archilogic_floor"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    keep_floor: bpy.props.BoolProperty(name="Keep Floor", description="Keep the single-mesh floor object next to the space objects")
+
+    @classmethod
+    def poll(cls, context):
+        return any(is_floor_mesh(obj) for obj in context.selected_objects)
+
+    def execute(self, context):
+        count = 0
+        for obj in [obj for obj in context.selected_objects if is_floor_mesh(obj)]:
+            count += len(split_floor_mesh(obj))
+            if not self.keep_floor:
+                mesh = obj.data
+                bpy.data.objects.remove(obj, do_unlink=True)
+                if not mesh.users:
+                    bpy.data.meshes.remove(mesh)
+        self.report({'INFO'}, f"Created {count} space objects")
         return {'FINISHED'}
 
 
 def register():
     bpy.utils.register_class(ESEC_ARCHIOLOGIC_PT_main_panel)
     bpy.utils.register_class(ESEC_ARCHIOLOGIC_OT_get_floor_data)
+    bpy.utils.register_class(ESEC_ARCHIOLOGIC_OT_invalidate_cache)
     bpy.utils.register_class(ESEC_ARCHIOLOGIC_OT_delete_all)
-    bpy.utils.register_class(ESEC_ARCHIOLOGIC_OT_create)        
+    bpy.utils.register_class(ESEC_ARCHIOLOGIC_OT_create)
+    bpy.utils.register_class(ESEC_ARCHIOLOGIC_OT_split_floor)
     bpy.types.Scene.floorID = bpy.props.StringProperty(name="Floor ID", default="", description="Floor from Archiologic")
+    bpy.types.Scene.archilogic_offline = bpy.props.BoolProperty(name="Offline", description="Use only the cached floor data, without the Archiologic API")
+    bpy.types.Scene.archilogic_json_path = bpy.props.StringProperty(name="Save JSON", subtype='FILE_PATH', default="", description="Optional file to write the fetched spaces to as compact geo-json")
+    bpy.types.Scene.archilogic_single_mesh = bpy.props.BoolProperty(name="Single Mesh", default=False, description="Create all spaces of the floor as one mesh, 'Split Floor' makes one object per space of it")
+    bpy.types.Scene.archilogic_instanced_labels = bpy.props.BoolProperty(name="Instanced Labels", default=False, description="Draw all space names from one object with Geometry Nodes instead of a text object per space")
     bpy.types.Scene.create_rooms = bpy.props.BoolProperty(name="Create Rooms")
     bpy.types.Scene.create_walls = bpy.props.BoolProperty(name="Create Walls")
     bpy.types.Scene.create_windows_doors = bpy.props.BoolProperty(name="Create Windows/Doors")
@@ -191,9 +356,15 @@ def register():
 def unregister():
     bpy.utils.unregister_class(ESEC_ARCHIOLOGIC_PT_main_panel)
     bpy.utils.unregister_class(ESEC_ARCHIOLOGIC_OT_get_floor_data)
+    bpy.utils.unregister_class(ESEC_ARCHIOLOGIC_OT_invalidate_cache)
     bpy.utils.unregister_class(ESEC_ARCHIOLOGIC_OT_delete_all)
     bpy.utils.unregister_class(ESEC_ARCHIOLOGIC_OT_create)
+    bpy.utils.unregister_class(ESEC_ARCHIOLOGIC_OT_split_floor)
     del bpy.types.Scene.floorID
+    del bpy.types.Scene.archilogic_offline
+    del bpy.types.Scene.archilogic_json_path
+    del bpy.types.Scene.archilogic_single_mesh
+    del bpy.types.Scene.archilogic_instanced_labels
     del bpy.types.Scene.create_rooms
     del bpy.types.Scene.create_walls
     del bpy.types.Scene.create_windows_doors
@@ -12,46 +12,34 @@ bl_info = {
 
 import bpy
 import re
-import mathutils
 import os
-import blenderbim.tool as tool
-from blenderbim.bim.ifc import IfcStore
+# BlenderBIM is only imported on first use through ifc_rename, the addon loads without it
+from . import ifc_rename
+from .logger import log
+from .space_matcher import SpaceTextMatcher
+from .name_index import NameIndex
 
 def rename_spaces_by_longname():
-    # Define the longnames to look for and their corresponding new names
-    print("rename_spaces_by_longname")
-    longname_dict = {
-        'staircase': 'Staircase',
-        'elevator': 'Elevator',
-        'shaft': 'Shaft',
-    }
-
-    file = IfcStore.get_file()
-    elements = file.by_type('IfcSpace')
-
-    for e in elements:
-        longname = e.LongName
-        # Check if the space's LongName is one of the ones we're looking for
-        if longname and longname.lower() in longname_dict:
-                                
-            # Extract the number part of the name
-            number_part = e.Name.split('_')[-1]
-            # Create the new name with the new name from the dictionary and the number part
-            new_name = '{}_{}'.format(longname_dict[longname.lower()], number_part)
-            # Assign the new name to the space
-            old_space_name = e.Name
-            
-            for obj in bpy.data.objects:
-                    # Make sure the object is an IfcSpace                    
-                    old_name = obj.name.split('/')[-1]  # Get the last part of the name after '/'
-                    # Check if the name follows the expected format
-                    if old_name.startswith('Space_'):                                        
-                        if old_name == old_space_name :            
-                            print("rename " + old_name + " to " + new_name)
-                            obj.name = obj.name.replace(old_name, new_name)
+    # Rename the spaces with a known LongName (staircase, elevator, shaft) in the IFC and in Blender,
+    # the objects are resolved from the IFC elements, see ifc_rename.LONGNAME_RENAMES
+    log.info("rename_spaces_by_longname")
+    file = ifc_rename.get_ifc_file()
+    if file is None:
+        log.warning("No IFC project loaded.")
+        return
+
+    renamed = ifc_rename.rename_spaces_by_longname(file)
+    log.info(f"Renamed {renamed} spaces by long name.")
                                                                 
 
 def rename_spaces():
+    # With an IFC project the IFC Name is padded as well, through the element <-> object mapping
+    if file := ifc_rename.get_ifc_file():
+        renamed = ifc_rename.pad_space_numbers(file)
+        log.info(f"Renamed {renamed} spaces to the zero padded format.")
+        return
+
+    renamed = 0
     for obj in bpy.data.objects:
         # Make sure the object is an IfcSpace
         if "IfcSpace" in obj.name:
@@ -64,8 +52,10 @@ def rename_spaces():
                 # Create the new name with leading zeros
                 new_name = 'Space_{:03}'.format(int(number_part))
                 # Assign the new name to the space
-                print("rename " + old_name + " to " + new_name)
+                log.debug("rename " + old_name + " to " + new_name)
                 obj.name = obj.name.replace(old_name, new_name)
+                renamed += 1
+    log.info(f"Renamed {renamed} spaces to the zero padded format.")
   
 
 def move_objects_to_new_collection():
@@ -106,14 +96,14 @@ def move_objects_to_new_collection():
 def delete_unwanted_text_objects_from_dxf():
     # Define the list of strings to look for
     strings_to_keep = bpy.context.scene.esec_strings_to_keep.split(', ')
-    print(strings_to_keep)
+    log.debug(f"Strings to keep: {strings_to_keep}")
 
     # Get the 'dxf_text' collection
     dxf_text_collection = bpy.data.collections.get('dxf_text')
 
     # If the collection doesn't exist, there's nothing to do
     if not dxf_text_collection:
-        print("'dxf_text' collection does not exist.")
+        log.warning("'dxf_text' collection does not exist.")
         return
 
     # Deselect all objects
@@ -125,11 +115,13 @@ def delete_unwanted_text_objects_from_dxf():
         if obj.type == 'FONT':
             # If the object's text does not contain any of the specified strings, select it
             if not any(s in obj.data.body for s in strings_to_keep):
-                print("delete " + obj.name)
+                log.debug("delete " + obj.name)
                 obj.select_set(True)
 
     # Delete all selected objects at once
+    deleted = len(bpy.context.selected_objects)
     bpy.ops.object.delete()
+    log.info(f"Deleted {deleted} unwanted text objects.")
 
     
 #######################################################
@@ -154,28 +146,13 @@ def sort_spaces_numerically(space_object):
     number = re.search(r'\d+', space_object.name)
     return int(number.group(0)) if number else 0
 
-def get_bounding_box(obj):
-    bbox_min = [min(obj.bound_box[i][j] for i in range(8)) for j in range(3)]
-    bbox_max = [max(obj.bound_box[i][j] for i in range(8)) for j in range(3)]
-    return bbox_min, bbox_max
-
-def is_text_inside_space(text_obj, space_obj):
-    text_pos = text_obj.matrix_world.translation
-    bbox_corners = [mathutils.Vector(corner) for corner in space_obj.bound_box]
-    bbox_world_corners = [space_obj.matrix_world @ corner for corner in bbox_corners]
-
-    bbox_min = [min(corner[i] for corner in bbox_world_corners) for i in range(3)]
-    bbox_max = [max(corner[i] for corner in bbox_world_corners) for i in range(3)]
-
-    return bbox_min[0] <= text_pos[0] <= bbox_max[0] and bbox_min[1] <= text_pos[1] <= bbox_max[1]
-
 
 def print_spaces_and_texts():
     space_replacements = {}
     ifc_project_none = bpy.data.collections.get('IfcProject/None')
 
     if ifc_project_none is None:
-        print("IfcProject/None collection not found.")
+        log.warning("IfcProject/None collection not found.")
         return
 
     space_objects = []
@@ -191,60 +168,43 @@ def print_spaces_and_texts():
 
     total_texts_found = 0
 
-    for space in sorted_space_objects:
-        bbox_min, bbox_max = get_bounding_box(space)
-        x_length = bbox_max[0] - bbox_min[0]
-        y_length = bbox_max[1] - bbox_min[1]
-        size = x_length * y_length
-
-        #space_output = f"{space.name} - X length: {x_length:.2f}, Y length: {y_length:.2f}, Size: {size:.2f}"
+    # clean every text and locate every space once, each space only tests the texts nearby
+    matcher = SpaceTextMatcher(sorted_space_objects, text_objects, keywords)
+    for space, texts_found, matching_text in matcher.matches():
         space_output = f"{space.name} - "
 
-        texts_found = 0
-        matching_text = ""
-
-        for text_obj in text_objects:
-            cleaned_text = re.sub(r'[^A-Za-z0-9\s.]', '', text_obj.data.body.replace('\n', ' '))
-            cleaned_text = re.sub(r'\s{2,}', ' ', cleaned_text)  # Remove multiple consecutive whitespaces
-
-            if any(keyword in cleaned_text for keyword in keywords) and is_text_inside_space(text_obj, space):
-                texts_found += 1
-                matching_text = cleaned_text
-
         if texts_found == 1:
             space_output += f"{matching_text}"
-            print(space_output)
+            log.info(space_output)
             total_texts_found += 1
             space_replacements[space.name] = matching_text
 
-    print(f"Total number of IFC spaces: {len(sorted_space_objects)}")
-    print(f"Total number of texts found in spaces: {total_texts_found}")
+    log.info(f"Total number of IFC spaces: {len(sorted_space_objects)}")
+    log.info(f"Total number of texts found in spaces: {total_texts_found}")
         
     if not bpy.context.scene.esec_dry_run:
-        print("not checked")
+        log.debug("Dry run off, renaming the spaces")
         replace_space_names_in_ifc(space_replacements)
     else:        
-        print("checked")
+        log.debug("Dry run on, nothing renamed")
             #replace_space_names_in_ifc(space_replacements)    
             
     return space_replacements
 
 def replace_space_names_in_ifc(space_replacements):
-    
-    #space_replacements
+    # rename the IFC elements and their objects together, resolved from the space objects
+    renamed, space_replacements = ifc_rename.rename_objects(space_replacements, 'Space_')
+
+    # objects without IFC element, index the 'Space_' objects by the name after the last '/' once
+    spaces = NameIndex('Space_') if space_replacements else None
     for space_name, new_space_name in space_replacements.items():
         space_name_without_prefix = space_name.replace("IfcSpace/", "")
         #print(f"found {space_name_without_prefix} - {new_space_name}")
-        
-        #ifc
-        for obj in bpy.data.objects:
-            # Make sure the object is an IfcSpace                    
-            old_name = obj.name.split('/')[-1]  # Get the last part of the name after '/'
-            # Check if the name follows the expected format
-            if old_name.startswith('Space_'):                                        
-                if old_name == space_name_without_prefix :            
-                    print("rename " + old_name + " to " + new_space_name)
-                    obj.name = obj.name.replace(old_name, new_space_name)    
+
+        for obj in spaces.rename(space_name_without_prefix, new_space_name):
+            log.debug("rename " + space_name_without_prefix + " to " + new_space_name)
+            renamed += 1
+    log.info(f"Renamed {renamed} spaces.")
     
 
 #########################################################
@@ -283,6 +243,7 @@ class ESEC_OT_RenameSpacesByLongname(bpy.types.Operator):
     bl_idname = "esec.rename_spaces_by_longname"
     bl_label = "Prepare IFC"
     bl_description = "Rename spaces by long name"
+    bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
         rename_spaces_by_longname()
@@ -295,9 +256,9 @@ class ESEC_OT_PrepareDXF(bpy.types.Operator):
     bl_description = "Prepare DXF file"
 
     def execute(self, context):
-        print("Prepare DXF")
+        log.info("Prepare DXF")
         move_objects_to_new_collection()
-        print("delete_unwanted_text_objects_from_dxf")
+        log.info("delete_unwanted_text_objects_from_dxf")
         delete_unwanted_text_objects_from_dxf()
         return {'FINISHED'}
 
@@ -305,6 +266,7 @@ class ESEC_OT_RenameSpaces(bpy.types.Operator):
     bl_idname = "esec.rename_spaces"
     bl_label = "Rename Spaces by DXF Text"
     bl_description = "Rename spaces based on text objects"
+    bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
         print_spaces_and_texts()
@@ -19,10 +19,17 @@ from bpy_extras.view3d_utils import region_2d_to_location_3d
 from bpy.app.handlers import persistent
 from mathutils import Matrix, Vector
 import math
+from bpy_extras.io_utils import ImportHelper
+from .logger import log
 
 
 keymap_items = []  # Track keymap items to remove them later
 
+SHAPE_MESH_PREFIX = "ESEC_Sensor_"
+SHAPE_PROPERTY = "esec_sensor_shape"
+LABEL_MATERIAL_NAME = "WhiteMaterial"
+DEFAULT_DEVICE_COLOR = (0.5, 0.0, 0.5, 1)
+
 def update_project_meta(self, context):
     # avoid recursive calls if needed
     try:
@@ -46,6 +53,13 @@ def update_sensor_type_color(self, context):
 def load_handler(dummy):
     bpy.app.timers.register(register_keymaps, first_interval=1.0)
 
+@persistent
+def reset_device_counters(dummy):
+    # the devices of the loaded file may have been changed by anyone, count them again on the next placement
+    for scene in bpy.data.scenes:
+        for sensor_type in scene.sensor_types:
+            sensor_type.last_device_number = -1
+
 def copy_sensor_counts_to_clipboard():
     # Check if the file is saved and get the filename, otherwise indicate it's unsaved
     file_path = bpy.data.filepath
@@ -76,29 +90,51 @@ def count_sensors():
             sensor_counts[collection_name] = len(primary_sensors)
     return sensor_counts
 
-def create_device(x, y, sensor_type_name, color=(0.5, 0.0, 0.5, 1), shape='CIRCLE', device_number=1):
-
-    # Retrieve the global scale factor
-    scale_factor = bpy.context.scene.esec_sensor_plan_properties.scale_factor
-
-    # Find the highest existing suffix for the given sensor type
-    highest_suffix = 0
-    for obj in bpy.data.objects:
-        if obj.name.startswith(sensor_type_name + "_"):
-            suffix = obj.name.replace(sensor_type_name + "_", "")
-            if suffix.isdigit() and int(suffix) > highest_suffix:
-                highest_suffix = int(suffix)
-
-
-    # Determine the name for the new object, starting with .001 suffix
-    new_suffix = str(highest_suffix + 1).zfill(3)
-    device_name = f"{sensor_type_name}_{new_suffix}"
-
-    mesh = bpy.data.meshes.new(name=device_name)
-    obj = bpy.data.objects.new(name=device_name, object_data=mesh)
+def get_device_name(sensor_type_name, number):
+    return f"{sensor_type_name}_{str(number).zfill(3)}"
+
+def get_highest_device_number(sensor_type_name):
+    """Highest n of the devices '<sensor type>_<n>' in the collection of the sensor type."""
+    prefix = sensor_type_name + "_"
+    highest = 0
+    collection = bpy.data.collections.get(sensor_type_name)
+    if collection:
+        for obj in collection.objects:
+            suffix = obj.name[len(prefix):]
+            if obj.name.startswith(prefix) and suffix.isdigit():
+                highest = max(highest, int(suffix))
+    return highest
+
+def next_device_number(sensor_type_name):
+    """Number of the next device of the type, counted on the sensor type item.
+
+    The counter is rebuilt from the collection of the type only if it is unknown, after a
+    file load, or stale, i.e. its device was deleted or renamed. So placing a device
+    doesn't depend on the number of objects in the file.
+    """
+    sensor_type = next((st for st in bpy.context.scene.sensor_types if st.name == sensor_type_name), None)
+    number = sensor_type.last_device_number if sensor_type else -1
+    if number < 0 or (number > 0 and get_device_name(sensor_type_name, number) not in bpy.data.objects):
+        number = get_highest_device_number(sensor_type_name)
+    number += 1
+    # the name may be taken by an object outside the collection of the type
+    while get_device_name(sensor_type_name, number) in bpy.data.objects:
+        number += 1
+    if sensor_type:
+        sensor_type.last_device_number = number
+    return number
+
+def get_shape_mesh(shape):
+    """The mesh of a device shape, built once and shared by all devices of that shape."""
+    mesh_name = SHAPE_MESH_PREFIX + shape
+    mesh = bpy.data.meshes.get(mesh_name)
+    if mesh and mesh.get(SHAPE_PROPERTY) == shape and len(mesh.materials):
+        return mesh
+
+    mesh = bpy.data.meshes.new(name=mesh_name)
+    mesh[SHAPE_PROPERTY] = shape
 
     bm = bmesh.new()
-    print(shape)
     if shape == 'CIRCLE':
         bmesh.ops.create_circle(bm, cap_ends=True, radius=1.0, segments=32)
     elif shape == 'SQUARE':
@@ -121,6 +157,11 @@ def create_device(x, y, sensor_type_name, color=(0.5, 0.0, 0.5, 1), shape='CIRCL
     bm.to_mesh(mesh)
     bm.free()
 
+    # an empty slot, every device sets the material of its type on the object
+    mesh.materials.append(None)
+    return mesh
+
+def get_sensor_type_material(sensor_type_name, color):
     # Check if the material already exists
     mat_name = f"{sensor_type_name}_Material"
     mat = bpy.data.materials.get(mat_name)
@@ -129,55 +170,133 @@ def create_device(x, y, sensor_type_name, color=(0.5, 0.0, 0.5, 1), shape='CIRCL
         # If the material does not exist, create it
         mat = bpy.data.materials.new(name=mat_name)
         mat.diffuse_color = color
+    return mat
 
-    # Assign the material to the object
-    if len(obj.data.materials):
-        # Replace the first material
-        obj.data.materials[0] = mat
-    else:
-        # Add new material
-        obj.data.materials.append(mat)
-
-    obj.location = (x, y, 0.0001)
-    obj.scale = (0.005 * scale_factor, 0.005 * scale_factor, 0.005 * scale_factor)
-
-    if sensor_type_name not in bpy.data.collections:
+def get_label_material():
+    """The white material shared by all device labels."""
+    mat = bpy.data.materials.get(LABEL_MATERIAL_NAME)
+    if not mat:
+        mat = bpy.data.materials.new(name=LABEL_MATERIAL_NAME)
+        mat.diffuse_color = (1, 1, 1, 1)  # RGBA for white
+    return mat
+
+def merge_label_materials():
+    """Remap the users of WhiteMaterial.001, .002, ... to WhiteMaterial and remove them, return their number."""
+    duplicates = [mat for mat in bpy.data.materials
+                  if mat.name.startswith(LABEL_MATERIAL_NAME + ".") and mat.name[len(LABEL_MATERIAL_NAME) + 1:].isdigit()]
+    if not duplicates:
+        return 0
+    target = bpy.data.materials.get(LABEL_MATERIAL_NAME)
+    if not target:
+        target = duplicates.pop(0)
+        target.name = LABEL_MATERIAL_NAME
+    for mat in duplicates:
+        mat.user_remap(target)
+        bpy.data.materials.remove(mat)
+    return len(duplicates)
+
+def get_sensor_collection(sensor_type_name):
+    sensor_collection = bpy.data.collections.get(sensor_type_name)
+    if not sensor_collection:
         sensor_collection = bpy.data.collections.new(sensor_type_name)
         bpy.context.scene.collection.children.link(sensor_collection)
-    else:
-        sensor_collection = bpy.data.collections[sensor_type_name]
-
-    sensor_collection.objects.link(obj)
-
-    # Create a text object with the device number
-    number = obj.name.split('_')[-1]  # Adjusted for your naming convention (underscore)
-
-    # Create the text object at the same position as the shape
-    bpy.ops.object.text_add(location=(0, 0, 0.009), scale=(0.005, 0.005, 0.005))
-    text_obj = bpy.context.object
-
-    # Parent the text object to the shape for organization
-    text_obj.parent = obj
-    text_obj.data.body = number  # Use the device number as the text
-
-    # The text object's 'align_x' and 'align_y' properties control the text's alignment within its bounding box
-    text_obj.data.align_x = 'CENTER'  # Center-align the text horizontally
-    text_obj.data.align_y = 'CENTER'  # Center-align the text vertically
-
-    # This can depend on the font size, the specific geometry of the shape, and other factors
-    text_obj.location.z += 0.01  # Adjust the Z location slightly if necessary
+    return sensor_collection
 
-    # Assign a white material to the text
-    text_mat = bpy.data.materials.new(name="WhiteMaterial")
-    text_mat.diffuse_color = (1, 1, 1, 1)  # RGBA for white
-    text_obj.data.materials.append(text_mat)
-
-    # Unlink the text object from the scene's active collection
-    bpy.context.collection.objects.unlink(text_obj)
-
-    # Instead, ensure the text object is linked to the same collection as the device
-    sensor_collection.objects.link(text_obj)    
+def create_devices(devices, color=None, shape=None):
+    """Create a device with its number label for every (x, y, sensor type name) in devices.
 
+    Only the data API is used, no operators, so it works in background mode and costs no
+    operator call per device. Color and shape are taken from the sensor type in the scene
+    unless given. Returns the device objects in the order of devices.
+    """
+    # Retrieve the global scale factor
+    scale_factor = bpy.context.scene.esec_sensor_plan_properties.scale_factor
+    sensor_types = {sensor_type.name: sensor_type for sensor_type in bpy.context.scene.sensor_types}
+    label_material = get_label_material()
+
+    # collection, material and mesh of every type, looked up once per call
+    type_data = {}
+    objects = []
+    for x, y, sensor_type_name in devices:
+        if sensor_type_name not in type_data:
+            sensor_type = sensor_types.get(sensor_type_name)
+            type_color = color or (sensor_type.color if sensor_type else DEFAULT_DEVICE_COLOR)
+            type_shape = shape or (sensor_type.shape if sensor_type else 'CIRCLE')
+            type_data[sensor_type_name] = (
+                get_sensor_collection(sensor_type_name),
+                get_sensor_type_material(sensor_type_name, type_color),
+                get_shape_mesh(type_shape),
+            )
+        sensor_collection, mat, mesh = type_data[sensor_type_name]
+
+        # Determine the name for the new object, starting with _001
+        new_suffix = str(next_device_number(sensor_type_name)).zfill(3)
+        device_name = f"{sensor_type_name}_{new_suffix}"
+
+        # all devices of a shape share its mesh, the material of the type is in the object slot
+        obj = bpy.data.objects.new(name=device_name, object_data=mesh)
+        obj.material_slots[0].link = 'OBJECT'
+        obj.material_slots[0].material = mat
+
+        obj.location = (x, y, 0.0001)
+        obj.scale = (0.005 * scale_factor, 0.005 * scale_factor, 0.005 * scale_factor)
+        sensor_collection.objects.link(obj)
+
+        # Create a text object with the device number, in the same collection as the device
+        font_curve = bpy.data.curves.new(type="FONT", name="Text")
+        font_curve.body = new_suffix  # Use the device number as the text
+
+        # The text object's 'align_x' and 'align_y' properties control the text's alignment within its bounding box
+        font_curve.align_x = 'CENTER'  # Center-align the text horizontally
+        font_curve.align_y = 'CENTER'  # Center-align the text vertically
+
+        # Assign the shared white material to the text
+        font_curve.materials.append(label_material)
+
+        text_obj = bpy.data.objects.new("Text", font_curve)
+        # Parent the text object to the shape, it sits slightly above the shape in its local space
+        # and keeps scale 1 there, the scale of the device sizes it
+        text_obj.parent = obj
+        text_obj.location = (0, 0, 0.019)
+        sensor_collection.objects.link(text_obj)
+
+        objects.append(obj)
+
+    log.debug(f"Created {len(objects)} devices")
+    return objects
+
+def create_device(x, y, sensor_type_name, color=None, shape=None):
+    """Create one device, see create_devices()."""
+    return create_devices([(x, y, sensor_type_name)], color=color, shape=shape)[0]
+
+def read_device_csv(filepath):
+    """(x, y, sensor type name) of every row of a CSV file with the columns x, y and type.
+
+    A header row with the columns "x", "y" and "type" (or "sensor_type") in any order is
+    optional, without it the columns are x, y, type.
+    """
+    with open(filepath, newline='', encoding='utf-8-sig') as f:
+        rows = [row for row in csv.reader(f) if any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    has_header = "x" in header and "y" in header
+    columns = (0, 1, 2)
+    if has_header:
+        type_column = next((name for name in ("type", "sensor_type", "sensor type") if name in header), None)
+        if type_column is None:
+            raise ValueError("the CSV header has no 'type' column")
+        columns = (header.index("x"), header.index("y"), header.index(type_column))
+        rows = rows[1:]
+
+    devices = []
+    for line, row in enumerate(rows, start=2 if has_header else 1):
+        try:
+            devices.append((float(row[columns[0]]), float(row[columns[1]]), row[columns[2]].strip()))
+        except (IndexError, ValueError):
+            raise ValueError(f"invalid device in row {line}: {row}")
+    return devices
 
 class CreateDeviceAtCursorOperator(bpy.types.Operator):
     """Place a device at the current mouse viewport position based on sensor type"""
@@ -259,6 +378,12 @@ class ESEC_PG_SensorTypeItem(bpy.types.PropertyGroup):
         ],
         default='CIRCLE'
     )
+    last_device_number: bpy.props.IntProperty(
+        name="Last Device Number",
+        description="Number of the last placed device of this type, -1 if it has to be counted again",
+        default=-1,
+        min=-1
+    )
 
 class ESEC_PG_SensorPlanProperties(bpy.types.PropertyGroup):
     selected_sensor_type: bpy.props.EnumProperty(
@@ -497,6 +622,8 @@ class ESEC_PT_SensorPlanMainPanel(bpy.types.Panel):
         layout.separator()
         # Button to update sensor naming
         layout.operator("esec.update_sensor_naming", text="Update Sensor Naming", icon='FILE_REFRESH')
+        layout.operator("esec.merge_label_materials", text="Merge Label Materials", icon='MATERIAL')
+        layout.operator("esec.import_devices_csv", text="Import Devices from CSV", icon='IMPORT')
         layout.operator(ESEC_OT_CopySensorCountsToClipboard.bl_idname, text="Copy and save Sensor Counts", icon='COPYDOWN')
         layout.separator()
         # Dropdown to select a sensor type
@@ -568,6 +695,7 @@ def unregister_keymaps():
 def update_sensor_naming():
     for sensor_type in bpy.context.scene.sensor_types:
         collection_name = sensor_type.name
+        sensor_type.last_device_number = -1
         if collection_name in bpy.data.collections:
             collection = bpy.data.collections[collection_name]
 
@@ -587,6 +715,9 @@ def update_sensor_naming():
                     # Ensure the text object's data is correctly targeted and exists
                     if hasattr(text_obj, "data") and hasattr(text_obj.data, "body"):
                         text_obj.data.body = str(i).zfill(3)  # Update the text to reflect the new number  
+
+            # the devices are numbered 1..n now
+            sensor_type.last_device_number = len(sorted_objs)
     count_sensors()                                         
 
 
@@ -602,6 +733,43 @@ class ESEC_OT_UpdateSensorNaming(bpy.types.Operator):
         self.report({'INFO'}, "Sensor naming updated.")
         return {'FINISHED'}
 
+class ESEC_OT_ImportDevicesCSV(bpy.types.Operator, ImportHelper):
+    """Place devices from a CSV file with the columns x, y and type"""
+    bl_idname = "esec.import_devices_csv"
+    bl_label = "Import Devices from CSV"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filename_ext = ".csv"
+    filter_glob: bpy.props.StringProperty(default="*.csv", options={'HIDDEN'})
+
+    def execute(self, context):
+        try:
+            devices = read_device_csv(self.filepath)
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, f"Failed to read {self.filepath}: {e}")
+            return {'CANCELLED'}
+
+        known_types = {sensor_type.name for sensor_type in context.scene.sensor_types}
+        unknown_types = sorted({sensor_type_name for _, _, sensor_type_name in devices} - known_types)
+        if unknown_types:
+            self.report({'WARNING'}, f"Unknown sensor types, placed with the default color and shape: {', '.join(unknown_types)}")
+
+        # one call, one undo step for the whole file
+        create_devices(devices)
+        self.report({'INFO'}, f"Placed {len(devices)} devices from {os.path.basename(self.filepath)}")
+        return {'FINISHED'}
+
+class ESEC_OT_MergeLabelMaterials(bpy.types.Operator):
+    """Replace the duplicate WhiteMaterial.001, .002, ... materials of older files by one WhiteMaterial"""
+    bl_idname = "esec.merge_label_materials"
+    bl_label = "Merge Label Materials"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        merged = merge_label_materials()
+        self.report({'INFO'}, f"Merged {merged} duplicate {LABEL_MATERIAL_NAME} materials.")
+        return {'FINISHED'}
+
 class ESEC_OT_CopySensorCountsToClipboard(bpy.types.Operator):
     """Copy sensor counts to clipboard and save/update CSV report"""
     bl_idname = "esec.copy_sensor_counts_to_clipboard"
@@ -798,6 +966,8 @@ def register():
     bpy.utils.register_class(CreateDeviceAtCursorOperator)
     bpy.utils.register_class(ESEC_OT_UpdateSensorNaming)
     bpy.utils.register_class(ESEC_OT_CopySensorCountsToClipboard)   
+    bpy.utils.register_class(ESEC_OT_MergeLabelMaterials)
+    bpy.utils.register_class(ESEC_OT_ImportDevicesCSV)
     
     bpy.types.Scene.sensor_types = bpy.props.CollectionProperty(type=ESEC_PG_SensorTypeItem)
     bpy.types.Scene.esec_sensor_plan_properties = bpy.props.PointerProperty(type=ESEC_PG_SensorPlanProperties)
@@ -805,6 +975,7 @@ def register():
     # Load sensor types from file
     bpy.app.timers.register(load_sensor_types) 
     bpy.app.handlers.load_post.append(load_handler)
+    bpy.app.handlers.load_post.append(reset_device_counters)
     
    
 
@@ -824,11 +995,15 @@ def unregister():
     bpy.utils.unregister_class(CreateDeviceAtCursorOperator)
     bpy.utils.unregister_class(ESEC_OT_UpdateSensorNaming)
     bpy.utils.unregister_class(ESEC_OT_CopySensorCountsToClipboard)
+    bpy.utils.unregister_class(ESEC_OT_MergeLabelMaterials)
+    bpy.utils.unregister_class(ESEC_OT_ImportDevicesCSV)
 
     bpy.utils.unregister_class(ESEC_OT_save_project_meta)
 
     if load_handler in bpy.app.handlers.load_post:
         bpy.app.handlers.load_post.remove(load_handler)
+    if reset_device_counters in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(reset_device_counters)
     unregister_keymaps()
 
 if __name__ == "__main__":
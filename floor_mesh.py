@@ -0,0 +1,137 @@
+import bpy
+import numpy as np
+
+# One mesh for all Archilogic spaces of a floor.
+# Instead of a mesh datablock, an object and a from_pydata() call per space, the outlines of
+# all spaces are collected and written into a single mesh with foreach_set, one polygon per
+# space. The space of every face is stored in the integer face attribute "space_index", an
+# index into the space id and name tables in the custom properties of the mesh, the usage in
+# "usage_index", an index into the usage table. split_floor_mesh() turns the floor back into
+# one object per space when they are needed separately.
+
+SPACE_INDEX_ATTRIBUTE = "space_index"
+USAGE_INDEX_ATTRIBUTE = "usage_index"
+SPACE_IDS_PROPERTY = "esec_space_ids"
+SPACE_NAMES_PROPERTY = "esec_space_names"
+USAGES_PROPERTY = "esec_space_usages"
+
+
+def write_polygons(mesh, vertices, loop_totals):
+    """Fill the empty mesh with the polygons of vertices (n, 3), loop_totals vertices each."""
+    loop_totals = np.asarray(loop_totals, dtype=np.int32)
+    loop_starts = np.cumsum(loop_totals, dtype=np.int32) - loop_totals
+
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", np.asarray(vertices, dtype=np.float32).ravel())
+    # every polygon has its own vertices, loop i uses vertex i
+    mesh.loops.add(len(vertices))
+    mesh.loops.foreach_set("vertex_index", np.arange(len(vertices), dtype=np.int32))
+    mesh.polygons.add(len(loop_totals))
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    if bpy.app.version < (4, 0, 0):
+        # derived from loop_start since 4.0
+        mesh.polygons.foreach_set("loop_total", loop_totals)
+    mesh.update(calc_edges=True)
+
+
+def add_face_attribute(mesh, name, values):
+    attribute = mesh.attributes.new(name, 'INT', 'FACE')
+    attribute.data.foreach_set("value", np.asarray(values, dtype=np.int32))
+
+
+class FloorMeshBuilder:
+    """Collect the space outlines of a floor and build them as one mesh.
+
+        builder = FloorMeshBuilder()
+        for space in spaces:
+            builder.add(coordinates, space_id, name, usage)
+        mesh = builder.build("Floor")
+    """
+
+    def __init__(self):
+        self.outlines = []
+        self.space_ids = []
+        self.names = []
+        self.usages = {}
+        self.usage_indices = []
+
+    def __len__(self):
+        return len(self.space_ids)
+
+    def add(self, coordinates, space_id, name, usage=""):
+        """Add the outline of a space, coordinates (n, 3) in metres. A closing vertex equal to the first is dropped."""
+        outline = np.asarray(coordinates, dtype=np.float64).reshape(-1, 3)
+        if len(outline) > 3 and np.array_equal(outline[0], outline[-1]):
+            outline = outline[:-1]
+        if len(outline) < 3:
+            return False
+        self.outlines.append(outline)
+        self.space_ids.append(str(space_id))
+        self.names.append(name)
+        self.usage_indices.append(self.usages.setdefault(usage or "", len(self.usages)))
+        return True
+
+    def build(self, name):
+        mesh = bpy.data.meshes.new(name)
+        if not self.outlines:
+            return mesh
+        write_polygons(mesh, np.concatenate(self.outlines), [len(outline) for outline in self.outlines])
+        add_face_attribute(mesh, SPACE_INDEX_ATTRIBUTE, np.arange(len(self.outlines)))
+        add_face_attribute(mesh, USAGE_INDEX_ATTRIBUTE, self.usage_indices)
+        mesh[SPACE_IDS_PROPERTY] = self.space_ids
+        mesh[SPACE_NAMES_PROPERTY] = self.names
+        mesh[USAGES_PROPERTY] = list(self.usages)
+        return mesh
+
+
+def is_floor_mesh(obj):
+    return obj is not None and obj.type == 'MESH' and SPACE_IDS_PROPERTY in obj.data \
+        and SPACE_INDEX_ATTRIBUTE in obj.data.attributes
+
+
+def split_floor_mesh(obj, collection=None):
+    """Create one object per space of a floor mesh object, return the new objects.
+
+    The space objects get the name of their space, the floor object is left untouched.
+    """
+    mesh = obj.data
+    space_ids = list(mesh[SPACE_IDS_PROPERTY])
+    names = list(mesh[SPACE_NAMES_PROPERTY])
+    usages = list(mesh.get(USAGES_PROPERTY, []))
+    collection = collection or obj.users_collection[0]
+
+    face_count = len(mesh.polygons)
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    coords = coords.reshape(-1, 3)
+    vertex_index = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", vertex_index)
+    loop_starts = np.empty(face_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    loop_totals = np.empty(face_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    space_index = np.empty(face_count, dtype=np.int32)
+    mesh.attributes[SPACE_INDEX_ATTRIBUTE].data.foreach_get("value", space_index)
+    usage_index = None
+    if USAGE_INDEX_ATTRIBUTE in mesh.attributes:
+        usage_index = np.empty(face_count, dtype=np.int32)
+        mesh.attributes[USAGE_INDEX_ATTRIBUTE].data.foreach_get("value", usage_index)
+
+    objects = []
+    # faces grouped by space, in space order
+    order = np.argsort(space_index, kind='stable')
+    groups = np.split(order, np.flatnonzero(np.diff(space_index[order])) + 1) if face_count else []
+    for faces in groups:
+        index = int(space_index[faces[0]])
+        name = names[index] if 0 <= index < len(names) else f"{obj.name}_{index}"
+        loops = np.concatenate([np.arange(loop_starts[face], loop_starts[face] + loop_totals[face]) for face in faces])
+        space_mesh = bpy.data.meshes.new(name)
+        write_polygons(space_mesh, coords[vertex_index[loops]], loop_totals[faces])
+        space_object = bpy.data.objects.new(name, space_mesh)
+        space_object.matrix_world = obj.matrix_world
+        space_object["esec_space_id"] = space_ids[index] if 0 <= index < len(space_ids) else ""
+        if usage_index is not None and 0 <= usage_index[faces[0]] < len(usages):
+            space_object["esec_space_usage"] = usages[usage_index[faces[0]]]
+        collection.objects.link(space_object)
+        objects.append(space_object)
+    return objects
@@ -0,0 +1,93 @@
+import numpy as np
+
+# Vectorized footprint extraction for the DXF curve objects.
+# The spline coordinates of a whole batch of objects are read with foreach_get into one
+# NumPy array and transformed with one batched matrix multiply. The points of each object
+# are a contiguous segment, obb.py fits the oriented boxes of the segments.
+
+
+def read_spline_coords(spline):
+    """Return the (n, 3) local coordinates of a BEZIER or POLY spline, None for other types."""
+    if spline.type == 'BEZIER':
+        points, size = spline.bezier_points, 3
+    elif spline.type == 'POLY':
+        # poly points are (x, y, z, w)
+        points, size = spline.points, 4
+    else:
+        return None
+    coords = np.empty(len(points) * size, dtype=np.float64)
+    points.foreach_get("co", coords)
+    return coords.reshape(-1, size)[:, :3]
+
+
+def first_spline_coords(obj):
+    splines = obj.data.splines
+    if not len(splines):
+        return np.empty((0, 3))
+    coords = read_spline_coords(splines[0])
+    return coords if coords is not None else np.empty((0, 3))
+
+
+class FootprintBatch:
+    """Spline points of a batch of DXF curve objects.
+
+    Points of object i are local_points[offsets[i]:offsets[i] + counts[i]].
+    """
+
+    def __init__(self, objects):
+        self.objects = list(objects)
+        counts = []
+        chunks = []
+        for obj in self.objects:
+            count = 0
+            if obj.type == 'CURVE':
+                for spline in obj.data.splines:
+                    coords = read_spline_coords(spline)
+                    if coords is not None:
+                        chunks.append(coords)
+                        count += len(coords)
+            counts.append(count)
+
+        self.counts = np.array(counts, dtype=np.int64)
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)[:-1])).astype(np.int64) if counts else np.empty(0, np.int64)
+        self.local_points = np.concatenate(chunks) if chunks else np.empty((0, 3))
+        self.object_index = np.repeat(np.arange(len(self.objects)), self.counts)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def transform(self, matrices):
+        """Apply one 4x4 matrix per object to its points, in a single batched multiply."""
+        if not len(self.local_points):
+            return np.empty((0, 3))
+        homogeneous = np.hstack((self.local_points, np.ones((len(self.local_points), 1))))
+        transformed = np.einsum('nij,nj->ni', matrices[self.object_index], homogeneous)
+        return transformed[:, :3]
+
+    def world_points(self):
+        """Points in world space."""
+        return self.transform(np.array([np.array(obj.matrix_world) for obj in self.objects]).reshape(-1, 4, 4))
+
+
+def extract_footprints(objects):
+    return FootprintBatch(objects)
+
+
+def detect_shape(ob):
+    """Classify the first spline as 'square' (less than 11 points), 'circle' or 'unknown'."""
+    coords = first_spline_coords(ob)
+    num_points = len(coords)
+
+    # Basic shape detection based on point count
+    if num_points < 11:
+        return 'square', num_points
+
+    # If the distances of the points to the object's center are approximately equal, it's a circle
+    center = np.array(ob.location[:2])
+    distances = np.hypot(coords[:, 0] - center[0], coords[:, 1] - center[1])
+    average_distance = distances.mean()
+    # same tolerance as math.isclose(d, average_distance, rel_tol=0.1)
+    tolerance = 0.1 * np.maximum(np.abs(distances), abs(average_distance))
+    if np.all(np.abs(distances - average_distance) <= tolerance):
+        return 'circle', num_points
+    return 'unknown', num_points
@@ -0,0 +1,75 @@
+import numpy as np
+
+# Projection of the Archilogic lat/lon coordinates to local metres.
+# The local tangent plane approximation of the importer, x = lon * M * cos(lat), y = lat * M,
+# gives millions of metres, which float32 mesh coordinates only hold to some centimetres.
+# The projection is done in float64 for all rings at once and relative to an origin, so the
+# meshes get small coordinates around the scene origin. The origin is kept as lon/lat in a
+# custom property of the scene (IDProperty floats are doubles), every floor of the scene uses
+# the same one and unproject() gets the exact geo coordinates back.
+
+METERS_PER_DEGREE = 111.32 * 1000
+ORIGIN_PROPERTY = "esec_geo_origin"
+
+
+def project_absolute(lonlat):
+    """(n, 2) lon/lat in degrees to (n, 2) absolute metres, float64."""
+    lonlat = np.asarray(lonlat, dtype=np.float64).reshape(-1, 2)
+    x = lonlat[:, 0] * METERS_PER_DEGREE * np.cos(np.radians(lonlat[:, 1]))
+    y = lonlat[:, 1] * METERS_PER_DEGREE
+    return np.column_stack((x, y))
+
+
+class GeoProjector:
+    """Project lon/lat to metres relative to the origin (lon, lat) and back.
+
+        projector = GeoProjector.from_scene(scene, first_lonlat)
+        outlines = projector.project_rings(rings)
+    """
+
+    def __init__(self, origin):
+        self.origin = (float(origin[0]), float(origin[1]))
+        self.offset = project_absolute([self.origin])[0]
+
+    @classmethod
+    def from_scene(cls, scene, default_origin=None):
+        """The projector of the scene origin, the origin is set to default_origin if the scene has none yet."""
+        origin = scene.get(ORIGIN_PROPERTY)
+        if origin is None:
+            if default_origin is None:
+                return None
+            origin = (float(default_origin[0]), float(default_origin[1]))
+            scene[ORIGIN_PROPERTY] = origin
+        return cls(origin)
+
+    def project(self, lonlat):
+        """(n, 2) lon/lat to (n, 3) local metres, z 0, float64."""
+        local = project_absolute(lonlat) - self.offset
+        return np.column_stack((local, np.zeros(len(local))))
+
+    def project_rings(self, rings):
+        """Project a list of lon/lat rings in one call, return a list of (n, 3) arrays."""
+        rings = [np.asarray(ring, dtype=np.float64).reshape(-1, 2) for ring in rings]
+        if not rings:
+            return []
+        points = self.project(np.concatenate(rings))
+        return np.split(points, np.cumsum([len(ring) for ring in rings])[:-1])
+
+    def unproject(self, points):
+        """(n, 2 or 3) local metres to (n, 2) lon/lat in degrees, the inverse of project()."""
+        points = np.asarray(points, dtype=np.float64)
+        points = points.reshape(-1, points.shape[-1]) if points.size else points.reshape(0, 2)
+        absolute = points[:, :2] + self.offset
+        lat = absolute[:, 1] / METERS_PER_DEGREE
+        lon = absolute[:, 0] / (METERS_PER_DEGREE * np.cos(np.radians(lat)))
+        return np.column_stack((lon, lat))
+
+
+def object_to_geo(obj, projector):
+    """lon/lat of the world-space vertices of a mesh object."""
+    mesh = obj.data
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    world = coords.reshape(-1, 3).astype(np.float64) @ matrix[:3, :3].T + matrix[:3, 3]
+    return projector.unproject(world)
@@ -0,0 +1,125 @@
+import bpy
+from .logger import log
+from .name_index import name_suffix
+
+# Renaming of IFC elements through BlenderBIM's element <-> object mapping.
+# The Blender object of an element is resolved from its IFC id and the IFC entity of an
+# object from the object itself, both in constant time, instead of searching the scene by
+# name. Every rename sets the IFC Name attribute through ifcopenshell.api and the object name
+# together, so the names stay in sync and the new names survive an IFC export. A batch of
+# renames runs as one BlenderBIM transaction, one undo step.
+# BlenderBIM is imported on first use, the addon also works without it.
+
+LONGNAME_RENAMES = {
+    'staircase': 'Staircase',
+    'elevator': 'Elevator',
+    'shaft': 'Shaft',
+}
+
+
+def get_ifc_file():
+    """The IFC file loaded in BlenderBIM, None without BlenderBIM or project."""
+    try:
+        from blenderbim.bim.ifc import IfcStore
+    except ImportError:
+        return None
+    return IfcStore.get_file()
+
+
+def get_object(element):
+    import blenderbim.tool as tool
+    return tool.Ifc.get_object(element)
+
+
+def get_entity(obj):
+    import blenderbim.tool as tool
+    return tool.Ifc.get_entity(obj)
+
+
+def rename_element(ifc_file, element, new_name):
+    """Set the IFC Name of the element and rename its object, keeping the 'IfcClass/' prefix."""
+    import ifcopenshell.api
+
+    old_name = element.Name
+    # through the API like BlenderBIM's own attribute edits, so its caches and undo see the change
+    ifcopenshell.api.run("attribute.edit_attributes", ifc_file, product=element, attributes={"Name": new_name})
+    obj = get_object(element)
+    if obj:
+        obj.name = obj.name[:len(obj.name) - len(name_suffix(obj.name))] + new_name
+    log.debug(f"rename {old_name} to {new_name}")
+    return obj
+
+
+class RenameTransaction:
+    """A batch of renames in the shape of the operator BlenderBIM's IfcStore.execute_ifc_operator() runs."""
+
+    bl_idname = "esec.rename_ifc_elements"
+    bl_label = "Rename IFC Elements"
+
+    def __init__(self, ifc_file, renames):
+        self.ifc_file = ifc_file
+        self.renames = renames
+
+    def _execute(self, context):
+        for element, new_name in self.renames:
+            rename_element(self.ifc_file, element, new_name)
+        return {'FINISHED'}
+
+
+def rename_elements(renames):
+    """Rename [(element, new name)] in one batch, return the number of renamed elements.
+
+    The batch is one BlenderBIM transaction, called from an operator with 'UNDO' the IFC
+    changes and the object renames are undone together.
+    """
+    renames = [(element, new_name) for element, new_name in renames if element.Name != new_name]
+    if not renames:
+        return 0
+    transaction = RenameTransaction(get_ifc_file(), renames)
+    from blenderbim.bim.ifc import IfcStore
+    IfcStore.execute_ifc_operator(transaction, bpy.context)
+    return len(renames)
+
+
+def rename_spaces_by_longname(ifc_file, longname_renames=LONGNAME_RENAMES):
+    """Rename the spaces with a known LongName to e.g. 'Staircase_<number>'."""
+    renames = []
+    for element in ifc_file.by_type('IfcSpace'):
+        longname = element.LongName
+        if longname and longname.lower() in longname_renames and element.Name and element.Name.startswith('Space_'):
+            # Extract the number part of the name
+            number_part = element.Name.split('_')[-1]
+            renames.append((element, '{}_{}'.format(longname_renames[longname.lower()], number_part)))
+    return rename_elements(renames)
+
+
+def pad_space_numbers(ifc_file):
+    """Rename 'Space_7' to 'Space_007' so the spaces sort by name."""
+    renames = []
+    for element in ifc_file.by_type('IfcSpace'):
+        name = element.Name or ""
+        if name.startswith('Space_') and name.split('_')[1].isdigit():
+            renames.append((element, 'Space_{:03}'.format(int(name.split('_')[1]))))
+    return rename_elements(renames)
+
+
+def rename_objects(replacements, prefix=""):
+    """Rename {object name: new name} through the IFC entities of the objects.
+
+    Only objects whose name after the last '/' starts with prefix are renamed. Returns the
+    number of renamed elements and the replacements whose object has no IFC entity, the
+    caller renames those by name.
+    """
+    has_ifc_file = get_ifc_file() is not None
+    unresolved = {}
+    renames = []
+    for object_name, new_name in replacements.items():
+        if not name_suffix(object_name).startswith(prefix):
+            continue
+        obj = bpy.data.objects.get(object_name)
+        element = get_entity(obj) if obj and has_ifc_file else None
+        if element is None:
+            unresolved[object_name] = new_name
+            continue
+        renames.append((element, new_name))
+    return rename_elements(renames), unresolved
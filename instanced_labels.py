@@ -0,0 +1,186 @@
+import bpy
+import numpy as np
+
+# Labels of a collection drawn by one object.
+# Instead of a FONT object per label, which is tessellated again on every depsgraph
+# evaluation, every distinct text is converted to a mesh once and kept as a glyph object in a
+# hidden collection. One point cloud object carries a point per label with the integer
+# attribute "label_index" and a Geometry Nodes modifier instances the glyph of every point:
+# Collection Info (Separate Children) -> Instance on Points with Pick Instance. Font size and
+# offset are inputs of the modifier, changing them re-evaluates one object.
+# Geometry Nodes has no string attributes, the texts are told apart by the index into the
+# alphabetically sorted glyph objects, their names start with the zero-padded index.
+
+LABEL_INDEX_ATTRIBUTE = "label_index"
+LABEL_TEXT_PROPERTY = "esec_label_text"
+GLYPH_INDEX_PROPERTY = "esec_label_index"
+GLYPH_COLLECTION_SUFFIX = "_glyphs"
+POINTS_SUFFIX = "_labels"
+NODE_GROUP_NAME = "ESEC Instanced Labels"
+MODIFIER_NAME = "ESEC Labels"
+DEFAULT_FONT_SIZE = 0.5
+INDEX_DIGITS = 5
+
+
+def new_socket(node_group, name, socket_type, in_out):
+    if hasattr(node_group, "interface"):
+        return node_group.interface.new_socket(name, in_out=in_out, socket_type=socket_type)
+    sockets = node_group.inputs if in_out == 'INPUT' else node_group.outputs
+    return sockets.new(socket_type, name)
+
+
+def get_input_identifier(node_group, name):
+    if hasattr(node_group, "interface"):
+        return next(item.identifier for item in node_group.interface.items_tree
+                    if item.item_type == 'SOCKET' and item.in_out == 'INPUT' and item.name == name)
+    return node_group.inputs[name].identifier
+
+
+def get_node_group():
+    """The shared Geometry Nodes group instancing the glyphs on the label points."""
+    node_group = bpy.data.node_groups.get(NODE_GROUP_NAME)
+    if node_group:
+        return node_group
+
+    node_group = bpy.data.node_groups.new(NODE_GROUP_NAME, 'GeometryNodeTree')
+    new_socket(node_group, "Geometry", 'NodeSocketGeometry', 'INPUT')
+    new_socket(node_group, "Glyphs", 'NodeSocketCollection', 'INPUT')
+    font_size = new_socket(node_group, "Font Size", 'NodeSocketFloat', 'INPUT')
+    font_size.default_value = DEFAULT_FONT_SIZE
+    font_size.min_value = 0.0
+    new_socket(node_group, "Offset", 'NodeSocketVector', 'INPUT')
+    new_socket(node_group, "Geometry", 'NodeSocketGeometry', 'OUTPUT')
+
+    nodes = node_group.nodes
+    links = node_group.links
+    group_input = nodes.new('NodeGroupInput')
+    group_output = nodes.new('NodeGroupOutput')
+
+    set_position = nodes.new('GeometryNodeSetPosition')
+    collection_info = nodes.new('GeometryNodeCollectionInfo')
+    collection_info.transform_space = 'ORIGINAL'
+    collection_info.inputs["Separate Children"].default_value = True
+    collection_info.inputs["Reset Children"].default_value = True
+    label_index = nodes.new('GeometryNodeInputNamedAttribute')
+    label_index.data_type = 'INT'
+    label_index.inputs["Name"].default_value = LABEL_INDEX_ATTRIBUTE
+    instance_on_points = nodes.new('GeometryNodeInstanceOnPoints')
+    instance_on_points.inputs["Pick Instance"].default_value = True
+
+    links.new(group_input.outputs["Geometry"], set_position.inputs["Geometry"])
+    links.new(group_input.outputs["Offset"], set_position.inputs["Offset"])
+    links.new(group_input.outputs["Glyphs"], collection_info.inputs["Collection"])
+    links.new(set_position.outputs["Geometry"], instance_on_points.inputs["Points"])
+    links.new(collection_info.outputs["Instances"], instance_on_points.inputs["Instance"])
+    # before 4.0 the node has an output per data type, all named "Attribute"
+    attribute_output = next(socket for socket in label_index.outputs if socket.name == "Attribute" and socket.enabled)
+    links.new(attribute_output, instance_on_points.inputs["Instance Index"])
+    links.new(group_input.outputs["Font Size"], instance_on_points.inputs["Scale"])
+    links.new(instance_on_points.outputs["Instances"], group_output.inputs["Geometry"])
+
+    for x, node in enumerate([group_input, set_position, collection_info, label_index, instance_on_points, group_output]):
+        node.location = (x * 200, 0)
+    return node_group
+
+
+def get_glyph_collection(collection):
+    """The hidden collection with the glyph objects of the labels of collection."""
+    name = collection.name + GLYPH_COLLECTION_SUFFIX
+    glyphs = bpy.data.collections.get(name)
+    if not glyphs:
+        glyphs = bpy.data.collections.new(name)
+    scene = bpy.context.scene
+    if glyphs.name not in scene.collection.children:
+        scene.collection.children.link(glyphs)
+        # excluded collections are not drawn, they can still be instanced
+        for view_layer in scene.view_layers:
+            if layer_collection := view_layer.layer_collection.children.get(glyphs.name):
+                layer_collection.exclude = True
+    return glyphs
+
+
+def create_glyphs(glyphs, texts):
+    """Add a glyph object for every text not in glyphs yet, return {text: glyph index}."""
+    indices = {obj[LABEL_TEXT_PROPERTY]: obj[GLYPH_INDEX_PROPERTY] for obj in glyphs.objects if GLYPH_INDEX_PROPERTY in obj}
+    missing = [text for text in dict.fromkeys(texts) if text not in indices]
+    if not missing:
+        return indices
+
+    # all texts are converted after one depsgraph evaluation
+    scene_collection = bpy.context.scene.collection
+    text_objects = []
+    for text in missing:
+        font_curve = bpy.data.curves.new(type="FONT", name="esec_glyph")
+        font_curve.body = text
+        text_obj = bpy.data.objects.new("esec_glyph", font_curve)
+        scene_collection.objects.link(text_obj)
+        text_objects.append(text_obj)
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    next_index = max(indices.values(), default=-1) + 1
+    for text, text_obj in zip(missing, text_objects):
+        mesh = bpy.data.meshes.new_from_object(text_obj.evaluated_get(depsgraph))
+        font_curve = text_obj.data
+        bpy.data.objects.remove(text_obj, do_unlink=True)
+        bpy.data.curves.remove(font_curve)
+
+        name = f"{next_index:0{INDEX_DIGITS}d}_{text}"[:63]
+        mesh.name = name
+        glyph = bpy.data.objects.new(name, mesh)
+        glyph[LABEL_TEXT_PROPERTY] = text
+        glyph[GLYPH_INDEX_PROPERTY] = next_index
+        glyphs.objects.link(glyph)
+        indices[text] = next_index
+        next_index += 1
+    return indices
+
+
+def get_label_points(collection):
+    """The point cloud object drawing the labels of collection, None if there is none yet."""
+    obj = bpy.data.objects.get(collection.name + POINTS_SUFFIX)
+    return obj if obj and obj.type == 'MESH' and MODIFIER_NAME in obj.modifiers else None
+
+
+def create_labels(collection, labels, font_size=DEFAULT_FONT_SIZE, offset=(0.0, 0.0, 0.0)):
+    """Draw the labels [(text, (x, y, z))] in collection, added to the labels already there.
+
+    Returns the point cloud object, one point per label.
+    """
+    glyphs = get_glyph_collection(collection)
+    indices = create_glyphs(glyphs, [text for text, _ in labels])
+
+    positions = np.array([location for _, location in labels], dtype=np.float64).reshape(-1, 3)
+    label_index = np.array([indices[text] for text, _ in labels], dtype=np.int32)
+
+    obj = get_label_points(collection)
+    if obj:
+        # keep the labels of earlier calls
+        old_mesh = obj.data
+        count = len(old_mesh.vertices)
+        old_positions = np.empty(count * 3, dtype=np.float32)
+        old_mesh.vertices.foreach_get("co", old_positions)
+        old_index = np.empty(count, dtype=np.int32)
+        old_mesh.attributes[LABEL_INDEX_ATTRIBUTE].data.foreach_get("value", old_index)
+        positions = np.concatenate((old_positions.reshape(-1, 3), positions))
+        label_index = np.concatenate((old_index, label_index))
+    else:
+        old_mesh = None
+        obj = bpy.data.objects.new(collection.name + POINTS_SUFFIX, bpy.data.meshes.new(collection.name + POINTS_SUFFIX))
+        collection.objects.link(obj)
+        node_group = get_node_group()
+        modifier = obj.modifiers.new(MODIFIER_NAME, 'NODES')
+        modifier.node_group = node_group
+        modifier[get_input_identifier(node_group, "Glyphs")] = glyphs
+        modifier[get_input_identifier(node_group, "Font Size")] = font_size
+        modifier[get_input_identifier(node_group, "Offset")] = tuple(offset)
+
+    mesh = bpy.data.meshes.new(collection.name + POINTS_SUFFIX)
+    mesh.vertices.add(len(positions))
+    mesh.vertices.foreach_set("co", positions.astype(np.float32).ravel())
+    attribute = mesh.attributes.new(LABEL_INDEX_ATTRIBUTE, 'INT', 'POINT')
+    attribute.data.foreach_set("value", label_index)
+    mesh.update()
+    obj.data = mesh
+    if old_mesh and not old_mesh.users:
+        bpy.data.meshes.remove(old_mesh)
+    return obj
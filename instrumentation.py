@@ -0,0 +1,228 @@
+import bpy
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+from .logger import log
+
+# Timing and object-count instrumentation of the pipeline steps.
+# Every step records its wall time, the objects and meshes created and deleted and the
+# resident memory of the process before and after the step, the report the peak memory of
+# the process over its lifetime. With profiling enabled every step is run
+# under cProfile, its stats are dumped to a .prof file and the top entries go into the
+# report. The report is written as JSON next to the .blend and shown in ESEC_PT_panel.
+
+REPORT_SUFFIX = "_esec_report.json"
+PROFILE_TOP_ENTRIES = 10
+
+# last report of this session, the panel falls back to the JSON next to the .blend
+_last_report = {"data": None}
+_loaded_report = {"path": None, "mtime": None, "data": None}
+
+
+def _windows_memory_counters():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters
+
+
+def get_memory_mb():
+    """Current resident memory of the Blender process in MB, None if it can't be read."""
+    if sys.platform == "win32":
+        counters = _windows_memory_counters()
+        return counters.WorkingSetSize / (1024 * 1024) if counters else None
+    try:
+        # resident pages are the second field
+        with open("/proc/self/statm", "r") as file:
+            pages = int(file.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        # no procfs (macOS), only the process peak is available there
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def get_peak_memory_mb():
+    """Peak resident memory over the whole lifetime of the Blender process in MB, None if it can't be read."""
+    if sys.platform == "win32":
+        counters = _windows_memory_counters()
+        return counters.PeakWorkingSetSize / (1024 * 1024) if counters else None
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _round(value):
+    return round(value, 1) if value is not None else None
+
+
+def _pointers(collection):
+    return {datablock.as_pointer() for datablock in collection}
+
+
+def _top_entries(profiler, count):
+    stats = pstats.Stats(profiler)
+    # (file, line, function) -> (primitive calls, calls, total time, cumulative time, callers)
+    entries = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:count]
+    return [
+        {
+            "function": f"{os.path.basename(file)}:{line}({function})",
+            "calls": calls,
+            "total_time": round(total_time, 6),
+            "cumulative_time": round(cumulative_time, 6),
+        }
+        for (file, line, function), (_, calls, total_time, cumulative_time, _) in entries
+    ]
+
+
+def get_report_path(blend_path=None):
+    """The report of a .blend is written next to it, the one of an unsaved file into the temp directory."""
+    blend_path = bpy.data.filepath if blend_path is None else blend_path
+    if blend_path:
+        return os.path.splitext(blend_path)[0] + REPORT_SUFFIX
+    return os.path.join(bpy.app.tempdir or os.path.expanduser("~"), "untitled" + REPORT_SUFFIX)
+
+
+class PipelineReport:
+    """Per step measurements of one pipeline run.
+
+        report = PipelineReport("Step 1-5", profile=True)
+        with report.step("move_objects_to_dxf"):
+            move_objects_to_dxf()
+        report.write()
+    """
+
+    def __init__(self, name, profile=False, path=None):
+        self.name = name
+        self.profile = profile
+        self.steps = []
+        self.started = time.time()
+        self.blend_file = bpy.data.filepath
+        self.path = path or get_report_path(self.blend_file)
+
+    @contextmanager
+    def step(self, name):
+        objects_before = _pointers(bpy.data.objects)
+        meshes_before = _pointers(bpy.data.meshes)
+        profiler = cProfile.Profile() if self.profile else None
+        record = {"name": name, "error": None}
+        memory_before = get_memory_mb()
+
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield record
+        except Exception as error:
+            record["error"] = f"{type(error).__name__}: {error}"
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+            record["wall_time"] = round(time.perf_counter() - start, 6)
+
+            # pointers of removed datablocks can be reused by new ones, so the counts are a lower bound
+            objects_after = _pointers(bpy.data.objects)
+            meshes_after = _pointers(bpy.data.meshes)
+            record["objects_created"] = len(objects_after - objects_before)
+            record["objects_deleted"] = len(objects_before - objects_after)
+            record["meshes_created"] = len(meshes_after - meshes_before)
+            record["meshes_deleted"] = len(meshes_before - meshes_after)
+            record["objects_total"] = len(objects_after)
+            # the resident memory the step left behind, the process peak can't be told apart per step
+            memory_after = get_memory_mb()
+            record["memory_before_mb"] = _round(memory_before)
+            record["memory_after_mb"] = _round(memory_after)
+            record["memory_delta_mb"] = _round(memory_after - memory_before) if None not in (memory_before, memory_after) else None
+
+            if profiler:
+                record["profile"] = self._dump_profile(profiler, name)
+            self.steps.append(record)
+            log.info(f"{name}: {record['wall_time']:.3f}s, "
+                     f"+{record['objects_created']}/-{record['objects_deleted']} objects, "
+                     f"+{record['meshes_created']}/-{record['meshes_deleted']} meshes")
+
+    def _dump_profile(self, profiler, name):
+        directory = os.path.splitext(self.path)[0] + "_profile"
+        os.makedirs(directory, exist_ok=True)
+        file_name = f"{len(self.steps):02d}_{''.join(c if c.isalnum() else '_' for c in name)}.prof"
+        path = os.path.join(directory, file_name)
+        profiler.dump_stats(path)
+        return {"file": path, "top": _top_entries(profiler, PROFILE_TOP_ENTRIES)}
+
+    @property
+    def wall_time(self):
+        return sum(step["wall_time"] for step in self.steps)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "blend_file": self.blend_file,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "blender_version": bpy.app.version_string,
+            "profile": self.profile,
+            "wall_time": round(self.wall_time, 6),
+            "process_peak_memory_mb": _round(get_peak_memory_mb()),
+            "steps": self.steps,
+        }
+
+    def write(self, path=None):
+        """Write the report as JSON, next to the .blend by default, and keep it for the panel."""
+        path = path or self.path
+        data = self.to_dict()
+        _last_report["data"] = data
+        try:
+            with open(path, "w") as file:
+                json.dump(data, file, indent=2)
+        except OSError as error:
+            log.warning(f"Could not write the pipeline report to {path}: {error}")
+            return None
+        log.info(f"Wrote pipeline report to {path}")
+        return path
+
+
+def get_last_report():
+    """The report of the last run in this session, or the one saved next to the current .blend."""
+    if _last_report["data"] and _last_report["data"]["blend_file"] == bpy.data.filepath:
+        return _last_report["data"]
+
+    path = get_report_path()
+    if not os.path.isfile(path):
+        return None
+    mtime = os.path.getmtime(path)
+    if _loaded_report["path"] != path or _loaded_report["mtime"] != mtime:
+        try:
+            with open(path, "r") as file:
+                _loaded_report["data"] = json.load(file)
+        except (OSError, ValueError):
+            _loaded_report["data"] = None
+        _loaded_report["path"] = path
+        _loaded_report["mtime"] = mtime
+    return _loaded_report["data"]
@@ -0,0 +1,71 @@
+import bpy
+import logging
+
+# Logger of the addon.
+# Step summaries (counts moved, created, skipped) are logged at INFO, details per object
+# only at DEBUG, so a pipeline run over thousands of objects doesn't flood the console.
+# The level is set in the addon preferences.
+
+LOGGER_NAME = "esec"
+LOG_LEVELS = [
+    ('DEBUG', "Debug", "Log every object that is moved, renamed or created"),
+    ('INFO', "Info", "Log one summary line per step"),
+    ('WARNING', "Warning", "Log only problems, like missing collections"),
+    ('ERROR', "Error", "Log only errors"),
+]
+
+log = logging.getLogger(LOGGER_NAME)
+
+
+def setup(level='INFO'):
+    """Attach the console handler once and set the level."""
+    if not any(getattr(handler, "esec_handler", False) for handler in log.handlers):
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("ESEC %(levelname)s: %(message)s"))
+        handler.esec_handler = True
+        log.addHandler(handler)
+        # Blender doesn't configure the root logger, don't print everything twice if someone does
+        log.propagate = False
+    set_level(level)
+
+
+def set_level(level):
+    log.setLevel(getattr(logging, level, logging.INFO))
+
+
+class Progress:
+    """Progress of a step in the window manager, i.e. the cursor / status bar.
+
+    Updates are throttled to about 100 per step. In background mode there is no
+    window manager and only the counter is kept.
+
+        with Progress(len(objects)) as progress:
+            for obj in objects:
+                ...
+                progress.step()
+    """
+
+    UPDATES = 100
+
+    def __init__(self, total):
+        self.total = max(int(total), 0)
+        self.value = 0
+        self.reported = 0
+        self.interval = max(self.total // self.UPDATES, 1)
+        self.window_manager = getattr(bpy.context, "window_manager", None) if not bpy.app.background else None
+
+    def __enter__(self):
+        if self.window_manager and self.total:
+            self.window_manager.progress_begin(0, self.total)
+        return self
+
+    def step(self, count=1):
+        self.value += count
+        if self.window_manager and self.total and self.value - self.reported >= self.interval:
+            self.reported = self.value
+            self.window_manager.progress_update(min(self.value, self.total))
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.window_manager and self.total:
+            self.window_manager.progress_end()
+        return False
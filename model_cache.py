@@ -0,0 +1,216 @@
+import bpy
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from . import config
+from .logger import log
+
+# In-session cache of the imported furniture models.
+# Every parsed .obj is kept as a prototype collection below the hidden library collection
+# and reused by create_3Dobject_from_dxf_collection() across calls and runs. A prototype is
+# keyed by model name, level of detail and the mtime of the .obj file, so an updated model
+# file is imported again. The least recently used prototypes are evicted once the library
+# holds more than config.MODEL_CACHE_MAX_ENTRIES models.
+# If the prebuilt asset library (tools/build_asset_library.py) has the model with a matching
+# checksum, its mesh is linked from the library instead of parsing the .obj.
+
+MODEL_KEY_PROPERTY = "esec_model_key"
+# part of the key, prototypes cached before the import rotation was kept are imported again
+PROTOTYPE_VERSION = 2
+
+# collection name -> None, most recently used last
+_lru = OrderedDict()
+
+# (path, mtime) -> sha256 of the .obj files and the parsed manifest, both only read on a cache miss
+_checksums = {}
+_manifest = {"mtime": None, "data": None}
+
+
+def get_model_path(model_name, high_poly):
+    directory = config.MODELS_HIGH_DIRECTORY if high_poly else config.MODELS_LOW_DIRECTORY
+    return os.path.join(os.path.dirname(__file__), directory, model_name + ".obj")
+
+
+def get_prototype_name(model_name, high_poly):
+    lod = "high" if high_poly else "low"
+    return f"{config.PROTOTYPE_COLLECTION_PREFIX}{model_name}_{lod}"
+
+
+def get_library_collection():
+    """Return the hidden library collection, create it and exclude it from all view layers if needed."""
+    library = bpy.data.collections.get(config.LIBRARY_COLLECTION_NAME)
+    if not library:
+        library = bpy.data.collections.new(config.LIBRARY_COLLECTION_NAME)
+    scene = bpy.context.scene
+    if library.name not in scene.collection.children:
+        scene.collection.children.link(library)
+        # excluded collections are not drawn, their collections can still be instanced
+        for view_layer in scene.view_layers:
+            if layer_collection := view_layer.layer_collection.children.get(library.name):
+                layer_collection.exclude = True
+    return library
+
+
+def get_prototype(model_name, high_poly):
+    """Return the prototype collection of the model, import the .obj only on a cache miss."""
+    file_loc = get_model_path(model_name, high_poly)
+    if not os.path.isfile(file_loc):
+        log.error(f"{file_loc} does not exist.")
+        return None
+
+    key = f"{model_name}|{'high' if high_poly else 'low'}|{os.path.getmtime(file_loc)}|{PROTOTYPE_VERSION}"
+    prototype_name = get_prototype_name(model_name, high_poly)
+    library = get_library_collection()
+
+    prototype_collection = bpy.data.collections.get(prototype_name)
+    if prototype_collection and prototype_collection.get(MODEL_KEY_PROPERTY) == key and len(prototype_collection.objects):
+        _touch(prototype_collection.name)
+        return prototype_collection
+
+    if prototype_collection:
+        # stale, the model file changed since it was imported
+        release(prototype_collection)
+
+    prototype = link_library_model(model_name, high_poly, file_loc) or import_model(file_loc)
+    if prototype is None:
+        return None
+
+    prototype_collection = bpy.data.collections.new(prototype_name)
+    prototype_collection[MODEL_KEY_PROPERTY] = key
+    library.children.link(prototype_collection)
+
+    # Move the imported model from the active collection into its prototype collection
+    for coll in prototype.users_collection:
+        coll.objects.unlink(prototype)
+    prototype_collection.objects.link(prototype)
+    # keep the rotation, obj_import converts the model axes (forward -Z, up Y) with it
+    prototype.location = (0, 0, 0)
+
+    _touch(prototype_collection.name)
+    evict(config.MODEL_CACHE_MAX_ENTRIES)
+    return prototype_collection
+
+
+def import_model(file_loc):
+    log.info(f"Import model {file_loc}")
+    bpy.ops.wm.obj_import(filepath=file_loc)
+    if not bpy.context.selected_objects:
+        log.error(f"Nothing imported from {file_loc}.")
+        return None
+    return bpy.context.selected_objects[0]
+
+
+def get_library_path():
+    return os.path.join(os.path.dirname(__file__), config.ASSET_LIBRARY_DIRECTORY, config.ASSET_LIBRARY_FILE)
+
+
+def load_manifest():
+    """Return the manifest of the asset library, or None if the library wasn't built."""
+    manifest_path = os.path.join(os.path.dirname(__file__), config.ASSET_LIBRARY_DIRECTORY, config.ASSET_LIBRARY_MANIFEST)
+    if not os.path.isfile(manifest_path) or not os.path.isfile(get_library_path()):
+        return None
+    mtime = os.path.getmtime(manifest_path)
+    if _manifest["mtime"] != mtime:
+        with open(manifest_path, "r") as file:
+            _manifest["data"] = json.load(file)
+        _manifest["mtime"] = mtime
+    return _manifest["data"]
+
+
+def file_sha256(path):
+    key = (path, os.path.getmtime(path))
+    if key not in _checksums:
+        sha = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                sha.update(chunk)
+        _checksums[key] = sha.hexdigest()
+    return _checksums[key]
+
+
+def link_library_model(model_name, high_poly, file_loc):
+    """Create a prototype object for the linked library mesh of the model.
+
+    Returns None if there is no library, it was built by an older version of the script,
+    the model is missing in it or the .obj changed since the library was built, the caller
+    imports the .obj then. The library meshes have the import rotation applied.
+    """
+    manifest = load_manifest()
+    if not manifest or manifest.get("version", 1) < config.ASSET_LIBRARY_VERSION:
+        return None
+    entry = manifest["models"].get("high" if high_poly else "low", {}).get(model_name)
+    if not entry or entry["sha256"] != file_sha256(file_loc):
+        return None
+
+    with bpy.data.libraries.load(get_library_path(), link=True) as (data_from, data_to):
+        if entry["mesh"] not in data_from.meshes:
+            return None
+        data_to.meshes = [entry["mesh"]]
+    mesh = data_to.meshes[0]
+    if mesh is None:
+        return None
+
+    log.info(f"Link model {model_name} from {config.ASSET_LIBRARY_FILE}")
+    prototype = bpy.data.objects.new(model_name, mesh)
+    # linked meshes are read-only, materials go into the object slots
+    for slot in prototype.material_slots:
+        slot.link = 'OBJECT'
+    return prototype
+
+
+def release(prototype_collection):
+    """Drop a prototype from the cache. Prototypes still used by instances are kept for them."""
+    _lru.pop(prototype_collection.name, None)
+    library = bpy.data.collections.get(config.LIBRARY_COLLECTION_NAME)
+    if library and prototype_collection.name in library.children:
+        library.children.unlink(prototype_collection)
+    if MODEL_KEY_PROPERTY in prototype_collection:
+        del prototype_collection[MODEL_KEY_PROPERTY]
+
+    if prototype_collection.users:
+        # still instanced, free the name for a fresh prototype
+        prototype_collection.name = prototype_collection.name + "_stale"
+        return
+
+    for obj in list(prototype_collection.objects):
+        mesh = obj.data if obj.type == 'MESH' else None
+        bpy.data.objects.remove(obj, do_unlink=True)
+        # copies placed in 'Objects' mode share the mesh, keep it for them
+        if mesh and not mesh.users:
+            bpy.data.meshes.remove(mesh)
+    bpy.data.collections.remove(prototype_collection)
+
+
+def evict(max_entries):
+    """Release the least recently used prototypes which are not instanced until max_entries are left."""
+    library = bpy.data.collections.get(config.LIBRARY_COLLECTION_NAME)
+    if not library:
+        return
+    cached = list(library.children)
+    # prototypes of an earlier session are not in the lru yet, they go first
+    cached.sort(key=lambda coll: list(_lru).index(coll.name) if coll.name in _lru else -1)
+    excess = len(cached) - max_entries
+    for prototype_collection in cached:
+        if excess <= 0:
+            break
+        # the only user is the library itself
+        if prototype_collection.users <= 1:
+            release(prototype_collection)
+            excess -= 1
+
+
+def invalidate(model_name=None):
+    """Release all cached prototypes, or only the ones of model_name."""
+    library = bpy.data.collections.get(config.LIBRARY_COLLECTION_NAME)
+    if not library:
+        return
+    for prototype_collection in list(library.children):
+        if model_name is None or prototype_collection.name in (
+                get_prototype_name(model_name, False), get_prototype_name(model_name, True)):
+            release(prototype_collection)
+
+
+def _touch(collection_name):
+    _lru.pop(collection_name, None)
+    _lru[collection_name] = None
@@ -0,0 +1,40 @@
+import bpy
+
+# Lookup of the IFC objects by their name without the IFC class prefix.
+# BlenderBIM names the objects "IfcSpace/Space_12", "IfcSlab/Floor_3", ... The renames look
+# the objects up by the part after the last '/'. The index is built in one pass over the
+# objects and kept up to date while renaming, so a rename pass is linear in the renames
+# instead of scanning and splitting every object name for every replacement.
+
+
+def name_suffix(name):
+    """The part of an object name after the last '/'."""
+    return name.rsplit('/', 1)[-1]
+
+
+class NameIndex:
+    """Objects by name suffix, only suffixes starting with prefix (e.g. 'Space_') are indexed."""
+
+    def __init__(self, prefix="", objects=None):
+        self.prefix = prefix
+        self._objects = {}
+        for obj in bpy.data.objects if objects is None else objects:
+            self._add(obj)
+
+    def _add(self, obj):
+        suffix = name_suffix(obj.name)
+        if suffix.startswith(self.prefix):
+            self._objects.setdefault(suffix, []).append(obj)
+
+    def get(self, suffix):
+        """The objects whose name ends in '/' + suffix (or is suffix), in bpy.data.objects order."""
+        return self._objects.get(suffix, [])
+
+    def rename(self, old_suffix, new_suffix):
+        """Replace old_suffix by new_suffix in the names of its objects, return the renamed objects."""
+        renamed = self._objects.pop(old_suffix, [])
+        for obj in renamed:
+            obj.name = obj.name.replace(old_suffix, new_suffix)
+            # re-read the name, Blender appends .001 if it is taken
+            self._add(obj)
+        return renamed
@@ -0,0 +1,120 @@
+import math
+import numpy as np
+
+from .footprints import extract_footprints
+
+# Batch minimum-area oriented bounding boxes for DXF footprints.
+# The minimum-area rectangle of a point set has one side collinear with an edge of its
+# convex hull (rotating calipers). All footprints are fitted at once: the point sets are
+# padded to a common length, every outline edge direction is a candidate rotation and the
+# rotated extents of all candidates are evaluated in one array expression. For convex
+# outlines (desks, tables, storage, ...) the outline edges are the hull edges and the result
+# is exact. For concave outlines it is still a tight enclosing rectangle. There is no per-point
+# Python work, sets are only grouped by point count to keep the padding small.
+
+OBB_DTYPE = np.dtype([
+    ('width', np.float64),
+    ('depth', np.float64),
+    ('rotation', np.float64),
+    ('center', np.float64, (2,)),
+    ('valid', np.bool_),
+])
+
+# upper bound for the number of (set, candidate, point) elements evaluated at once
+CHUNK_ELEMENTS = 1 << 22
+
+
+def fit_oriented_boxes(points, counts):
+    """Fit one minimum-area rectangle per point set.
+
+    points: (N, 2+) array of all sets, set i are the next counts[i] rows.
+    Returns a structured OBB_DTYPE array with width (along the rotated x axis), depth,
+    rotation around Z in [0, pi/2), center (x, y) and valid (False for empty sets).
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    result = np.zeros(len(counts), dtype=OBB_DTYPE)
+    if not len(counts):
+        return result
+
+    points = np.asarray(points, dtype=np.float64)[:, :2]
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    # group sets of similar size so the padding stays small
+    order = np.argsort(counts, kind='stable')
+    order = order[counts[order] > 0]
+    start = 0
+    while start < len(order):
+        size = int(counts[order[start]])
+        # grow the chunk while the padded candidate cube stays in budget
+        end = start + 1
+        while end < len(order):
+            size = int(counts[order[end]])
+            if (end - start + 1) * size * size > CHUNK_ELEMENTS:
+                break
+            end += 1
+        chunk = order[start:end]
+        _fit_chunk(points, offsets[chunk], counts[chunk], result, chunk)
+        start = end
+
+    return result
+
+
+def _fit_chunk(points, offsets, counts, result, indices):
+    max_count = int(counts.max())
+    column = np.arange(max_count)
+    # pad every set with its first point, which doesn't change its extents and
+    # turns the edge from the last real point to the padding into the closing edge
+    gather = offsets[:, None] + np.where(column[None, :] < counts[:, None], column[None, :], 0)
+    padded = points[gather]
+
+    # work relative to the set centroid for precision with large world coordinates
+    origin = padded.mean(axis=1, keepdims=True)
+    local = padded - origin
+
+    edges = np.roll(local, -1, axis=1) - local
+    angles = np.mod(np.arctan2(edges[..., 1], edges[..., 0]), math.pi / 2)
+    cos = np.cos(angles)[:, :, None]
+    sin = np.sin(angles)[:, :, None]
+
+    x = local[:, None, :, 0]
+    y = local[:, None, :, 1]
+    # coordinates of every point in the frame of every candidate rotation
+    rotated_x = x * cos + y * sin
+    rotated_y = y * cos - x * sin
+
+    min_x = rotated_x.min(axis=2)
+    max_x = rotated_x.max(axis=2)
+    min_y = rotated_y.min(axis=2)
+    max_y = rotated_y.max(axis=2)
+    areas = (max_x - min_x) * (max_y - min_y)
+
+    best = areas.argmin(axis=1)
+    rows = np.arange(len(indices))
+    theta = angles[rows, best]
+    width = max_x[rows, best] - min_x[rows, best]
+    depth = max_y[rows, best] - min_y[rows, best]
+    mid_x = (max_x[rows, best] + min_x[rows, best]) / 2
+    mid_y = (max_y[rows, best] + min_y[rows, best]) / 2
+
+    # rotate the rectangle center back into world space
+    cos_best = np.cos(theta)
+    sin_best = np.sin(theta)
+    center = np.stack((mid_x * cos_best - mid_y * sin_best, mid_x * sin_best + mid_y * cos_best), axis=1)
+    center += origin[:, 0, :]
+
+    # an angle just below pi/2 is the axis-aligned frame with width and depth swapped
+    snap = (math.pi / 2 - theta) < 1e-9
+    theta = np.where(snap, 0.0, theta)
+    width, depth = np.where(snap, depth, width), np.where(snap, width, depth)
+
+    result['width'][indices] = width
+    result['depth'][indices] = depth
+    result['rotation'][indices] = theta
+    result['center'][indices] = center
+    result['valid'][indices] = True
+
+
+def fit_footprint_boxes(objects):
+    """Fit the oriented boxes of the world-space spline points of a batch of DXF curve objects."""
+    batch = extract_footprints(objects)
+    return fit_oriented_boxes(batch.world_points(), batch.counts)
@@ -1,4 +1,11 @@
 import bpy
+from . import logger
+from . import archilogic_client
+
+
+def update_log_level(self, context):
+    logger.set_level(self.log_level)
+
 
 class ESECAddonPreferences(bpy.types.AddonPreferences):
     bl_idname = __package__
@@ -10,13 +17,57 @@ class ESECAddonPreferences(bpy.types.AddonPreferences):
         subtype='PASSWORD',   # This will mask the input, use 'TEXT' if you want it visible
     )
 
+    archilogic_base_url: bpy.props.StringProperty(
+        name="Archiologic API URL",
+        description="Base URL of the Archiologic API, e.g. a local stub server for testing",
+        default=archilogic_client.DEFAULT_BASE_URL,
+    )
+
+    archilogic_workers: bpy.props.IntProperty(
+        name="Parallel Requests",
+        description="Number of spaces downloaded at the same time",
+        default=archilogic_client.DEFAULT_MAX_WORKERS,
+        min=1,
+        max=32,
+    )
+
+    archilogic_rate_limit: bpy.props.FloatProperty(
+        name="Requests per Second",
+        description="Upper limit of the Archiologic API requests per second, 0 for no limit",
+        default=archilogic_client.DEFAULT_RATE_LIMIT,
+        min=0.0,
+    )
+
+    archilogic_cache_ttl: bpy.props.FloatProperty(
+        name="Cache Lifetime (hours)",
+        description="Cached floor data younger than this is used without asking the Archiologic API, older data is revalidated",
+        default=24.0,
+        min=0.0,
+    )
+
+    log_level: bpy.props.EnumProperty(
+        name="Log Level",
+        description="Verbosity of the console output, 'Debug' logs every single object",
+        items=logger.LOG_LEVELS,
+        default='INFO',
+        update=update_log_level,
+    )
+
     def draw(self, context):
         layout = self.layout
         layout.prop(self, "archiologic_token")
+        layout.prop(self, "archilogic_base_url")
+        row = layout.row()
+        row.prop(self, "archilogic_workers")
+        row.prop(self, "archilogic_rate_limit")
+        layout.prop(self, "archilogic_cache_ttl")
+        layout.prop(self, "log_level")
 
 
 def register():
     bpy.utils.register_class(ESECAddonPreferences)
+    addon = bpy.context.preferences.addons.get(__package__)
+    logger.setup(addon.preferences.log_level if addon else 'INFO')
 
 
 def unregister():
@@ -0,0 +1,59 @@
+import bpy
+import bmesh
+
+# Shared primitive meshes for the generated furniture (table tops, stools, boxes).
+# One unit mesh datablock per category, every object only carries its own transform.
+# The category is the target collection, so assign_collection_materials() can set
+# the collection material on the shared mesh without affecting other collections.
+
+CUBE_MESH_PREFIX = "ESEC_unit_cube"
+CYLINDER_MESH_PREFIX = "ESEC_unit_cylinder"
+
+
+def ensure_collection(collection_name):
+    """Return the collection, create it below the scene collection if it doesn't exist."""
+    collection = bpy.data.collections.get(collection_name)
+    if not collection:
+        collection = bpy.data.collections.new(collection_name)
+        bpy.context.scene.collection.children.link(collection)
+    return collection
+
+
+def _new_unit_mesh(name, build):
+    mesh = bpy.data.meshes.new(name)
+    bm = bmesh.new()
+    bm.loops.layers.uv.new("UVMap")
+    build(bm)
+    bm.to_mesh(mesh)
+    bm.free()
+    return mesh
+
+
+def get_unit_cube_mesh(category):
+    """Cube of size 1 centered on the origin, like primitive_cube_add(size=1)."""
+    name = f"{CUBE_MESH_PREFIX}_{category}"
+    mesh = bpy.data.meshes.get(name)
+    if mesh is None:
+        mesh = _new_unit_mesh(name, lambda bm: bmesh.ops.create_cube(bm, size=1.0, calc_uvs=True))
+    return mesh
+
+
+def get_unit_cylinder_mesh(category, vertices=32):
+    """Cylinder with radius 1 and depth 1 centered on the origin, scale it to the wanted radius and depth."""
+    name = f"{CYLINDER_MESH_PREFIX}_{vertices}_{category}"
+    mesh = bpy.data.meshes.get(name)
+    if mesh is None:
+        mesh = _new_unit_mesh(name, lambda bm: bmesh.ops.create_cone(
+            bm, cap_ends=True, cap_tris=False, segments=vertices,
+            radius1=1.0, radius2=1.0, depth=1.0, calc_uvs=True))
+    return mesh
+
+
+def new_primitive_object(name, mesh, collection, location, rotation=(0.0, 0.0, 0.0), scale=(1.0, 1.0, 1.0)):
+    """Create an object for a shared mesh and link it straight into the collection."""
+    obj = bpy.data.objects.new(name, mesh)
+    obj.location = location
+    obj.rotation_euler = rotation
+    obj.scale = scale
+    collection.objects.link(obj)
+    return obj
@@ -66,12 +66,34 @@ class ESECAddonProperties(bpy.types.PropertyGroup):
         max=2
     )  
 
+    furniture_placement: bpy.props.EnumProperty(
+        name="Furniture Placement",
+        description="How the 3D furniture models are placed",
+        items=[
+            ('COPY', "Objects", "Place a full object copy of the model for every DXF object"),
+            ('INSTANCE', "Instances", "Place lightweight collection instances of one hidden prototype per model"),
+        ],
+        default='COPY'
+    )
+
     show_settings: bpy.props.BoolProperty(
         name="Settings",
         description="Show or hide the settings",
         default=False,
     )
 
+    show_pipeline_report: bpy.props.BoolProperty(
+        name="Pipeline Report",
+        description="Show or hide the timing report of the last 'Step 1-5 at once' run",
+        default=False,
+    )
+
+    profile_pipeline: bpy.props.BoolProperty(
+        name="Profile Steps",
+        description="Run every pipeline step under cProfile and write the stats next to the report (slower)",
+        default=False,
+    )
+
 #
 # Add additional functions or classes here
 #
@@ -0,0 +1,203 @@
+import re
+import statistics
+import numpy as np
+from mathutils import Vector
+
+# Matching of the DXF room-name texts to the IFC spaces.
+# Every text body is cleaned once and every space gets its world-space bounds once. The
+# text positions are bucketed in a uniform grid with about one space per cell, so a space
+# only tests the texts of the cells its bounds overlap instead of every text of the floor.
+# The bounds are only the prefilter: the footprint outline of every space is read once with
+# foreach_get and all remaining (space, text) pairs are decided at once by a vectorized
+# even-odd crossing test, so labels of neighbouring rooms inside the bound box of an L-shaped
+# or rotated room don't match it.
+
+# faces with a world normal below -NORMAL_Z are the bottom of the space
+NORMAL_Z = 0.5
+# upper bound for the number of (pair, edge) elements tested at once
+CHUNK_ELEMENTS = 1 << 22
+
+
+def clean_text(body):
+    """The text body with line breaks as spaces, without special characters and repeated whitespace."""
+    cleaned_text = re.sub(r'[^A-Za-z0-9\s.]', '', body.replace('\n', ' '))
+    return re.sub(r'\s{2,}', ' ', cleaned_text)  # Remove multiple consecutive whitespaces
+
+
+def get_world_bounds(obj):
+    """(min_x, min_y, max_x, max_y) of the world-space bound box corners of obj."""
+    corners = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
+    xs = [corner.x for corner in corners]
+    ys = [corner.y for corner in corners]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def read_footprint_edges(obj):
+    """World XY edges (n, 2, 2) of the downward faces of a mesh object, None without such faces.
+
+    The edges are taken from the face loops, an edge between two bottom faces is there twice
+    and its two crossings cancel out in the even-odd test, so no outline has to be traced.
+    """
+    if obj.type != 'MESH' or not len(obj.data.polygons):
+        return None
+    mesh = obj.data
+    matrix = np.array(obj.matrix_world)
+    try:
+        inverse = np.linalg.inv(matrix[:3, :3])
+    except np.linalg.LinAlgError:
+        return None
+
+    coords = np.empty(len(mesh.vertices) * 3)
+    mesh.vertices.foreach_get("co", coords)
+    normals = np.empty(len(mesh.polygons) * 3)
+    mesh.polygons.foreach_get("normal", normals)
+    loop_start = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    loop_total = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    vertex_index = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", vertex_index)
+
+    # normals transform with the inverse transpose, as row vectors n @ M^-1
+    normal_z = (normals.reshape(-1, 3) @ inverse)[:, 2]
+    faces = normal_z < -NORMAL_Z
+    if not faces.any():
+        # a flat space without a bottom, use its upward faces
+        faces = normal_z > NORMAL_Z
+        if not faces.any():
+            return None
+
+    starts = np.repeat(loop_start[faces], loop_total[faces])
+    totals = np.repeat(loop_total[faces], loop_total[faces])
+    local = np.arange(len(starts)) - np.repeat(np.cumsum(loop_total[faces]) - loop_total[faces], loop_total[faces])
+    world = coords.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+    start_points = world[vertex_index[starts + local], :2]
+    end_points = world[vertex_index[starts + (local + 1) % totals], :2]
+    return np.stack((start_points, end_points), axis=1)
+
+
+def points_in_outlines(points, outline_index, outlines):
+    """Even-odd test of points[i] against the edges outlines[outline_index[i]], for all i at once."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    outline_index = np.asarray(outline_index, dtype=np.int64)
+    inside = np.zeros(len(points), dtype=bool)
+    if not len(points):
+        return inside
+
+    edge_counts = np.array([len(edges) for edges in outlines], dtype=np.int64)
+    edge_offsets = np.concatenate(([0], np.cumsum(edge_counts)[:-1]))
+    all_edges = np.concatenate(outlines) if edge_counts.sum() else np.empty((0, 2, 2))
+    pair_counts = edge_counts[outline_index]
+
+    start = 0
+    while start < len(points):
+        # take pairs until the chunk holds CHUNK_ELEMENTS edges, at least one pair
+        cumulative = np.cumsum(pair_counts[start:])
+        end = start + max(1, int(np.searchsorted(cumulative, CHUNK_ELEMENTS, side='right')))
+        counts = pair_counts[start:end]
+        pair = np.repeat(np.arange(start, end), counts)
+        if len(pair):
+            local = np.arange(len(pair)) - np.repeat(np.cumsum(counts) - counts, counts)
+            edges = all_edges[np.repeat(edge_offsets[outline_index[start:end]], counts) + local]
+            x, y = points[pair, 0], points[pair, 1]
+            x1, y1 = edges[:, 0, 0], edges[:, 0, 1]
+            x2, y2 = edges[:, 1, 0], edges[:, 1, 1]
+            straddles = (y1 > y) != (y2 > y)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                crossing_x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+            crossings = straddles & (x < crossing_x)
+            has_edges = counts > 0
+            chunk_offsets = (np.cumsum(counts) - counts)[has_edges]
+            inside[start:end][has_edges] = np.add.reduceat(crossings.astype(np.int64), chunk_offsets) % 2 == 1
+        start = end
+    return inside
+
+
+class SpaceTextMatcher:
+    """Find the texts containing one of the keywords inside each space.
+
+        matcher = SpaceTextMatcher(spaces, text_objects, ['Parking'])
+        for space, texts_found, matching_text in matcher.matches():
+            ...
+    """
+
+    def __init__(self, spaces, text_objects, keywords):
+        self.spaces = list(spaces)
+        self.bounds = [get_world_bounds(space) for space in self.spaces]
+        # spaces without a footprint (no mesh, no horizontal faces) fall back to their bounds
+        self.outlines = [read_footprint_edges(space) for space in self.spaces]
+
+        # only texts with a keyword can ever match, clean and locate them once
+        self.texts = []
+        self.positions = []
+        for text_obj in text_objects:
+            cleaned_text = clean_text(text_obj.data.body)
+            if any(keyword in cleaned_text for keyword in keywords):
+                position = text_obj.matrix_world.translation
+                self.texts.append(cleaned_text)
+                self.positions.append((position.x, position.y))
+
+        # about one space per cell, large spaces just overlap more cells
+        sizes = [max(max_x - min_x, max_y - min_y) for min_x, min_y, max_x, max_y in self.bounds]
+        median_size = statistics.median(sizes) if sizes else 0.0
+        self.cell_size = median_size if median_size > 0 else 1.0
+        self.grid = {}
+        for index, (x, y) in enumerate(self.positions):
+            self.grid.setdefault(self._cell(x, y), []).append(index)
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def candidates(self, bounds):
+        """Indices of the texts in the grid cells overlapped by bounds."""
+        min_x, min_y, max_x, max_y = bounds
+        cell_min_x, cell_min_y = self._cell(min_x, min_y)
+        cell_max_x, cell_max_y = self._cell(max_x, max_y)
+        # don't walk more cells than there are texts for degenerate huge bounds
+        if (cell_max_x - cell_min_x + 1) * (cell_max_y - cell_min_y + 1) > len(self.grid):
+            return [index for cell in self.grid.values() for index in cell]
+        return [
+            index
+            for cell_x in range(cell_min_x, cell_max_x + 1)
+            for cell_y in range(cell_min_y, cell_max_y + 1)
+            for index in self.grid.get((cell_x, cell_y), ())
+        ]
+
+    def texts_in_space(self, space_index):
+        """Indices of the texts inside the XY bounds of the space, in text order."""
+        min_x, min_y, max_x, max_y = self.bounds[space_index]
+        return sorted(
+            index
+            for index in self.candidates(self.bounds[space_index])
+            if min_x <= self.positions[index][0] <= max_x and min_y <= self.positions[index][1] <= max_y
+        )
+
+    def texts_per_space(self):
+        """Per space the sorted indices of the texts inside its footprint."""
+        found = [self.texts_in_space(space_index) for space_index in range(len(self.spaces))]
+
+        # decide all prefiltered pairs of spaces with a footprint in one batch
+        outline_ids = {}
+        outlines = []
+        pairs = []
+        for space_index, texts in enumerate(found):
+            if self.outlines[space_index] is not None and texts:
+                outline_ids[space_index] = len(outlines)
+                outlines.append(self.outlines[space_index])
+                pairs.extend((space_index, text_index) for text_index in texts)
+        if not pairs:
+            return found
+
+        points = [self.positions[text_index] for _, text_index in pairs]
+        inside = points_in_outlines(points, [outline_ids[space_index] for space_index, _ in pairs], outlines)
+        for space_index in outline_ids:
+            found[space_index] = []
+        for (space_index, text_index), is_inside in zip(pairs, inside):
+            if is_inside:
+                found[space_index].append(text_index)
+        return found
+
+    def matches(self):
+        """Yield (space, number of texts found, last matching text) for every space in the given order."""
+        for space, found in zip(self.spaces, self.texts_per_space()):
+            yield space, len(found), self.texts[found[-1]] if found else ""
@@ -0,0 +1,251 @@
+# Local stub of the Archilogic API for testing the fetch engine without network or token.
+#
+# Usage (plain Python with requests installed, no Blender needed):
+#   python tools/archilogic_stub.py --spaces 300 --latency 0.05 --flaky 7
+#   python tools/archilogic_stub.py --cache
+#   python tools/archilogic_stub.py --serve --port 8765
+#
+# Without --serve the stub starts in a thread, archilogic_client.py fetches a synthetic floor
+# from it and the result is checked: every space, in resourceRelations.spaces order, every
+# injected failure retried. --cache fetches through archilogic_cache.py instead, in a
+# temporary directory, and checks that a second fetch only revalidates and an offline fetch
+# sends no request. With --serve it only serves, set the "Archiologic API URL" in the addon
+# preferences to http://127.0.0.1:<port>/v2 to use it from Blender.
+
+import argparse
+import hashlib
+import importlib
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+ADDON_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FLOOR_ID = "stub-floor"
+# somewhere in Frankfurt
+ORIGIN_LAT = 50.11
+ORIGIN_LON = 8.68
+SPACE_USAGES = ["office", "meetingRoom", "kitchen", "storage", "staircase", "elevator"]
+
+
+def load_module(name):
+    """A module of the addon without running its __init__.py, which needs bpy."""
+    package = "esec_addon_modules"
+    if package not in sys.modules:
+        module = types.ModuleType(package)
+        module.__path__ = [ADDON_DIRECTORY]
+        sys.modules[package] = module
+    return importlib.import_module(f"{package}.{name}")
+
+
+def make_space(index, columns=20, size=4.0):
+    """geo-json feature of a size x size metre room in a grid of rooms."""
+    lat_per_m = 1 / 111320
+    lon_per_m = 1 / (111320 * math.cos(math.radians(ORIGIN_LAT)))
+    x, y = (index % columns) * size, (index // columns) * size
+    corners = [(x, y), (x + size, y), (x + size, y + size), (x, y + size), (x, y)]
+    return {
+        "type": "Feature",
+        "id": f"space-{index:05d}",
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[[ORIGIN_LON + cx * lon_per_m, ORIGIN_LAT + cy * lat_per_m] for cx, cy in corners]],
+        },
+        "properties": {
+            "name": f"Room {index:03d}",
+            "usage": SPACE_USAGES[index % len(SPACE_USAGES)],
+        },
+    }
+
+
+class StubState:
+    def __init__(self, space_count, latency, flaky):
+        self.spaces = {space["id"]: space for space in (make_space(index) for index in range(space_count))}
+        self.latency = latency
+        self.flaky = flaky
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.not_modified = 0
+        self.attempts = {}
+        self.active = 0
+        self.max_active = 0
+
+    def floor(self):
+        return {"id": FLOOR_ID, "properties": {"name": "Stub Floor"}, "resourceRelations": {"spaces": list(self.spaces)}}
+
+    def should_fail(self, space_id):
+        """Every flaky-th space fails its first attempt with a 503."""
+        with self.lock:
+            attempt = self.attempts.get(space_id, 0)
+            self.attempts[space_id] = attempt + 1
+            fail = self.flaky > 0 and int(space_id.split("-")[1]) % self.flaky == 0 and attempt == 0
+            if fail:
+                self.failures += 1
+            return fail
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status, data, headers=None):
+            body = json.dumps(data).encode()
+            if status == 200:
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    with state.lock:
+                        state.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                headers = dict(headers or {}, ETag=etag)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            with state.lock:
+                state.requests += 1
+                state.active += 1
+                state.max_active = max(state.max_active, state.active)
+            try:
+                time.sleep(state.latency)
+                self.handle_get(urlparse(self.path).path.strip("/").split("/"))
+            finally:
+                with state.lock:
+                    state.active -= 1
+
+        def handle_get(self, parts):
+            if not self.headers.get("Authorization", "").startswith("AL-Secret-Token "):
+                self.send_json(401, {"error": "missing token"})
+            elif parts == ["v2", "floor", FLOOR_ID]:
+                self.send_json(200, state.floor())
+            elif len(parts) == 4 and parts[:2] == ["v2", "space"] and parts[3] == "geo-json" and parts[2] in state.spaces:
+                if state.should_fail(parts[2]):
+                    self.send_json(503, {"error": "injected failure"}, {"Retry-After": "0"})
+                else:
+                    self.send_json(200, state.spaces[parts[2]])
+            else:
+                self.send_json(404, {"error": "not found"})
+
+    return Handler
+
+
+def start_server(state, port=0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_client(server, workers, rate_limit):
+    archilogic_client = load_module("archilogic_client")
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v2"
+    return archilogic_client.ArchilogicClient("stub", base_url=base_url, max_workers=workers, rate_limit=rate_limit, backoff=0.01)
+
+
+def check_spaces(state, floor, spaces):
+    expected = floor["resourceRelations"]["spaces"]
+    errors = []
+    if [space["id"] for space in spaces] != expected:
+        errors.append("spaces are not in resourceRelations.spaces order")
+    if spaces != [state.spaces[space_id] for space_id in expected]:
+        errors.append("space data differs from the stub")
+    return errors
+
+
+def check_cache(state, server, workers, rate_limit):
+    archilogic_cache = load_module("archilogic_cache")
+    with tempfile.TemporaryDirectory() as directory:
+        # ttl 0, every online fetch revalidates
+        cache = archilogic_cache.ArchilogicCache(directory, 0)
+        runs = {}
+        for run in ["first", "revalidate", "offline"]:
+            requests_before = state.requests
+            start = time.perf_counter()
+            if run == "offline":
+                floor, spaces = cache.get_floor_spaces(FLOOR_ID)
+            else:
+                with get_client(server, workers, rate_limit) as client:
+                    floor, spaces = cache.get_floor_spaces(FLOOR_ID, client)
+            runs[run] = {
+                "seconds": round(time.perf_counter() - start, 3),
+                "requests": state.requests - requests_before,
+                "stats": dict(cache.stats),
+                "errors": check_spaces(state, floor, spaces),
+            }
+
+    errors = [f"{run}: {error}" for run, result in runs.items() for error in result["errors"]]
+    space_count = len(state.spaces)
+    if runs["revalidate"]["stats"].get("revalidated") != space_count + 1:
+        errors.append("the second fetch didn't revalidate every entry")
+    if runs["offline"]["requests"]:
+        errors.append("the offline fetch sent requests")
+    print(json.dumps({"spaces": space_count, "not_modified": state.not_modified, "runs": runs, "errors": errors}, indent=2))
+    return not errors
+
+
+def check(state, server, workers, rate_limit):
+    start = time.perf_counter()
+    with get_client(server, workers, rate_limit) as client:
+        floor, spaces = client.get_floor_spaces(FLOOR_ID)
+    elapsed = time.perf_counter() - start
+
+    expected = floor["resourceRelations"]["spaces"]
+    errors = check_spaces(state, floor, spaces)
+    if state.requests != 1 + len(expected) + state.failures:
+        errors.append(f"{state.requests} requests, expected {1 + len(expected) + state.failures}")
+
+    print(json.dumps({
+        "spaces": len(spaces),
+        "seconds": round(elapsed, 3),
+        "requests": state.requests,
+        "injected_failures": state.failures,
+        "max_parallel_requests": state.max_active,
+        "errors": errors,
+    }, indent=2))
+    return not errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spaces", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per response")
+    parser.add_argument("--flaky", type=int, default=7, help="every n-th space fails once with a 503, 0 for none")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second of the client, 0 for no limit")
+    parser.add_argument("--cache", action="store_true", help="check the on-disk cache instead of the client alone")
+    parser.add_argument("--serve", action="store_true", help="only serve until Ctrl+C")
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args()
+
+    state = StubState(args.spaces, args.latency, args.flaky)
+    server = start_server(state, args.port)
+    if args.serve:
+        print(f"Serving floor '{FLOOR_ID}' with {args.spaces} spaces at http://127.0.0.1:{server.server_address[1]}/v2")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    ok = (check_cache if args.cache else check)(state, server, args.workers, args.rate_limit)
+    server.shutdown()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# Process many floors headless, fanned out to a pool of background Blender processes.
+#
+# Usage:
+#   blender --background --python tools/batch_process.py -- --input floors/ --output out/
+#   blender --background --python tools/batch_process.py -- --manifest floors.json --output out/ --workers 4
+#
+# With --input every <name>.dxf is paired with the <name>.ifc of the same directory.
+# A manifest is a JSON list of {"name": ..., "dxf": ..., "ifc": ...}, relative paths are
+# relative to the manifest. Every floor is run in its own Blender process: import the DXF
+# and the IFC, run the same steps as "Step 1-5 at once" and save out/<name>.blend next to
+# its pipeline report and log. out/batch_summary.json lists success and timing per floor.
+#
+# The addon, the "Import-Export: AutoCAD DXF" addon and BlenderBIM have to be installed,
+# the workers load the user preferences to enable them.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bpy
+
+ADDON_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUMMARY_FILE = "batch_summary.json"
+# same as instrumentation.REPORT_SUFFIX, the controller doesn't load the addon
+REPORT_SUFFIX = "_esec_report.json"
+LOG_TAIL_LINES = 20
+
+
+def parse_args(argv):
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(prog="blender --background --python tools/batch_process.py --")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--input", help="directory with <name>.dxf / <name>.ifc pairs")
+    source.add_argument("--manifest", help="JSON list of {name, dxf, ifc}")
+    parser.add_argument("--output", help="directory for the .blend files, reports and logs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of parallel Blender processes (default: number of cores)")
+    parser.add_argument("--timeout", type=float, default=3600, help="seconds per floor before the worker is killed")
+    parser.add_argument("--instances", action="store_true", help="place the furniture as collection instances")
+    parser.add_argument("--high-poly", action="store_true", help="use the high poly furniture models")
+    parser.add_argument("--profile", action="store_true", help="run every pipeline step under cProfile")
+    # worker mode, set by the controller
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--name", help=argparse.SUPPRESS)
+    parser.add_argument("--dxf", help=argparse.SUPPRESS)
+    parser.add_argument("--ifc", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if not args.worker and not (args.input or args.manifest) or not args.output:
+        parser.error("--input or --manifest and --output are required")
+    return args
+
+
+def find_floors(args):
+    """Return the floors as [{"name", "dxf", "ifc"}] with absolute paths."""
+    if args.manifest:
+        base = os.path.dirname(os.path.abspath(args.manifest))
+        with open(args.manifest, "r") as file:
+            entries = json.load(file)
+        return [
+            {
+                "name": entry.get("name") or os.path.splitext(os.path.basename(entry["dxf"]))[0],
+                "dxf": os.path.join(base, entry["dxf"]),
+                "ifc": os.path.join(base, entry["ifc"]),
+            }
+            for entry in entries
+        ]
+
+    files = {}
+    for file_name in sorted(os.listdir(args.input)):
+        stem, extension = os.path.splitext(file_name)
+        if extension.lower() in (".dxf", ".ifc"):
+            files.setdefault(stem, {})[extension.lower()[1:]] = os.path.join(os.path.abspath(args.input), file_name)
+
+    floors = []
+    for stem, pair in files.items():
+        if "dxf" in pair and "ifc" in pair:
+            floors.append({"name": stem, "dxf": pair["dxf"], "ifc": pair["ifc"]})
+        else:
+            print(f"Skip {stem}: no matching {'.ifc' if 'dxf' in pair else '.dxf'}")
+    return floors
+
+
+def run_floor(floor, args):
+    """Run one floor in a worker process and return its summary entry."""
+    blend_path = os.path.join(args.output, floor["name"] + ".blend")
+    log_path = os.path.join(args.output, floor["name"] + ".log")
+    command = [
+        bpy.app.binary_path, "--background", "--python-exit-code", "1", "--python", os.path.abspath(__file__), "--",
+        "--worker", "--name", floor["name"], "--dxf", floor["dxf"], "--ifc", floor["ifc"], "--output", args.output,
+    ]
+    command += [flag for flag, enabled in (("--instances", args.instances), ("--high-poly", args.high_poly),
+                                           ("--profile", args.profile)) if enabled]
+
+    entry = dict(floor, blend=blend_path, log=log_path, report=None, status="failed", returncode=None, error=None)
+    start = time.perf_counter()
+    with open(log_path, "w") as log_file:
+        try:
+            result = subprocess.run(command, stdout=log_file, stderr=subprocess.STDOUT, timeout=args.timeout)
+            entry["returncode"] = result.returncode
+        except subprocess.TimeoutExpired:
+            entry["error"] = f"timeout after {args.timeout:.0f}s"
+    entry["wall_time"] = round(time.perf_counter() - start, 3)
+
+    report_path = os.path.splitext(blend_path)[0] + REPORT_SUFFIX
+    if os.path.isfile(report_path):
+        entry["report"] = report_path
+        with open(report_path, "r") as file:
+            report = json.load(file)
+        entry["pipeline_time"] = report["wall_time"]
+        entry["process_peak_memory_mb"] = report.get("process_peak_memory_mb")
+        entry["error"] = entry["error"] or next((step["error"] for step in report["steps"] if step["error"]), None)
+
+    if entry["returncode"] == 0 and os.path.isfile(blend_path) and not entry["error"]:
+        entry["status"] = "ok"
+    elif not entry["error"]:
+        with open(log_path, "r", errors="replace") as file:
+            entry["error"] = "".join(file.readlines()[-LOG_TAIL_LINES:])
+    print(f"{floor['name']}: {entry['status']} in {entry['wall_time']:.1f}s")
+    return entry
+
+
+def run_controller(args):
+    floors = find_floors(args)
+    args.output = os.path.abspath(args.output)
+    os.makedirs(args.output, exist_ok=True)
+    workers = max(1, min(args.workers, len(floors)))
+    print(f"Process {len(floors)} floors with {workers} workers")
+
+    start = time.perf_counter()
+    # the threads only wait for their Blender process, the work runs in parallel processes
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        entries = list(executor.map(lambda floor: run_floor(floor, args), floors))
+
+    summary = {
+        "workers": workers,
+        "wall_time": round(time.perf_counter() - start, 3),
+        "succeeded": sum(entry["status"] == "ok" for entry in entries),
+        "failed": sum(entry["status"] != "ok" for entry in entries),
+        "floors": entries,
+    }
+    summary_path = os.path.join(args.output, SUMMARY_FILE)
+    with open(summary_path, "w") as file:
+        json.dump(summary, file, indent=2)
+    print(f"{summary['succeeded']} ok, {summary['failed']} failed in {summary['wall_time']:.1f}s, wrote {summary_path}")
+    return summary["failed"] == 0
+
+
+def enable_addon():
+    """Return the package name of this addon, enable it if it isn't already."""
+    import addon_utils
+
+    for module in addon_utils.modules():
+        if os.path.normcase(os.path.realpath(os.path.dirname(module.__file__))) == os.path.normcase(os.path.realpath(ADDON_DIRECTORY)):
+            addon_utils.enable(module.__name__, default_set=False)
+            return module.__name__
+    raise RuntimeError(f"The addon in {ADDON_DIRECTORY} is not installed in this Blender")
+
+
+def run_worker(args):
+    package = enable_addon()
+    ui = sys.modules[package + ".ui"]
+
+    bpy.ops.wm.read_homefile(use_empty=True)
+    scene = bpy.context.scene
+    scene.esec_addon_props.furniture_placement = 'INSTANCE' if args.instances else 'COPY'
+    scene.use_high_poly_models = args.high_poly
+
+    bpy.ops.import_scene.dxf(filepath=args.dxf)
+    if 'dxf' not in bpy.data.collections:
+        scene.collection.children.link(bpy.data.collections.new('dxf'))
+    bpy.ops.import_ifc.bim(filepath=args.ifc)
+
+    blend_path = os.path.join(os.path.abspath(args.output), args.name + ".blend")
+    ui.run_pipeline(profile=args.profile, report_path=os.path.splitext(blend_path)[0] + REPORT_SUFFIX)
+    bpy.ops.wm.save_as_mainfile(filepath=blend_path)
+
+
+def main():
+    args = parse_args(sys.argv)
+    if args.worker:
+        run_worker(args)
+        return
+    if not run_controller(args):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# Reproducible performance benchmark of the pipeline functions on synthetic floors.
+#
+# Usage:
+#   blender --background --python tools/benchmark.py -- --sizes 100 1000 10000 --output benchmark.json
+#   blender --background --python tools/benchmark.py -- --cases create3D_Objects --compare old.json
+#
+# Every case runs on a fresh synthetic floor (tools/synthetic_floor.py) of every size. The
+# steps a case depends on run untimed as setup, only the case itself is measured. Results
+# are written as JSON, --compare prints the change of the median times against an older run.
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from batch_process import enable_addon  # noqa: E402
+from synthetic_floor import generate_floor  # noqa: E402
+
+DEFAULT_SIZES = [100, 1000, 10000]
+SENSOR_TYPE_NAME = "Motion"
+# create_device places one sensor per call, fewer of them keep the large floors in reach
+OBJECTS_PER_DEVICE = 10
+
+
+def prepare_dxf(addon):
+    addon.ui.move_objects_to_dxf()
+    addon.ui.move_unwanted_objects("dxf")
+    addon.ui.rename_objects_dxf("dxf")
+
+
+def prepare_furniture(addon):
+    prepare_dxf(addon)
+    addon.ui.create_tabletops_from_dxf_collection()
+    addon.ui.create3D_Objects()
+
+
+def prepare_sensor_type(addon):
+    sensor_type = bpy.context.scene.sensor_types.add()
+    sensor_type.name = SENSOR_TYPE_NAME
+
+
+def place_devices(addon, size):
+    count = max(1, size // OBJECTS_PER_DEVICE)
+    for number in range(1, count + 1):
+        addon.sensors.create_device(number % 100, number // 100, SENSOR_TYPE_NAME)
+    return count
+
+
+def place_devices_batch(addon, size):
+    count = max(1, size // OBJECTS_PER_DEVICE)
+    addon.sensors.create_devices([(number % 100, number // 100, SENSOR_TYPE_NAME) for number in range(1, count + 1)])
+    return count
+
+
+# name -> (untimed setup, measured function), the measured function returns the number of items it handled
+CASES = {
+    "move_unwanted_objects": (
+        lambda addon: addon.ui.move_objects_to_dxf(),
+        lambda addon, size: addon.ui.move_unwanted_objects("dxf"),
+    ),
+    "rename_objects_dxf": (
+        lambda addon: (addon.ui.move_objects_to_dxf(), addon.ui.move_unwanted_objects("dxf")),
+        lambda addon, size: addon.ui.rename_objects_dxf("dxf"),
+    ),
+    "create_tabletops_from_dxf_collection": (
+        prepare_dxf,
+        lambda addon, size: addon.ui.create_tabletops_from_dxf_collection(),
+    ),
+    "create3D_Objects": (
+        prepare_dxf,
+        lambda addon, size: addon.ui.create3D_Objects(),
+    ),
+    "assign_collection_materials": (
+        prepare_furniture,
+        lambda addon, size: addon.ui.assign_collection_materials(),
+    ),
+    "print_spaces_and_texts": (
+        None,
+        lambda addon, size: addon.helper.print_spaces_and_texts(),
+    ),
+    "create_device": (
+        prepare_sensor_type,
+        place_devices,
+    ),
+    "create_devices": (
+        prepare_sensor_type,
+        place_devices_batch,
+    ),
+}
+
+
+def load_addon():
+    package = enable_addon()
+    addon = SimpleNamespace(
+        package=package,
+        ui=sys.modules[package + ".ui"],
+        helper=sys.modules[package + ".esec_dxf_ifc_TI_helper"],
+        sensors=sys.modules[package + ".esec_sensor_plan_pro"],
+        version=".".join(map(str, sys.modules[package].bl_info["version"])),
+    )
+    # only warnings, the console output of the cases shouldn't be measured
+    sys.modules[package + ".logger"].set_level('WARNING')
+    return addon
+
+
+def run_case(addon, name, size, seed):
+    setup, function = CASES[name]
+    bpy.ops.wm.read_homefile(use_empty=True)
+    # the dry run only lists the matches, print_spaces_and_texts() doesn't touch the IFC file
+    bpy.context.scene.esec_dry_run = True
+    generate_floor(size, seed)
+    if setup:
+        setup(addon)
+
+    objects_before = len(bpy.data.objects)
+    start = time.perf_counter()
+    items = function(addon, size)
+    elapsed = time.perf_counter() - start
+    return {
+        "time": elapsed,
+        "items": items if isinstance(items, int) else size,
+        "objects_created": len(bpy.data.objects) - objects_before,
+    }
+
+
+def run_benchmark(addon, cases, sizes, repeat, seed):
+    results = []
+    for size in sizes:
+        for name in cases:
+            runs = [run_case(addon, name, size, seed) for _ in range(repeat)]
+            times = [run["time"] for run in runs]
+            result = {
+                "case": name,
+                "size": size,
+                "items": runs[0]["items"],
+                "objects_created": runs[0]["objects_created"],
+                "times": [round(t, 6) for t in times],
+                "min": round(min(times), 6),
+                "median": round(statistics.median(times), 6),
+            }
+            results.append(result)
+            print(f"{name:40s} {size:7d} objects  median {result['median']:9.4f}s  min {result['min']:9.4f}s")
+    return results
+
+
+def compare(results, previous_path):
+    with open(previous_path, "r") as file:
+        previous = {(result["case"], result["size"]): result for result in json.load(file)["results"]}
+    print(f"Compared to {previous_path}:")
+    for result in results:
+        if old := previous.get((result["case"], result["size"])):
+            ratio = result["median"] / old["median"] if old["median"] else float("inf")
+            print(f"{result['case']:40s} {result['size']:7d} objects  {old['median']:9.4f}s -> {result['median']:9.4f}s  x{ratio:.2f}")
+
+
+def parse_args(argv):
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(prog="blender --background --python tools/benchmark.py --")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="floor sizes in DXF objects")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case and size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json", help="JSON file for the results")
+    parser.add_argument("--compare", help="JSON file of an earlier run")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args(sys.argv)
+    addon = load_addon()
+    results = run_benchmark(addon, args.cases, args.sizes, args.repeat, args.seed)
+
+    data = {
+        "addon_version": addon.version,
+        "blender_version": bpy.app.version_string,
+        "platform": sys.platform,
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(data, file, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
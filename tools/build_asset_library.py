@@ -0,0 +1,100 @@
+# Build the linked furniture asset library from models_low / models_high.
+#
+# Usage (from the addon directory):
+#   blender --background --factory-startup --python tools/build_asset_library.py
+#
+# Every .obj is hashed, byte-identical files are imported only once and share one mesh.
+# The meshes are written to library/furniture_library.blend, the manifest maps every
+# model and level of detail to its mesh and records the sha256 of the source file.
+# At runtime model_cache links the mesh instead of parsing the .obj, as long as the
+# checksum of the .obj still matches the manifest. Re-run this script after changing a model.
+# The object rotation of the import is applied to the meshes, they are stored upright.
+
+import bpy
+import hashlib
+import json
+import os
+import sys
+
+ADDON_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ADDON_DIRECTORY)
+
+import config  # noqa: E402
+
+LODS = {
+    "low": config.MODELS_LOW_DIRECTORY,
+    "high": config.MODELS_HIGH_DIRECTORY,
+}
+
+PLACEHOLDER_MATERIAL = "ESEC_Furniture"
+
+
+def file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def import_mesh(path, mesh_name):
+    bpy.ops.object.select_all(action='DESELECT')
+    bpy.ops.wm.obj_import(filepath=path)
+    imported = list(bpy.context.selected_objects)
+    if not imported:
+        raise RuntimeError(f"nothing imported from {path}")
+
+    obj = imported[0]
+    mesh = obj.data
+    mesh.name = mesh_name
+    # only the mesh is written, bake the axis conversion of the import (a 90 degree X rotation)
+    # into it, the linked model gets a new object without rotation
+    mesh.transform(obj.matrix_world.to_3x3().to_4x4())
+    # the furniture gets its collection material on an object level slot at runtime,
+    # linked meshes are read-only, so every mesh needs at least one slot
+    if not mesh.materials:
+        mesh.materials.append(bpy.data.materials.get(PLACEHOLDER_MATERIAL) or bpy.data.materials.new(PLACEHOLDER_MATERIAL))
+
+    for imported_obj in imported:
+        bpy.data.objects.remove(imported_obj, do_unlink=True)
+    return mesh
+
+
+def build():
+    library_directory = os.path.join(ADDON_DIRECTORY, config.ASSET_LIBRARY_DIRECTORY)
+    os.makedirs(library_directory, exist_ok=True)
+
+    manifest = {"version": config.ASSET_LIBRARY_VERSION, "library": config.ASSET_LIBRARY_FILE, "models": {}, "meshes": {}}
+    meshes = {}
+
+    for lod, directory in LODS.items():
+        models = manifest["models"].setdefault(lod, {})
+        model_directory = os.path.join(ADDON_DIRECTORY, directory)
+        for file_name in sorted(os.listdir(model_directory)):
+            if not file_name.endswith(".obj"):
+                continue
+            path = os.path.join(model_directory, file_name)
+            checksum = file_sha256(path)
+            mesh_name = f"esec_{checksum[:16]}"
+
+            if checksum not in meshes:
+                print(f"Import {directory}/{file_name} as {mesh_name}")
+                meshes[checksum] = import_mesh(path, mesh_name)
+                manifest["meshes"][mesh_name] = {"sha256": checksum, "sources": []}
+            else:
+                print(f"Reuse {mesh_name} for {directory}/{file_name}")
+
+            manifest["meshes"][mesh_name]["sources"].append(f"{directory}/{file_name}")
+            models[os.path.splitext(file_name)[0]] = {"mesh": mesh_name, "sha256": checksum}
+
+    library_path = os.path.join(library_directory, config.ASSET_LIBRARY_FILE)
+    bpy.data.libraries.write(library_path, set(meshes.values()), fake_user=True, compress=True)
+
+    with open(os.path.join(library_directory, config.ASSET_LIBRARY_MANIFEST), "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+
+    print(f"Wrote {len(meshes)} meshes for {sum(len(m) for m in manifest['models'].values())} models to {library_path}")
+
+
+if __name__ == "__main__":
+    build()
@@ -0,0 +1,88 @@
+# Measure how long enabling the addon takes and fail if it exceeds the startup budget.
+#
+# Usage:
+#   blender --background --factory-startup --python-exit-code 1 --python tools/startup_budget.py -- --budget-ms 250
+#
+# Run it in a fresh Blender so the first enable includes importing the addon modules. The
+# script also fails if enabling the addon imports one of the heavy dependencies that must
+# only be loaded on first use inside the operators (BlenderBIM, requests).
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from batch_process import ADDON_DIRECTORY  # noqa: E402
+
+DEFAULT_BUDGET_MS = 250
+LAZY_MODULES = ["blenderbim", "requests"]
+
+
+def find_package():
+    import addon_utils
+
+    for module in addon_utils.modules():
+        if os.path.normcase(os.path.realpath(os.path.dirname(module.__file__))) == os.path.normcase(os.path.realpath(ADDON_DIRECTORY)):
+            return module.__name__
+    raise RuntimeError(f"The addon in {ADDON_DIRECTORY} is not installed in this Blender")
+
+
+def measure(package):
+    import addon_utils
+
+    if package in sys.modules:
+        raise RuntimeError(f"{package} is already loaded, run the script in a fresh Blender")
+    lazy_before = {name for name in LAZY_MODULES if name in sys.modules}
+
+    start = time.perf_counter()
+    module = addon_utils.enable(package, default_set=False)
+    cold = time.perf_counter() - start
+    if module is None:
+        raise RuntimeError(f"Enabling {package} failed, see the console output")
+
+    # unregister + register again without the imports
+    addon_utils.disable(package, default_set=False)
+    start = time.perf_counter()
+    addon_utils.enable(package, default_set=False)
+    warm = time.perf_counter() - start
+
+    return {
+        "package": package,
+        "cold_enable_ms": round(cold * 1000, 2),
+        "warm_enable_ms": round(warm * 1000, 2),
+        "eagerly_imported": sorted(name for name in LAZY_MODULES if name in sys.modules and name not in lazy_before),
+    }
+
+
+def parse_args(argv):
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(prog="blender --background --factory-startup --python tools/startup_budget.py --")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="allowed time for the first enable")
+    parser.add_argument("--output", help="JSON file for the measurement")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args(sys.argv)
+    result = measure(find_package())
+    result["budget_ms"] = args.budget_ms
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+
+    failures = []
+    if result["cold_enable_ms"] > args.budget_ms:
+        failures.append(f"enabling took {result['cold_enable_ms']:.1f} ms, the budget is {args.budget_ms:.1f} ms")
+    if result["eagerly_imported"]:
+        failures.append(f"enabling imported {', '.join(result['eagerly_imported'])}")
+    if failures:
+        raise SystemExit("Startup budget exceeded: " + "; ".join(failures))
+    print("Startup budget ok")
+
+
+if __name__ == "__main__":
+    main()
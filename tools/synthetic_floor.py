@@ -0,0 +1,170 @@
+# Generate a synthetic floor that looks like an imported Archilogic DXF + IFC pair.
+#
+# Usage:
+#   blender --background --python tools/synthetic_floor.py -- --objects 5000 --seed 1 --output floor.blend
+#
+# The DXF part are curve objects in the scene collection, named like the DXF importer names
+# them ("A-FURN|TaskChair_1a2b3c4d", "A-FURN|Desk_...", ...): rectangles for chairs, desks,
+# storage, ..., round tables, closets and objects without furniture keyword (walls, columns,
+# dimensions) that move_unwanted_objects() sorts out, plus room labels as text objects.
+# The IFC part is the IfcProject/None > ... > IfcBuildingStorey/Storey_0 collection tree with
+# IfcSpace, IfcSlab, IfcDoor and IfcWindow meshes. The floor is reproducible for a seed.
+
+import argparse
+import math
+import os
+import random
+import sys
+
+import bpy
+
+# (DXF name, share of the objects, width, depth, round)
+FURNITURE_KINDS = [
+    ("TaskChair", 0.22, 0.6, 0.6, False),
+    ("ConferenceChair", 0.06, 0.55, 0.55, False),
+    ("DiningChair", 0.04, 0.5, 0.5, False),
+    ("LoungeChair", 0.02, 0.8, 0.8, False),
+    ("BarStool", 0.02, 0.4, 0.4, False),
+    ("Desk", 0.18, 1.6, 0.8, False),
+    ("Table", 0.03, 2.4, 1.2, False),
+    ("Table", 0.02, 1.2, 1.2, True),
+    ("Sofa", 0.02, 2.0, 0.9, False),
+    ("CornerSofa", 0.01, 2.4, 2.4, False),
+    ("Storage", 0.05, 0.8, 0.4, False),
+    ("Sideboard", 0.03, 1.6, 0.45, False),
+    ("RollingContainer", 0.05, 0.43, 0.6, False),
+    ("Locker", 0.02, 0.5, 0.5, False),
+    ("Printer", 0.01, 0.6, 0.6, False),
+    ("Sink", 0.01, 0.5, 0.4, False),
+    ("Toilet", 0.01, 0.4, 0.7, False),
+    ("closets", 0.02, 1.2, 0.6, False),
+    # no furniture keyword, moved to dxf_orphan
+    ("Wall", 0.12, 4.0, 0.2, False),
+    ("Column", 0.03, 0.4, 0.4, False),
+    ("Dimension", 0.03, 3.0, 0.01, False),
+]
+
+ROUND_SEGMENTS = 32
+OBJECTS_PER_SPACE = 50
+SQUARE_METERS_PER_OBJECT = 4.0
+SPACE_LABEL_PREFIXES = ["A.", "B.", "C.", "D.", "E.", "F.", "G."]
+IFC_COLLECTIONS = ["IfcProject/None", "IfcSite/None", "IfcBuilding/None", "IfcBuildingStorey/Storey_0"]
+
+
+def _outline(width, depth, round_shape):
+    if round_shape:
+        radius = max(width, depth) / 2
+        return [(radius * math.cos(2 * math.pi * i / ROUND_SEGMENTS), radius * math.sin(2 * math.pi * i / ROUND_SEGMENTS))
+                for i in range(ROUND_SEGMENTS)]
+    x, y = width / 2, depth / 2
+    return [(-x, -y), (x, -y), (x, y), (-x, y)]
+
+
+def _new_curve_object(name, outline, location, rotation):
+    curve = bpy.data.curves.new(name, type='CURVE')
+    curve.dimensions = '2D'
+    spline = curve.splines.new('POLY')
+    spline.points.add(len(outline) - 1)
+    spline.points.foreach_set("co", [value for x, y in outline for value in (x, y, 0.0, 1.0)])
+    spline.use_cyclic_u = True
+    obj = bpy.data.objects.new(name, curve)
+    obj.location = location
+    obj.rotation_euler = (0.0, 0.0, rotation)
+    return obj
+
+
+def _unit_box_mesh(name):
+    mesh = bpy.data.meshes.get(name)
+    if mesh is None:
+        mesh = bpy.data.meshes.new(name)
+        corners = [(x, y, z) for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)]
+        faces = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+        mesh.from_pydata(corners, [], faces)
+    return mesh
+
+
+def _new_box_object(name, mesh, collection, location, scale):
+    obj = bpy.data.objects.new(name, mesh)
+    obj.location = location
+    obj.scale = scale
+    collection.objects.link(obj)
+    return obj
+
+
+def _ifc_storey_collection(scene):
+    parent = scene.collection
+    for name in IFC_COLLECTIONS:
+        collection = bpy.data.collections.get(name) or bpy.data.collections.new(name)
+        if collection.name not in parent.children:
+            parent.children.link(collection)
+        parent = collection
+    return parent
+
+
+def generate_floor(object_count, seed=0, scene=None):
+    """Add a synthetic floor with about object_count DXF objects to the scene, return a summary dict."""
+    scene = scene or bpy.context.scene
+    rng = random.Random(seed)
+
+    side = math.sqrt(object_count * SQUARE_METERS_PER_OBJECT)
+    spaces_per_row = max(2, round(math.sqrt(object_count / OBJECTS_PER_SPACE)))
+    space_size = side / spaces_per_row
+
+    # DXF furniture, scattered over the floor
+    weights = [kind[1] for kind in FURNITURE_KINDS]
+    for kind, _, width, depth, round_shape in rng.choices(FURNITURE_KINDS, weights, k=object_count):
+        name = f"A-FURN|{kind}_{rng.getrandbits(32):08x}"
+        location = (rng.uniform(0, side), rng.uniform(0, side), 0.0)
+        rotation = rng.choice((0.0, math.pi / 2, math.pi, rng.uniform(0, 2 * math.pi)))
+        scene.collection.objects.link(_new_curve_object(name, _outline(width, depth, round_shape), location, rotation))
+
+    # IFC storey with one space, one slab, doors and windows per room, DXF room label in the middle
+    storey = _ifc_storey_collection(scene)
+    space_mesh = _unit_box_mesh("synthetic_space")
+    element_mesh = _unit_box_mesh("synthetic_element")
+    space_count = 0
+    for row in range(spaces_per_row):
+        for column in range(spaces_per_row):
+            space_count += 1
+            center = ((column + 0.5) * space_size, (row + 0.5) * space_size)
+            _new_box_object(f"IfcSpace/Space_{space_count}", space_mesh, storey,
+                            (center[0], center[1], 1.5), (space_size, space_size, 3.0))
+            _new_box_object(f"IfcSlab/Floor_{space_count}", element_mesh, storey,
+                            (center[0], center[1], -0.1), (space_size, space_size, 0.2))
+            _new_box_object(f"IfcDoor/Door_{space_count}", element_mesh, storey,
+                            (center[0] - space_size / 2, center[1], 1.0), (0.1, 0.9, 2.0))
+            for window in range(2):
+                _new_box_object(f"IfcWindow/Window_{space_count}_{window}", element_mesh, storey,
+                                (center[0] + (window - 0.5) * space_size / 2, center[1] + space_size / 2, 1.5),
+                                (1.2, 0.1, 1.2))
+
+            text = bpy.data.curves.new(f"A-TEXT|Text_{space_count}", type='FONT')
+            text.body = f"{rng.choice(SPACE_LABEL_PREFIXES)}{space_count:02d}\nOffice"
+            text_obj = bpy.data.objects.new(text.name, text)
+            text_obj.location = (center[0], center[1], 0.0)
+            scene.collection.objects.link(text_obj)
+
+    return {
+        "objects": object_count,
+        "seed": seed,
+        "spaces": space_count,
+        "side": round(side, 3),
+    }
+
+
+def parse_args(argv):
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(prog="blender --background --python tools/synthetic_floor.py --")
+    parser.add_argument("--objects", type=int, default=1000, help="number of DXF objects (100 to 50000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help=".blend file to save the floor to")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv)
+    bpy.ops.wm.read_homefile(use_empty=True)
+    summary = generate_floor(args.objects, args.seed)
+    print(f"Generated {summary['objects']} objects in {summary['spaces']} spaces")
+    if args.output:
+        bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(args.output))
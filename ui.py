@@ -3,12 +3,21 @@ import os
 import math
 import os
 import re
-import inspect
 import bmesh
-import mathutils
 from mathutils import Vector
 from bpy.types import Panel
+from . import bl_info
 from . import config
+from . import model_cache
+from . import instrumentation
+from .logger import log, Progress
+from .space_matcher import SpaceTextMatcher
+from .name_index import NameIndex
+from . import ifc_rename
+from .primitives import ensure_collection, get_unit_cube_mesh, get_unit_cylinder_mesh, new_primitive_object
+from .footprints import detect_shape
+from .obb import fit_footprint_boxes
+from .dxf_index import DxfRule, KeywordMatcher, FURNITURE_RULES, build_dxf_index
 
 class ESEC_OT_OpenAddonPreferences_DXF(bpy.types.Operator):
     """Show instructions for enabling DXF Import"""
@@ -32,22 +41,9 @@ class ESEC_OT_OpenAddonPreferences_BIM(bpy.types.Operator):
         self.report({'INFO'}, "Go to Edit > Preferences > Add-ons and then click on install. Select the downloaded ZIP File. Then enable the Plugin.")
         return {'FINISHED'}
 
-def get_version_from_init():
-    # Get the directory containing the current script
-    current_dir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
-
-    # Construct the full path to the __init__.py file
-    init_file_path = os.path.join(current_dir, "__init__.py")
-
-    with open(init_file_path, "r") as file:
-        for line in file:
-            if match := re.search(r'"version": \((\d+), (\d+), (\d+)\)', line):
-                return '.'.join(match.groups())
-    return None
-
 # Panel class
 class ESEC_PT_panel(bpy.types.Panel):
-    bl_label = "ESEC 3D Floorplan Creator " + get_version_from_init()
+    bl_label = "ESEC 3D Floorplan Creator " + '.'.join(map(str, bl_info["version"]))
     bl_idname = "ESEC_PT_panel"
     bl_space_type = 'VIEW_3D'
     bl_region_type = 'UI'
@@ -116,6 +112,7 @@ class ESEC_PT_panel(bpy.types.Panel):
             row.prop(props, "show_settings", icon="TRIA_DOWN" if props.show_settings else "TRIA_RIGHT", emboss=False)
             if props.show_settings:
                 box.prop(context.scene, "use_high_poly_models")
+                box.prop(props, "furniture_placement")
                 box.prop(props, "table_height", text="Table Height")
                 box.prop(props, "chair_height", text="Chair Height")
                 box.prop(props, "stool_scale", text="Chairs Scale")
@@ -123,6 +120,7 @@ class ESEC_PT_panel(bpy.types.Panel):
                 box.prop(props, "sideboard_height", text="Sideboard Height")
                 box.prop(props, "desk_table_margin", text="Desk Table margin")   
                 box.prop(props, "meeting_table_margin", text="Meeting Table margin")
+            draw_pipeline_report(layout, props)
 
         layout.label(text="  stefan.knaak@e-shelter.io")            
 
@@ -156,9 +154,9 @@ class OBJECT_OT_DeleteIfcCollection(bpy.types.Operator):
         for collection_name in collections:
             if collection := bpy.data.collections.get(collection_name):
                 bpy.data.collections.remove(collection)
-                print(f"Deleted '{collection_name}' collection.")
+                log.info(f"Deleted '{collection_name}' collection.")
             else:
-                print(f"Collection '{collection_name}' not found.")
+                log.debug(f"Collection '{collection_name}' not found.")
 
         return {'FINISHED'}
 
@@ -175,9 +173,9 @@ class OBJECT_OT_DeleteDxfCollection(bpy.types.Operator):
         for collection_name in collections:
             if collection := bpy.data.collections.get(collection_name):
                 bpy.data.collections.remove(collection)
-                print(f"Deleted '{collection_name}' collection.")
+                log.info(f"Deleted '{collection_name}' collection.")
             else:
-                print(f"Collection '{collection_name}' not found.")
+                log.debug(f"Collection '{collection_name}' not found.")
 
         return {'FINISHED'}
 
@@ -193,9 +191,9 @@ class OBJECT_OT_DeleteFurnitureCollection(bpy.types.Operator):
         for collection_name in collections:
             if collection := bpy.data.collections.get(collection_name):
                 bpy.data.collections.remove(collection)
-                print(f"Deleted '{collection_name}' collection.")
+                log.info(f"Deleted '{collection_name}' collection.")
             else:
-                print(f"Collection '{collection_name}' not found.")
+                log.debug(f"Collection '{collection_name}' not found.")
 
         return {'FINISHED'}
 
@@ -212,14 +210,14 @@ class ESEC_OT_function_1(bpy.types.Operator):
 
     def execute(self, context):
         #function_1(self, context)
-        print("Step 1 - prepare DXF")
+        log.info("Step 1 - prepare DXF")
         move_to_closets_collection()
         convert_splines_to_meshes_in_closets()
         create_faces_in_closets_meshes()
         move_objects_to_dxf()
         move_unwanted_objects("dxf")
         rename_objects_dxf("dxf")
-        print("Step 1 done")        
+        log.info("Step 1 done")        
         return {'FINISHED'}
 
 class ESEC_OT_function_2(bpy.types.Operator):
@@ -233,13 +231,13 @@ class ESEC_OT_function_2(bpy.types.Operator):
         return 'IfcProject/None' in bpy.data.collections
 
     def execute(self, context):
-        print("Step 2 - prepare IFC")
+        log.info("Step 2 - prepare IFC")
         move_objects_to_ifc()
         remove_collection("IfcProject/None")
         move_objects_to_new_collection("IfcSlab/Floor", "ifc", "Floors")  
         move_objects_to_new_collection("IfcDoor/Door", "ifc", "Doors")
         move_objects_to_new_collection("IfcWindow/Window", "ifc", "Windows")  
-        print("Step 2 done")        
+        log.info("Step 2 done")        
         return {'FINISHED'}
 
 class ESEC_OT_function_3(bpy.types.Operator):
@@ -253,10 +251,10 @@ class ESEC_OT_function_3(bpy.types.Operator):
         return 'dxf' in bpy.data.collections
 
     def execute(self, context):
-        print("Step 3 - create tables")
+        log.info("Step 3 - create tables")
         #create_tabletops_from_dxf_collection()   
         create_tabletops_from_dxf_collection()
-        print("Step 3 done")
+        log.info("Step 3 done")
         return {'FINISHED'}
 
 class ESEC_OT_create_simple_chairs(bpy.types.Operator):
@@ -270,9 +268,9 @@ class ESEC_OT_create_simple_chairs(bpy.types.Operator):
         return 'dxf' in bpy.data.collections
 
     def execute(self, context):
-        print("Step 4 - create stools")
+        log.info("Step 4 - create stools")
         create_stools_from_dxf_collection()
-        print("Step 4 done")
+        log.info("Step 4 done")
         return {'FINISHED'}
     
 class ESEC_OT_create_3d_chairs(bpy.types.Operator):
@@ -286,9 +284,9 @@ class ESEC_OT_create_3d_chairs(bpy.types.Operator):
         return 'dxf' in bpy.data.collections
 
     def execute(self, context):
-        print("Create 3D Objects")
+        log.info("Create 3D Objects")
         create3D_Objects()
-        print("Create 3D Objects done")
+        log.info("Create 3D Objects done")
 
         return {'FINISHED'}
 
@@ -305,31 +303,69 @@ class ESEC_OT_function_5(bpy.types.Operator):
  
 
     def execute(self, context):
-        print("Rock'n'Roll")  
-
-        move_to_closets_collection()
-        convert_splines_to_meshes_in_closets()
-        create_faces_in_closets_meshes()
-        move_objects_to_dxf()
-        move_unwanted_objects("dxf")
-        rename_objects_dxf("dxf")
-        rename_parking_floors()
-        move_objects_to_ifc()
-        remove_collection("IfcProject/None")
-        move_objects_to_new_collection("IfcSlab/Floor", "ifc", "Floors")  
-        move_objects_to_new_collection("IfcDoor/Door", "ifc", "Doors")
-        move_objects_to_new_collection("IfcWindow/Window", "ifc", "Windows")
-        move_objects_to_new_collection("IfcSlab/Parking", "ifc", "Parking")                
-        create_tabletops_from_dxf_collection()
-        create3D_Objects()
-        # create_squares_from_dxf_collection('Storage', bpy.context.scene.esec_addon_props.storage_height)    
-        # create_squares_from_dxf_collection('Sideboard', bpy.context.scene.esec_addon_props.sideboard_height) 
-        # create_squares_from_dxf_collection('Genericsideboard', bpy.context.scene.esec_addon_props.sideboard_height) 
-        assign_collection_materials()
-        organize_collections() 
-        print("all done")        
+        log.info("Rock'n'Roll")  
+        report = run_pipeline(profile=context.scene.esec_addon_props.profile_pipeline)
+        log.info(f"all done in {report.wall_time:.2f}s")        
         return {'FINISHED'}
 
+def get_pipeline_steps():
+    # (step name, function) of 'Step 1-5 at once', the furniture steps share the dxf index
+    state = {}
+    return [
+        ("move_to_closets_collection", move_to_closets_collection),
+        ("convert_splines_to_meshes_in_closets", convert_splines_to_meshes_in_closets),
+        ("create_faces_in_closets_meshes", create_faces_in_closets_meshes),
+        ("move_objects_to_dxf", move_objects_to_dxf),
+        ("move_unwanted_objects", lambda: move_unwanted_objects("dxf")),
+        ("rename_objects_dxf", lambda: rename_objects_dxf("dxf")),
+        ("rename_parking_floors", rename_parking_floors),
+        ("move_objects_to_ifc", move_objects_to_ifc),
+        ("remove_collection IfcProject", lambda: remove_collection("IfcProject/None")),
+        ("move Floors", lambda: move_objects_to_new_collection("IfcSlab/Floor", "ifc", "Floors")),
+        ("move Doors", lambda: move_objects_to_new_collection("IfcDoor/Door", "ifc", "Doors")),
+        ("move Windows", lambda: move_objects_to_new_collection("IfcWindow/Window", "ifc", "Windows")),
+        ("move Parking", lambda: move_objects_to_new_collection("IfcSlab/Parking", "ifc", "Parking")),
+        # classify the dxf objects once for tables and all 3D objects
+        ("build_dxf_index", lambda: state.update(dxf_index=build_dxf_index("dxf"))),
+        ("create_tabletops_from_dxf_collection", lambda: create_tabletops_from_dxf_collection(state["dxf_index"])),
+        ("create3D_Objects", lambda: create3D_Objects(state["dxf_index"])),
+        ("assign_collection_materials", assign_collection_materials),
+        ("organize_collections", organize_collections),
+    ]
+
+def run_pipeline(profile=False, report_path=None):
+    # Run all steps, measure every step and write the report, also if a step fails.
+    # Doesn't depend on the UI context, tools/batch_process.py runs it in background mode.
+    report = instrumentation.PipelineReport("Step 1-5 at once", profile=profile, path=report_path)
+    try:
+        for name, function in get_pipeline_steps():
+            with report.step(name):
+                function()
+    finally:
+        report.write()
+    return report
+
+def draw_pipeline_report(layout, props):
+    box = layout.box()
+    row = box.row()
+    row.prop(props, "show_pipeline_report", icon="TRIA_DOWN" if props.show_pipeline_report else "TRIA_RIGHT", emboss=False)
+    if not props.show_pipeline_report:
+        return
+    box.prop(props, "profile_pipeline")
+    report = instrumentation.get_last_report()
+    if not report:
+        box.label(text="No report yet, run 'Step 1-5 at once'")
+        return
+    peak_memory = report.get("process_peak_memory_mb")
+    box.label(text=f"Total {report['wall_time']:.2f}s" + (f", process peak {peak_memory:.0f} MB" if peak_memory else ""))
+    column = box.column(align=True)
+    for step in report["steps"]:
+        row = column.row()
+        row.label(text=step["name"], icon='ERROR' if step.get("error") else 'NONE')
+        memory_delta = step.get("memory_delta_mb")
+        row.label(text=f"{step['wall_time']:.3f}s  +{step['objects_created']}/-{step['objects_deleted']}"
+                       + (f"  {memory_delta:+.0f} MB" if memory_delta is not None else ""))
+
 class ESEC_OT_close_holes_prepare(bpy.types.Operator):
     bl_idname = "esec.close_holes_prepare"
     bl_label = "Prepare"
@@ -341,12 +377,12 @@ class ESEC_OT_close_holes_prepare(bpy.types.Operator):
         return 'Floors' in bpy.data.collections
 
     def execute(self, context):
-        print("Prepare closing holes")
+        log.info("Prepare closing holes")
         close_holes_process_floors()
         close_holes_extrude_top_face()
         close_holes_apply_boolean_difference()
         close_holes_deactivate_rendering()
-        print("done prepare closing holes")
+        log.info("done prepare closing holes")
         return {'FINISHED'}
 
 class ESEC_OT_close_holes_finish(bpy.types.Operator):
@@ -359,9 +395,9 @@ class ESEC_OT_close_holes_finish(bpy.types.Operator):
         return 'floors_intersect' in bpy.data.collections
 
     def execute(self, context):
-        print("Finish closing holes")
+        log.info("Finish closing holes")
         close_holes_finish()   
-        print("done closing holes")
+        log.info("done closing holes")
         return {'FINISHED'}
 
 
@@ -449,6 +485,7 @@ class EsecSubmenu(bpy.types.Menu):
         layout.operator(OBJECT_OT_DeleteFurnitureCollection.bl_idname, icon="CANCEL")
         layout.operator("esec.create_simple_chairs", icon="OUTLINER_OB_POINTCLOUD")
         layout.operator("esec.organize_collections", icon="GRAPH")        
+        layout.operator("esec.clear_model_cache", icon="TRASH")
         layout.operator("esec.select_parking", icon="LATTICE_DATA")
         layout.operator("esec.prep_parking", icon="REMOVE")
 
@@ -470,6 +507,15 @@ class ESEC_OT_prep_parking(bpy.types.Operator):
         reduce_scale()
         return {'FINISHED'}
     
+class ESEC_OT_clear_model_cache(bpy.types.Operator):
+    bl_idname = "esec.clear_model_cache"
+    bl_label = "Clear Model Cache"
+    bl_description = "Drop the cached furniture models, they are imported again on the next run. Models still used by instances are kept for them."
+
+    def execute(self, context):
+        model_cache.invalidate()
+        return {'FINISHED'}
+
 class ESEC_OT_organize_collections(bpy.types.Operator):
     bl_idname = "esec.organize_collections"
     bl_label = "Organize Collections"
@@ -491,9 +537,9 @@ class ESEC_OT_create_storage(bpy.types.Operator):
         return 'dxf' in bpy.data.collections
 
     def execute(self, context):
-        print("Create Storage")
+        log.info("Create Storage")
         create_squares_from_dxf_collection('Storage', bpy.context.scene.esec_addon_props.storage_height)    
-        print("Create Storage done")
+        log.info("Create Storage done")
         return {'FINISHED'}
 
 class ESEC_OT_create_sideboard(bpy.types.Operator):
@@ -507,9 +553,9 @@ class ESEC_OT_create_sideboard(bpy.types.Operator):
         return 'dxf' in bpy.data.collections
 
     def execute(self, context):
-        print("Create sideboards")
+        log.info("Create sideboards")
         create_squares_from_dxf_collection('Sideboard', bpy.context.scene.esec_addon_props.sideboard_height)    
-        print("Create sideboards done")
+        log.info("Create sideboards done")
         return {'FINISHED'}
 
 
@@ -569,6 +615,7 @@ def register():  # sourcery skip: extract-method
     bpy.utils.register_class(ESEC_OT_render)
     bpy.utils.register_class(EsecExportKeyShotOperator)
     bpy.utils.register_class(ESEC_OT_organize_collections)
+    bpy.utils.register_class(ESEC_OT_clear_model_cache)
     bpy.utils.register_class(ESEC_OT_close_holes_prepare)
     bpy.utils.register_class(ESEC_OT_close_holes_finish)
     bpy.utils.register_class(ESEC_OT_select_parking)
@@ -613,6 +660,7 @@ def unregister():
     bpy.utils.unregister_class(ESEC_OT_render)
     bpy.utils.unregister_class(EsecExportKeyShotOperator)
     bpy.utils.unregister_class(ESEC_OT_organize_collections)
+    bpy.utils.unregister_class(ESEC_OT_clear_model_cache)
     bpy.utils.unregister_class(ESEC_OT_close_holes_prepare)
     bpy.utils.unregister_class(ESEC_OT_close_holes_finish)
     bpy.utils.unregister_class(ESEC_OT_select_parking)
@@ -626,30 +674,6 @@ def unregister():
         
 #######################################################################################
 
-def detect_shape(ob):
-    # Get the curve data from the object
-    curve = ob.data
-    
-    # Count the number of points in the first spline of the curve
-    num_points = len(curve.splines[0].bezier_points) if curve.splines[0].type == 'BEZIER' else len(curve.splines[0].points)
-    
-    # Basic shape detection based on point count
-    if num_points < 11:
-        return 'square', num_points
-    elif num_points > 10:
-        # Further refine the detection to check if it's a circle
-        # Calculate the distance from each point to the object's center
-        # If the distances are approximately equal, it's a circle
-        center = ob.location
-        if curve.splines[0].type == 'BEZIER':
-            distances = [((p.co.x - center.x)**2 + (p.co.y - center.y)**2)**0.5 for p in curve.splines[0].bezier_points]
-        else:
-            distances = [((p.co.x - center.x)**2 + (p.co.y - center.y)**2)**0.5 for p in curve.splines[0].points]
-        average_distance = sum(distances) / len(distances)
-        if all(math.isclose(d, average_distance, rel_tol=0.1) for d in distances):
-            return 'circle', num_points
-    return 'unknown', num_points
-
 def move_objects_to_dxf():
     # Create the 'dxf' collection if it doesn't exist
     if 'dxf' not in bpy.data.collections:
@@ -661,17 +685,20 @@ def move_objects_to_dxf():
     root_collection = bpy.context.scene.collection
 
     # Move all objects that are not collections from the root level to the 'dxf' collection
-    for obj in root_collection.objects:
-        if obj.type != 'EMPTY':  # Assuming collections are Empty objects with children
+    objects_to_move = [obj for obj in root_collection.objects if obj.type != 'EMPTY']  # Assuming collections are Empty objects with children
+    with Progress(len(objects_to_move)) as progress:
+        for obj in objects_to_move:
             root_collection.objects.unlink(obj)
             dxf_collection.objects.link(obj)
-            print(f"Moved '{obj.name}' to the 'dxf' collection.")
+            log.debug(f"Moved '{obj.name}' to the 'dxf' collection.")
+            progress.step()
+    log.info(f"Moved {len(objects_to_move)} objects to the 'dxf' collection.")
 
 
 def move_unwanted_objects(collection_name):
     source_collection = bpy.data.collections.get(collection_name)
     if not source_collection:
-        print(f"Collection '{collection_name}' not found.")
+        log.warning(f"Collection '{collection_name}' not found.")
         return
 
     # Create the target collection if it doesn't exist
@@ -679,39 +706,45 @@ def move_unwanted_objects(collection_name):
     if not orphan_collection:
         orphan_collection = bpy.data.collections.new(name='dxf_orphan')
         bpy.context.scene.collection.children.link(orphan_collection)
-        print("Created new collection: 'dxf_orphan'")
+        log.debug("Created new collection: 'dxf_orphan'")
 
-    allowed_keywords = ['desk', 'chair', 'sofa', 'table', 'storage', 'sideboard', 
+    allowed_keywords = KeywordMatcher(['desk', 'chair', 'sofa', 'table', 'storage', 'sideboard', 
                         'bed', 'stool', 'printer', 'bench', 'toilet', 'urinal', 'sink', 
                         'stair', 'ottoman', 'bank', 'parking', 'locker', 'rack', 'rollingcontainer'
-                        ]
+                        ])
     objects_to_move = [
         obj
         for obj in source_collection.objects
-        if all(keyword not in obj.name.lower() for keyword in allowed_keywords)
+        if not allowed_keywords.search(obj.name)
     ]
     # Move objects
-    for obj in objects_to_move:
-        # Unlink from the source collection
-        source_collection.objects.unlink(obj)
-        # Link to the target collection
-        orphan_collection.objects.link(obj)
-        print(f"Moved object: {obj.name}")
+    with Progress(len(objects_to_move)) as progress:
+        for obj in objects_to_move:
+            # Unlink from the source collection
+            source_collection.objects.unlink(obj)
+            # Link to the target collection
+            orphan_collection.objects.link(obj)
+            log.debug(f"Moved object: {obj.name}")
+            progress.step()
 
     # Hide the orphan collection
     orphan_collection.hide_viewport = True
-    print("Collection 'dxf_orphan' is now hidden.")
+    log.info(f"Moved {len(objects_to_move)} unwanted objects to the hidden 'dxf_orphan' collection, "
+             f"kept {len(source_collection.objects)}.")
 
 def rename_objects_dxf(collection_name):
     collection = bpy.data.collections.get(collection_name)
     if not collection:
-        print(f"Collection '{collection_name}' not found.")
+        log.warning(f"Collection '{collection_name}' not found.")
         return
 
-    for obj in collection.objects:
-        new_name = obj.name.split("|")[-1].split("_")[0]
-        obj.name = new_name
-        print(f"Renamed object to: {obj.name}")
+    with Progress(len(collection.objects)) as progress:
+        for obj in collection.objects:
+            new_name = obj.name.split("|")[-1].split("_")[0]
+            obj.name = new_name
+            log.debug(f"Renamed object to: {obj.name}")
+            progress.step()
+    log.info(f"Renamed {len(collection.objects)} objects in '{collection_name}'.")
 
 def move_objects_to_ifc():
     # Create the 'ifc' collection if it doesn't exist
@@ -729,29 +762,33 @@ def move_objects_to_ifc():
         if collection_name in current_collection.children:
             current_collection = current_collection.children[collection_name]
         else:
-            print(f"Collection '{collection_name}' not found.")
+            log.warning(f"Collection '{collection_name}' not found.")
             return
 
     # Move all objects from the nested collection to the 'ifc' collection
-    for obj in current_collection.objects:
-        current_collection.objects.unlink(obj)
-        ifc_collection.objects.link(obj)
-        print(f"Moved '{obj.name}' to the 'ifc' collection.")
+    objects_to_move = list(current_collection.objects)
+    with Progress(len(objects_to_move)) as progress:
+        for obj in objects_to_move:
+            current_collection.objects.unlink(obj)
+            ifc_collection.objects.link(obj)
+            log.debug(f"Moved '{obj.name}' to the 'ifc' collection.")
+            progress.step()
+    log.info(f"Moved {len(objects_to_move)} objects to the 'ifc' collection.")
 
 def remove_collection(collection_name):
     collection = bpy.data.collections.get(collection_name)
     if not collection:
-        print(f"Collection '{collection_name}' not found.")
+        log.warning(f"Collection '{collection_name}' not found.")
         return
 
     bpy.data.collections.remove(collection)
-    print(f"Removed collection: {collection_name}")
+    log.info(f"Removed collection: {collection_name}")
 
 
 def move_window_objects_to_collection(collection_name, new_collection_name):
     source_collection = bpy.data.collections.get(collection_name)
     if not source_collection:
-        print(f"Collection '{collection_name}' not found.")
+        log.warning(f"Collection '{collection_name}' not found.")
         return
 
     # Get or create the target collection
@@ -771,13 +808,14 @@ def move_window_objects_to_collection(collection_name, new_collection_name):
         if obj := bpy.data.objects.get(obj_name):
             source_collection.objects.unlink(obj)
             target_collection.objects.link(obj)
-            print(f"Moved object: {obj_name} to collection: {new_collection_name}")
+            log.debug(f"Moved object: {obj_name} to collection: {new_collection_name}")
+    log.info(f"Moved {len(objects_to_move)} windows to collection: {new_collection_name}")
 
 
 def move_objects_to_new_collection(keyword, collection_name, new_collection_name):
     source_collection = bpy.data.collections.get(collection_name)
     if not source_collection:
-        print(f"Collection '{collection_name}' not found.")
+        log.warning(f"Collection '{collection_name}' not found.")
         return
 
     # Get or create the target collection
@@ -787,20 +825,22 @@ def move_objects_to_new_collection(keyword, collection_name, new_collection_name
         bpy.context.scene.collection.children.link(target_collection)
 
     objects_to_move = [
-        obj.name for obj in source_collection.objects if keyword in obj.name
+        obj for obj in source_collection.objects if keyword in obj.name
     ]
     # Move objects
-    for obj_name in objects_to_move:
-        if obj := bpy.data.objects.get(obj_name):
+    with Progress(len(objects_to_move)) as progress:
+        for obj in objects_to_move:
             source_collection.objects.unlink(obj)
             target_collection.objects.link(obj)
-            print(f"Moved object: {obj_name} to collection: {new_collection_name}") 
+            log.debug(f"Moved object: {obj.name} to collection: {new_collection_name}")
+            progress.step()
+    log.info(f"Moved {len(objects_to_move)} '{keyword}' objects to collection: {new_collection_name}")
 
 
 def remove_window_objects(collection_name):
     collection = bpy.data.collections.get(collection_name)
     if not collection:
-        print(f"Collection '{collection_name}' not found.")
+        log.warning(f"Collection '{collection_name}' not found.")
         return
 
     keywords = ['Window', 'window']
@@ -813,63 +853,51 @@ def remove_window_objects(collection_name):
     for obj_name in objects_to_remove:
         if obj := bpy.data.objects.get(obj_name):
             bpy.data.objects.remove(obj, do_unlink=True)
-            print(f"Removed object: {obj_name}")
-
-def create_tabletop_square_from_object(obj,table_type):
-    # Apply the inverse rotation to each point of the object to align it with the world axes
-    inv_rot = obj.rotation_euler.to_matrix().inverted()
-
-    local_coords = []
-    for spline in obj.data.splines:
-        if spline.type == 'BEZIER':
-            local_coords.extend(obj.matrix_world @ (inv_rot @ Vector(point.co[:3])) for point in spline.bezier_points)
-        elif spline.type == 'POLY':
-            local_coords.extend(obj.matrix_world @ (inv_rot @ Vector(point.co[:3])) for point in spline.points)
-
-    if not local_coords:
-        print(f"No points found in object {obj.name}")
+            log.debug(f"Removed object: {obj_name}")
+    log.info(f"Removed {len(objects_to_remove)} windows from '{collection_name}'.")
+
+def get_footprint_box(obj, box=None):
+    # Minimum-area oriented box of the spline points, fitted in batches by the callers
+    if box is None:
+        box = fit_footprint_boxes([obj])[0]
+    if not box['valid']:
+        log.debug(f"No points found in object {obj.name}")
+        return None
+    return box
+
+def get_box_transform(obj, box, z):
+    # Location at the box center and rotation of the box around Z
+    location = obj.location.copy()
+    location.x, location.y = box['center']
+    location.z = z
+    rotation = (0.0, 0.0, float(box['rotation']))
+    return location, rotation
+
+def create_tabletop_square_from_object(obj,table_type, box=None):
+    box = get_footprint_box(obj, box)
+    if box is None:
         return
-
-    # Calculate the bounding box dimensions in local space
-    #bbox_dimensions = Vector((max(coord[i] for coord in local_coords) - min(coord[i] for coord in local_coords) for i in range(3)))
-
-    # Calculate the dimensions directly from the transformed vertices
-    width = max(v.x for v in local_coords) - min(v.x for v in local_coords)
-    depth = max(v.y for v in local_coords) - min(v.y for v in local_coords)
+    width, depth = float(box['width']), float(box['depth'])
     
     height = bpy.context.scene.esec_addon_props.table_height
-    bpy.ops.mesh.primitive_cube_add(size=1)
-    table_top = bpy.context.active_object
-    print(f"Create Table for {obj.name}")
-    table_top.name = obj.name + "_TableTop"
+    log.debug(f"Create Table for {obj.name}")
 
     # Set the scale of the table_top based on the directly calculated dimensions
+    scale = (1.0, 1.0, 1.0)
     match table_type:
         case "desk":
-            table_top.scale.x = width - bpy.context.scene.esec_addon_props.desk_table_margin
-            table_top.scale.y = depth - bpy.context.scene.esec_addon_props.desk_table_margin
-            table_top.scale.z = 0.025
+            margin = bpy.context.scene.esec_addon_props.desk_table_margin
+            scale = (width - margin, depth - margin, 0.025)
         case "table":
-            table_top.scale.x = width - bpy.context.scene.esec_addon_props.meeting_table_margin
-            table_top.scale.y = depth - bpy.context.scene.esec_addon_props.meeting_table_margin
-            table_top.scale.z = 0.025
+            margin = bpy.context.scene.esec_addon_props.meeting_table_margin
+            scale = (width - margin, depth - margin, 0.025)
 
-    table_top.location = obj.location
-    table_top.location.z = height - 0.025 / 2
+    location, rotation = get_box_transform(obj, box, height - 0.025 / 2)
 
-    # Now you can apply the original rotation of the object to the table_top
-    table_top.rotation_euler = obj.rotation_euler     
-    
-    # Ensure the 'furniture' collection exists
-    furniture_collection = bpy.data.collections.get("tables")
-    if not furniture_collection:
-        furniture_collection = bpy.data.collections.new("tables")
-        bpy.context.scene.collection.children.link(furniture_collection)
-
-    # Link the new table object to the 'furniture' collection and unlink it from the current collection
-    current_collection = table_top.users_collection[0]
-    current_collection.objects.unlink(table_top)
-    furniture_collection.objects.link(table_top)    
+    # Create the table_top from the shared cube of the 'tables' collection, oriented like the footprint
+    furniture_collection = ensure_collection("tables")
+    new_primitive_object(obj.name + "_TableTop", get_unit_cube_mesh("tables"), furniture_collection,
+                         location, rotation, scale)
 
 def create_tabletop_rounds_from_object(obj):
     # Calculate the bounding box dimensions for the object
@@ -879,47 +907,40 @@ def create_tabletop_rounds_from_object(obj):
     width, depth, _ = bbox_dimensions
     radius = max(width, depth) / 2  # Use the longer dimension as diameter
     height = bpy.context.scene.esec_addon_props.table_height
-    bpy.ops.mesh.primitive_cylinder_add(radius=radius, depth=0.025)
-    table_top = bpy.context.active_object
-    table_top.name = obj.name + "_TableTop"
 
-    table_top.location = obj.location
-    table_top.location.z = height - 0.025 / 2
+    location = obj.location.copy()
+    location.z = height - 0.025 / 2
 
-    # Ensure the 'furniture' collection exists
-    furniture_collection = bpy.data.collections.get("tables")
-    if not furniture_collection:
-        furniture_collection = bpy.data.collections.new("tables")
-        bpy.context.scene.collection.children.link(furniture_collection)
+    # Create the table_top from the shared unit cylinder of the 'tables' collection
+    furniture_collection = ensure_collection("tables")
+    new_primitive_object(obj.name + "_TableTop", get_unit_cylinder_mesh("tables"), furniture_collection,
+                         location, scale=(radius, radius, 0.025))
 
-    # Link the new table object to the 'furniture' collection and unlink it from the current collection
-    current_collection = table_top.users_collection[0]
-    current_collection.objects.unlink(table_top)
-    furniture_collection.objects.link(table_top)
-
-def create_tabletops_from_dxf_collection():
-    print("create_tabletops_from_dxf_collection_2")
-    if dxf_collection := bpy.data.collections.get("dxf"):
-        for obj in dxf_collection.objects:
-            obj_name = obj.name.lower()
-
-            if "desk" in obj_name:
-                create_table(obj,"desk")
-            if "table" in obj_name:
-                create_table(obj,"table")
-            else:
-                print("no desk or table in obj.name")
-    else:
-        print("Collection 'dxf' not found.")
+def create_tabletops_from_dxf_collection(dxf_index=None):
+    if dxf_index is None:
+        dxf_index = build_dxf_index("dxf")
+    if dxf_index is None:
+        log.warning("Collection 'dxf' not found.")
+        return
 
-def create_table(dxf_object,table_type):
+    for table_type in ("desk", "table"):
+        # fit the footprints of all curves of this type at once
+        curve_objects = [obj for obj in dxf_index.bucket(table_type) if obj.type == 'CURVE']
+        boxes = fit_footprint_boxes(curve_objects)
+        with Progress(len(curve_objects)) as progress:
+            for obj, box in zip(curve_objects, boxes):
+                create_table(obj, table_type, box)
+                progress.step()
+        log.info(f"Created {len(curve_objects)} {table_type} tops.")
+
+def create_table(dxf_object,table_type, box=None):
     if dxf_object.type == 'CURVE':
         shape, num_points = detect_shape(dxf_object)
         if shape == 'square':
-            #print(f"square: {obj.name} - Shape: {shape} - Points: {num_points}")
-            create_tabletop_square_from_object(dxf_object,table_type)
+            #log.debug(f"square: {obj.name} - Shape: {shape} - Points: {num_points}")
+            create_tabletop_square_from_object(dxf_object,table_type, box)
         else:
-            #print(f"circle: {obj.name} - Shape: {shape} - Points: {num_points}")    
+            #log.debug(f"circle: {obj.name} - Shape: {shape} - Points: {num_points}")    
             create_tabletop_rounds_from_object(dxf_object)    
 
 def create_stool_from_object(obj, furniture_collection):
@@ -927,202 +948,169 @@ def create_stool_from_object(obj, furniture_collection):
     height = bpy.context.scene.esec_addon_props.chair_height
     #height = 0.45
     stool_scale = bpy.context.scene.esec_addon_props.stool_scale
-    bpy.ops.mesh.primitive_cylinder_add(vertices=32, radius=(width/4) * stool_scale, depth=0.05, location=(0, 0, 0))
-    stool_top = bpy.context.active_object
-    stool_top.name = obj.name + "_StoolTop"
-    stool_top.location = obj.location
-    stool_top.location.z = height - 0.05/2    
-    
-    
-    # Ensure the 'furniture' collection exists
-    furniture_collection = bpy.data.collections.get("chairs")
-    if not furniture_collection:
-        furniture_collection = bpy.data.collections.new("chairs")
-        bpy.context.scene.collection.children.link(furniture_collection)
+    radius = (width/4) * stool_scale
 
-    # Link the new stool object to the 'furniture' collection and unlink it from the current collection
-    current_collection = stool_top.users_collection[0]
-    current_collection.objects.unlink(stool_top)
-    furniture_collection.objects.link(stool_top)    
+    location = obj.location.copy()
+    location.z = height - 0.05/2    
 
+    # Create the stool from the shared unit cylinder of the 'chairs' collection
+    furniture_collection = ensure_collection("chairs")
+    new_primitive_object(obj.name + "_StoolTop", get_unit_cylinder_mesh("chairs", vertices=32), furniture_collection,
+                         location, scale=(radius, radius, 0.05))
 
-def create_stools_from_dxf_collection():
-    if dxf_collection := bpy.data.collections.get("dxf"):
-        # Create a new collection called "furniture" if it doesn't exist
-        furniture_collection = bpy.data.collections.get("chairs")
-        if not furniture_collection:
-            furniture_collection = bpy.data.collections.new("chairs")
-            bpy.context.scene.collection.children.link(furniture_collection)
 
-        for obj in dxf_collection.objects:
-            if "chair" in obj.name or "Chair" in obj.name:
-                create_stool_from_object(obj, furniture_collection)
-    else:
-        print("Collection 'dxf' not found.")
-
-#########################################
+def create_stools_from_dxf_collection(dxf_index=None):
+    if dxf_index is None:
+        dxf_index = build_dxf_index("dxf")
+    if dxf_index is None:
+        log.warning("Collection 'dxf' not found.")
+        return
 
-def create_squares_from_dxf_collection(needle, scaleZ):
-    if dxf_collection := bpy.data.collections.get("dxf"):
-        for obj in dxf_collection.objects:
-            if needle in obj.name:
-                create_squares_from_dxf_object(obj, needle, scaleZ)
-    else:
-        print("Collection 'dxf' not found.")
+    # Create a new collection called "furniture" if it doesn't exist
+    furniture_collection = bpy.data.collections.get("chairs")
+    if not furniture_collection:
+        furniture_collection = bpy.data.collections.new("chairs")
+        bpy.context.scene.collection.children.link(furniture_collection)
 
-def create_squares_from_dxf_object(obj, needle, scaleZ):
-    # Apply the inverse rotation to each point of the object to align it with the world axes
-    inv_rot = obj.rotation_euler.to_matrix().inverted()
+    stools = dxf_index.bucket("stool")
+    for obj in stools:
+        create_stool_from_object(obj, furniture_collection)
+    log.info(f"Created {len(stools)} stools.")
 
-    local_coords = []
-    for spline in obj.data.splines:
-        if spline.type == 'BEZIER':
-            local_coords.extend(obj.matrix_world @ (inv_rot @ Vector(point.co[:3])) for point in spline.bezier_points)
-        elif spline.type == 'POLY':
-            local_coords.extend(obj.matrix_world @ (inv_rot @ Vector(point.co[:3])) for point in spline.points)
+#########################################
 
-    if not local_coords:
-        print(f"No points found in object {obj.name}")
+def get_box_bucket(needle, dxf_index=None):
+    # Boxes are matched case-sensitive and written to a collection named like the needle
+    rule = DxfRule(needle, (needle,), collection_name=needle, case_sensitive=True)
+    if dxf_index is None or dxf_index.rule(needle) != rule:
+        dxf_index = build_dxf_index("dxf", [rule])
+    if dxf_index is None:
+        log.warning("Collection 'dxf' not found.")
+        return []
+    return dxf_index.bucket(needle)
+
+def create_squares_from_dxf_collection(needle, scaleZ, dxf_index=None):
+    objects = get_box_bucket(needle, dxf_index)
+    boxes = fit_footprint_boxes(objects)
+    skipped = 0
+    for obj, box in zip(objects, boxes):
+        if not box['valid']:
+            log.debug(f"No points found in object {obj.name}")
+            skipped += 1
+            continue
+        create_squares_from_dxf_object(obj, needle, scaleZ, box)
+    log.info(f"Created {len(objects) - skipped} {needle} squares, skipped {skipped} without points.")
+
+def create_squares_from_dxf_object(obj, needle, scaleZ, box=None):
+    box = get_footprint_box(obj, box)
+    if box is None:
         return
-
-    # Calculate the dimensions directly from the transformed vertices
-    width = max(v.x for v in local_coords) - min(v.x for v in local_coords)
-    depth = max(v.y for v in local_coords) - min(v.y for v in local_coords)
+    width, depth = float(box['width']), float(box['depth'])
     
     height = scaleZ
-    bpy.ops.mesh.primitive_cube_add(size=1)
-    new_square = bpy.context.active_object
-    print(f"Create square for {obj.name}")
-    new_square.name = obj.name 
-
-    # Set the scale of the table_top based on the directly calculated dimensions
-    new_square.scale.x = width 
-    new_square.scale.y = depth 
-    new_square.scale.z = 0.025
-
-    new_square.location = obj.location
-    new_square.location.z = height #- 0.025 / 2
+    log.debug(f"Create square for {obj.name}")
 
-    # Now you can apply the original rotation of the object to the table_top
-    new_square.rotation_euler = obj.rotation_euler     
-    
-    # Ensure the 'furniture' collection exists
-    furniture_collection = bpy.data.collections.get(needle)
-    if not furniture_collection:
-        furniture_collection = bpy.data.collections.new(needle)
-        bpy.context.scene.collection.children.link(furniture_collection)
+    location, rotation = get_box_transform(obj, box, height) #- 0.025 / 2
 
-    # Link the new table object to the 'furniture' collection and unlink it from the current collection
-    current_collection = new_square.users_collection[0]
-    current_collection.objects.unlink(new_square)
-    furniture_collection.objects.link(new_square)    
+    # Create the square from the shared cube of the needle collection, oriented like the footprint
+    furniture_collection = ensure_collection(needle)
+    new_primitive_object(obj.name, get_unit_cube_mesh(needle), furniture_collection,
+                         location, rotation, (width, depth, 0.025))
 
 #################################################################################################################
 #########################################
 
-def create_full_squares_from_dxf_collection(needle, loc_z, scale_z):
-    if dxf_collection := bpy.data.collections.get("dxf"):
-        for obj in dxf_collection.objects:
-            if needle in obj.name:
-                create_full_squares_from_dxf_object(obj, needle, loc_z, scale_z)
-    else:
-        print("Collection 'dxf' not found.")
-
-def create_full_squares_from_dxf_object(obj, needle, loc_z, scale_z):
-    # Apply the inverse rotation to each point of the object to align it with the world axes
-    inv_rot = obj.rotation_euler.to_matrix().inverted()
-
-    local_coords = []
-    for spline in obj.data.splines:
-        if spline.type == 'BEZIER':
-            local_coords.extend(obj.matrix_world @ (inv_rot @ Vector(point.co[:3])) for point in spline.bezier_points)
-        elif spline.type == 'POLY':
-            local_coords.extend(obj.matrix_world @ (inv_rot @ Vector(point.co[:3])) for point in spline.points)
-
-    if not local_coords:
-        print(f"No points found in object {obj.name}")
+def create_full_squares_from_dxf_collection(needle, loc_z, scale_z, dxf_index=None):
+    objects = get_box_bucket(needle, dxf_index)
+    boxes = fit_footprint_boxes(objects)
+    skipped = 0
+    for obj, box in zip(objects, boxes):
+        if not box['valid']:
+            log.debug(f"No points found in object {obj.name}")
+            skipped += 1
+            continue
+        create_full_squares_from_dxf_object(obj, needle, loc_z, scale_z, box)
+    log.info(f"Created {len(objects) - skipped} {needle} boxes, skipped {skipped} without points.")
+
+def create_full_squares_from_dxf_object(obj, needle, loc_z, scale_z, box=None):
+    box = get_footprint_box(obj, box)
+    if box is None:
         return
-
-    # Calculate the dimensions directly from the transformed vertices
-    width = max(v.x for v in local_coords) - min(v.x for v in local_coords)
-    depth = max(v.y for v in local_coords) - min(v.y for v in local_coords)
+    width, depth = float(box['width']), float(box['depth'])
     
     height = loc_z
-    bpy.ops.mesh.primitive_cube_add(size=1)
-    new_square = bpy.context.active_object
-    print(f"Create square for {obj.name}")
-    new_square.name = obj.name 
+    log.debug(f"Create square for {obj.name}")
 
-    # Set the scale of the table_top based on the directly calculated dimensions
-    new_square.scale.x = width 
-    new_square.scale.y = depth 
-    new_square.scale.z = scale_z
+    location, rotation = get_box_transform(obj, box, height) #- 0.025 / 2
 
-    new_square.location = obj.location
-    new_square.location.z = height #- 0.025 / 2
-
-    # Now you can apply the original rotation of the object to the table_top
-    new_square.rotation_euler = obj.rotation_euler     
-    
-    # Ensure the 'furniture' collection exists
-    furniture_collection = bpy.data.collections.get(needle)
-    if not furniture_collection:
-        furniture_collection = bpy.data.collections.new(needle)
-        bpy.context.scene.collection.children.link(furniture_collection)
-
-    # Link the new table object to the 'furniture' collection and unlink it from the current collection
-    current_collection = new_square.users_collection[0]
-    current_collection.objects.unlink(new_square)
-    furniture_collection.objects.link(new_square)    
+    # Create the box from the shared cube of the needle collection, oriented like the footprint
+    furniture_collection = ensure_collection(needle)
+    new_primitive_object(obj.name, get_unit_cube_mesh(needle), furniture_collection,
+                         location, rotation, (width, depth, scale_z))
 
 #################################################################################################################
 
-def create_3Dobject_from_dxf_collection(needles, model_name, new_collection_name, ignoreKeyword=None):
+def create_3Dobject_from_dxf_collection(needles, model_name, new_collection_name, ignoreKeyword=None, dxf_index=None):
     
     # Convert single string needle to list for compatibility
     if isinstance(needles, str):
         needles = [needles]
 
-    if bpy.context.scene.use_high_poly_models:
-        strDirectory = os.path.join(os.path.dirname(__file__), config.MODELS_HIGH_DIRECTORY)        
-    else:
-        strDirectory = os.path.join(os.path.dirname(__file__), config.MODELS_LOW_DIRECTORY)        
-
-    file_loc = os.path.join(strDirectory, model_name + ".obj")
+    # Read the bucket from the classification index, build a single-rule index for ad-hoc calls
+    rule = DxfRule(model_name, tuple(needles), model_name, new_collection_name, ignoreKeyword)
+    if dxf_index is None or dxf_index.rule(model_name) != rule:
+        dxf_index = build_dxf_index("dxf", [rule])
+    if dxf_index is None:
+        log.warning("Collection 'dxf' not found.")
+        return
 
-    # Check if the file exists
-    if not os.path.isfile(file_loc):
-        print(f"Error: {file_loc} does not exist.")
-        print(f"strDirectory: {strDirectory} does not exist.")
+    # Nothing to place, skip the model import
+    dxf_objects = dxf_index.bucket(model_name)
+    if not dxf_objects:
         return
 
-    #imported_object = bpy.ops.import_scene.obj(filepath=file_loc)
-    imported_object = bpy.ops.wm.obj_import(filepath=file_loc)
-    selected_obj = bpy.context.selected_objects[0]
+    # The model is imported once and kept in the hidden library for later calls and runs
+    prototype_collection = model_cache.get_prototype(model_name, bpy.context.scene.use_high_poly_models)
+    if prototype_collection is None:
+        return
+    prototype = prototype_collection.objects[0]
 
     collection_to_write = bpy.data.collections.get(new_collection_name)
     if not collection_to_write:
         collection_to_write = bpy.data.collections.new(new_collection_name)
         bpy.context.scene.collection.children.link(collection_to_write)       
 
-    if dxf_collection := bpy.data.collections.get("dxf"):
-        for obj in dxf_collection.objects:
-            for needle in needles:
-                if needle.lower() in obj.name.lower():  
-                    if ignoreKeyword and ignoreKeyword.lower() in obj.name.lower():
-                        continue  # skip this object and go to the next
-                    create_3d_object_from_dxf_object(obj,selected_obj.copy(),collection_to_write)
-    else:
-        print("Collection 'dxf' not found.")
+    if bpy.context.scene.esec_addon_props.furniture_placement == 'INSTANCE':
+        # Instances of the hidden prototype
+        with Progress(len(dxf_objects)) as progress:
+            for obj in dxf_objects:
+                create_3d_instance_from_dxf_object(obj, model_name, prototype_collection, collection_to_write)
+                progress.step()
+        log.info(f"Created {len(dxf_objects)} {model_name} instances in '{new_collection_name}'.")
+        return
 
-    #cleanup first imported model from 0 0 0 position
-    bpy.data.objects.remove(selected_obj, do_unlink=True)
+    with Progress(len(dxf_objects)) as progress:
+        for obj in dxf_objects:
+            create_3d_object_from_dxf_object(obj,prototype.copy(),collection_to_write)
+            progress.step()
+    log.info(f"Created {len(dxf_objects)} {model_name} objects in '{new_collection_name}'.")
 
 def create_3d_object_from_dxf_object(dxf_obj,obj_model, collection_to_add_to):
-    print('create_chair_from_dxf_object: dxf_obj.location: ', dxf_obj.location)
+    log.debug(f"create_3d_object_from_dxf_object: {dxf_obj.name} at {tuple(dxf_obj.location)}")
     obj_model.location = dxf_obj.location
     obj_model.rotation_euler[2] = dxf_obj.rotation_euler[2]
     collection_to_add_to.objects.link(obj_model)
+
+def create_3d_instance_from_dxf_object(dxf_obj, model_name, prototype_collection, collection_to_add_to):
+    log.debug(f"create_3d_instance_from_dxf_object: {dxf_obj.name} at {tuple(dxf_obj.location)}")
+    instance = bpy.data.objects.new(model_name, None)
+    instance.instance_type = 'COLLECTION'
+    instance.instance_collection = prototype_collection
+    instance.empty_display_size = 0.25
+    instance.location = dxf_obj.location
+    # the prototype keeps the axis rotation of the import, the instance only turns it around Z
+    instance.rotation_euler[2] = dxf_obj.rotation_euler[2]
+    collection_to_add_to.objects.link(instance)
     
 
 ######################################################################################################
@@ -1132,7 +1120,7 @@ def count_objects_in_collection(collection_name):
     collection = bpy.data.collections.get(collection_name)
 
     if not collection:
-        print(f"No collection named {collection_name}")
+        log.warning(f"No collection named {collection_name}")
         return
 
     # We'll use a dictionary to count the objects
@@ -1149,7 +1137,7 @@ def count_objects_in_collection(collection_name):
                 object_count[base_name] += 1
 
     for name, count in object_count.items():
-        print(f"{count}x {name}")
+        log.info(f"{count}x {name}")
 
 
 def create_glass_material():
@@ -1196,7 +1184,7 @@ def create_material(material_name, base_color, specular, roughness):
     # Set roughness
     principled_bsdf.inputs['Roughness'].default_value = roughness
     
-    print(f"Created material: {material_name}")
+    log.debug(f"Created material: {material_name}")
     return material
 
 #color helper
@@ -1241,9 +1229,11 @@ def convert_srgb_to_linear_rgb(srgb_color_component: float) -> float:
 
 def assign_collection_materials():
     # Remove all materials
-    print("Remove all materials")
-    for material in bpy.data.materials:
-        bpy.data.materials.remove(material)
+    log.info("Remove all materials")
+    for material in list(bpy.data.materials):
+        # materials of the linked furniture library are read-only
+        if not material.library:
+            bpy.data.materials.remove(material)
 
     #custom materials
     create_material("Floor_pale_dark_blue", hex_color_to_rgba("E0E9F2"), 0, 0.1)
@@ -1276,24 +1266,47 @@ def assign_collection_materials():
 
     # Assign materials to collections
     for coll in bpy.data.collections:
+        if coll.name.startswith(config.PROTOTYPE_COLLECTION_PREFIX) or coll.name == config.LIBRARY_COLLECTION_NAME:
+            # prototypes get the material of the collection their instances are in
+            continue
         if coll.name in materials:
             material = materials[coll.name]
         else:
             material = bpy.data.materials.new(name=coll.name)
             material.diffuse_color = (0.8, 0.8, 0.8, 1.0)  # Light gray color
         
-        # Assign material to each object in the collection
+        # Assign material to each object in the collection, shared meshes only once
+        assigned_meshes = set()
         for obj in coll.objects:
-            if obj.type == 'MESH':
-                obj.data.materials.clear()
-                obj.data.materials.append(material)
+            if obj.type == 'EMPTY' and obj.instance_type == 'COLLECTION' and obj.instance_collection:
+                # furniture instances get the material on their prototype meshes
+                mesh_objects = [proto for proto in obj.instance_collection.objects if proto.type == 'MESH']
+            elif obj.type == 'MESH':
+                mesh_objects = [obj]
+            else:
+                continue
+            for mesh_obj in mesh_objects:
+                assign_material(mesh_obj, material, assigned_meshes)
+
+def assign_material(obj, material, assigned_meshes):
+    mesh = obj.data
+    if mesh.library:
+        # meshes linked from the furniture library are read-only, use the object slots
+        for slot in obj.material_slots:
+            slot.link = 'OBJECT'
+            slot.material = material
+        return
+    if mesh.as_pointer() not in assigned_meshes:
+        mesh.materials.clear()
+        mesh.materials.append(material)
+        assigned_meshes.add(mesh.as_pointer())
 
 def hide_collection(collection_name):
     if collection := bpy.data.collections.get(collection_name):
         collection.hide_viewport = True
         collection.hide_render = True
     else:
-        print(f"Collection '{collection_name}' not found.")
+        log.warning(f"Collection '{collection_name}' not found.")
 
 def setup_hdri():
     # Path to your HDRI image
@@ -1364,7 +1377,7 @@ def setup_camera():
     if 'ifc' in bpy.data.collections:
         ifc_collection = bpy.data.collections['ifc']
     else:
-        print("Collection 'ifc' does not exist in the scene.")
+        log.warning("Collection 'ifc' does not exist in the scene.")
         return
 
     # Create empty mesh and object
@@ -1423,34 +1436,30 @@ def setup_render():
     bpy.context.scene.cycles.device = 'GPU'
     
 
-def create3D_Objects():
-    print("Create 3d objects")
-    create_3Dobject_from_dxf_collection(['TaskChair', 'ConferenceChair', 'Genericofficechair'],'office_chair', 'Office_chairs')       
-    create_3Dobject_from_dxf_collection(['DiningChair', 'GenericChair'],'dining_chair', 'Dining_chairs')        
-    create_3Dobject_from_dxf_collection(['LoungeChair', 'Armchair'],'arm_chair', 'Arm_chairs', ignoreKeyword='Outdoor')
-    create_3Dobject_from_dxf_collection('BarStool','bar_stool', 'Bar_Stools')
-    create_3Dobject_from_dxf_collection('Printer','printer', 'printer')
-    create_3Dobject_from_dxf_collection('Sofa','couch_76x76x45_round', 'Sofas', ignoreKeyword='Corner')
-    create_3Dobject_from_dxf_collection('CornerSofa','couch_76x76x45_round_corner', 'Sofas')
-    create_3Dobject_from_dxf_collection('OutdoorBench','outdoor_bench', 'outdoor_bench')
-    create_3Dobject_from_dxf_collection(['OutdoorChair', 'OutdoorArmchair'],'outdoor_chair', 'outdoor_chair')
-    create_3Dobject_from_dxf_collection('Sink','sink', 'Bathroom')
-    create_3Dobject_from_dxf_collection('Toilet','toilet', 'Bathroom')
-    create_3Dobject_from_dxf_collection('Urinal','urinal', 'Bathroom')
-    create_3Dobject_from_dxf_collection('BumperSmallOttoman','pouf', 'Sofas')    
+def create3D_Objects(dxf_index=None):
+    log.info("Create 3d objects")
+    if dxf_index is None:
+        dxf_index = build_dxf_index("dxf")
+    if dxf_index is None:
+        log.warning("Collection 'dxf' not found.")
+        return
+
+    # office chairs, dining chairs, arm chairs, bar stools, printer, sofas, outdoor, bathroom, poufs
+    for rule in FURNITURE_RULES:
+        create_3Dobject_from_dxf_collection(list(rule.needles), rule.model_name, rule.collection_name, rule.ignore_keyword, dxf_index)
 
-    print("Create Storage")
-    create_full_squares_from_dxf_collection('Storage', 0.6, 1.2)  
+    log.info("Create Storage")
+    create_full_squares_from_dxf_collection('Storage', 0.6, 1.2, dxf_index)  
 
-    print("Create sideboards")
-    create_squares_from_dxf_collection('Sideboard', bpy.context.scene.esec_addon_props.sideboard_height)      
-    create_squares_from_dxf_collection('Genericsideboard', bpy.context.scene.esec_addon_props.sideboard_height)     
+    log.info("Create sideboards")
+    create_squares_from_dxf_collection('Sideboard', bpy.context.scene.esec_addon_props.sideboard_height, dxf_index)      
+    create_squares_from_dxf_collection('Genericsideboard', bpy.context.scene.esec_addon_props.sideboard_height, dxf_index)     
 
-    print("Create RollingContainer done")
-    create_full_squares_from_dxf_collection('RollingContainer', 0.32, 0.65)     
+    log.info("Create RollingContainer")
+    create_full_squares_from_dxf_collection('RollingContainer', 0.32, 0.65, dxf_index)     
 
-    print("Create Locker")    
-    create_full_squares_from_dxf_collection('Locker', 1, 2)     
+    log.info("Create Locker")    
+    create_full_squares_from_dxf_collection('Locker', 1, 2, dxf_index)     
 
 
 def render_scene(resolution_x, resolution_y):
@@ -1477,13 +1486,13 @@ def render_scene(resolution_x, resolution_y):
     if 'Camera' in bpy.data.objects:
         bpy.context.scene.camera = bpy.data.objects['Camera']
     else:
-        print("No camera found in the scene.")
+        log.warning("No camera found in the scene.")
         return
 
-    print("Start rendering to" + str(bpy.context.scene.render.filepath))
+    log.info(f"Start rendering to {bpy.context.scene.render.filepath}")
     # Render the scene
     bpy.ops.render.render(write_still=True)
-    print("Finish renderer")
+    log.info("Finish renderer")
 
 
 
@@ -1508,71 +1517,47 @@ def convert_splines_to_meshes_in_closets():
     # Get the 'closets' collection
     closets_collection = bpy.data.collections.get("closets")
     if closets_collection is None:
-        print("No 'closets' collection found.")
+        log.warning("No 'closets' collection found.")
         return
 
-    # Deselect all objects
-    bpy.ops.object.select_all(action='DESELECT')
-
-    # Loop through objects in the 'closets' collection
-    for obj in closets_collection.objects:
-        if obj.type == 'CURVE':
-            # Select the object
-            obj.select_set(True)
-
-            # Set the active object (required for the conversion operation)
-            bpy.context.view_layer.objects.active = obj
-
-            # Convert the spline object to a mesh
-            bpy.ops.object.convert(target='MESH')
-
-            # Deselect the object
-            obj.select_set(False)
+    # Convert through the data API, works without selection, active object or a UI (batch mode)
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    curves = [obj for obj in closets_collection.objects if obj.type == 'CURVE']
+    for obj in curves:
+        name = obj.name
+        mesh = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph))
+        mesh_obj = bpy.data.objects.new(name + "_mesh", mesh)
+        mesh_obj.matrix_world = obj.matrix_world
+        for coll in obj.users_collection:
+            coll.objects.link(mesh_obj)
+
+        # Replace the curve object, the mesh object takes over its name
+        curve = obj.data
+        bpy.data.objects.remove(obj, do_unlink=True)
+        if not curve.users:
+            bpy.data.curves.remove(curve)
+        mesh.name = name
+        mesh_obj.name = name
+    log.info(f"Converted {len(curves)} closets to meshes.")
             
             
 def create_faces_in_closets_meshes():
     # Get the 'closets' collection
     closets_collection = bpy.data.collections.get("closets")
     if closets_collection is None:
-        print("No 'closets' collection found.")
+        log.warning("No 'closets' collection found.")
         return
 
-    # Save the original context
-    original_area = bpy.context.area.type
-    bpy.context.area.type = 'VIEW_3D'
-
-    # Deselect all objects
-    bpy.ops.object.select_all(action='DESELECT')
-
-    # Loop through objects in the 'closets' collection
-    for obj in closets_collection.objects:
-        if obj.type == 'MESH':
-            # Select the object
-            obj.select_set(True)
-
-            # Set the active object (required for the edit mode operations)
-            bpy.context.view_layer.objects.active = obj
-
-            # Switch to edit mode
-            bpy.ops.object.mode_set(mode='EDIT')
-
-            # Select all vertices
-            bpy.ops.mesh.select_all(action='SELECT')
-
-            # Create a new edge/face from vertices
-            bpy.ops.mesh.edge_face_add()
-
-            # Extrude on Z axis by 1.8 units
-            bpy.ops.transform.translate(value=(0, 0, 0))
-
-            # Switch back to object mode
-            bpy.ops.object.mode_set(mode='OBJECT')
-
-            # Deselect the object
-            obj.select_set(False)
-
-    # Restore the original context
-    bpy.context.area.type = original_area
+    # Fill the outlines with bmesh, like edge_face_add on all vertices in edit mode but without a 3D view
+    meshes = {obj.data for obj in closets_collection.objects if obj.type == 'MESH'}
+    for mesh in meshes:
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        bmesh.ops.contextual_create(bm, geom=bm.verts[:] + bm.edges[:])
+        bm.to_mesh(mesh)
+        bm.free()
+        mesh.update()
+    log.info(f"Created faces in {len(meshes)} closet meshes.")
 
 
 def organize_collections():
@@ -1658,7 +1643,7 @@ def close_holes_process_floors():
     
     # Check if 'Floors' collection exists
     if floors_collection is None:
-        print("Collection 'Floors' not found.")
+        log.warning("Collection 'Floors' not found.")
         return
 
     # Copy each object from 'Floors' collection to the new collection
@@ -1695,7 +1680,7 @@ def close_holes_process_floors():
         plane.scale = floors_intersect.scale
         plane.dimensions = floors_intersect.dimensions
     else:
-        print("Object 'Floors_combined' not found.")
+        log.warning("Object 'Floors_combined' not found.")
 
 #process_floors()
 
@@ -1703,12 +1688,12 @@ def close_holes_extrude_top_face():
     # Get the object named "Plan" from the "floors_intersect" collection
     floors_intersect_collection = bpy.data.collections.get("floors_intersect")
     if floors_intersect_collection is None:
-        print("Collection 'floors_intersect' not found.")
+        log.warning("Collection 'floors_intersect' not found.")
         return
 
     plan_object = floors_intersect_collection.objects.get("Floors_Intersect")
     if plan_object is None:
-        print("Object 'Plane' not found.")
+        log.warning("Object 'Plane' not found.")
         return
     
     # Set the "Floors_Intersect" object as the active object
@@ -1739,19 +1724,19 @@ def close_holes_apply_boolean_difference():
     # Get the collection
     floors_intersect_collection = bpy.data.collections.get("floors_intersect")
     if floors_intersect_collection is None:
-        print("Collection 'floors_intersect' not found.")
+        log.warning("Collection 'floors_intersect' not found.")
         return
 
     # Get the Plane object
     plane_object = floors_intersect_collection.objects.get("Floors_Intersect")
     if plane_object is None:
-        print("Object 'Floors_Intersect' not found.")
+        log.warning("Object 'Floors_Intersect' not found.")
         return
 
     # Get the floors_intersect object
     floors_combined_object = floors_intersect_collection.objects.get("Floors_combined")
     if floors_combined_object is None:
-        print("Object 'Floors_combined' not found.")
+        log.warning("Object 'Floors_combined' not found.")
         return
 
     # Add a boolean modifier to the Plane object
@@ -1775,7 +1760,7 @@ def close_holes_deactivate_rendering():
         if collection is not None:
             collection.hide_viewport = True
         else:
-            print(f"Collection '{collection_name}' not found.")
+            log.warning(f"Collection '{collection_name}' not found.")
 
     # Deactivate boolean modifiers for viewport rendering in 'Floors_Intersect'
     object_name = "Floors_Intersect"
@@ -1785,7 +1770,7 @@ def close_holes_deactivate_rendering():
             if mod.type == 'BOOLEAN':
                 mod.show_viewport = False
     else:
-        print(f"Object '{object_name}' not found.")
+        log.warning(f"Object '{object_name}' not found.")
 
 
 def close_holes_finish():
@@ -1798,7 +1783,7 @@ def close_holes_finish():
         if collection is not None:
             collection.hide_viewport = False
         else:
-            print(f"Collection '{collection_name}' not found.")
+            log.warning(f"Collection '{collection_name}' not found.")
 
     # Object to hide in the viewport
     object_name = "Floors_combined"
@@ -1806,7 +1791,7 @@ def close_holes_finish():
     if obj is not None:
         obj.hide_viewport = True
     else:
-        print(f"Object '{object_name}' not found.")
+        log.warning(f"Object '{object_name}' not found.")
 
     # Activate and apply boolean modifiers for viewport rendering in 'Floors_Intersect'
     object_name = "Floors_Intersect"
@@ -1818,7 +1803,7 @@ def close_holes_finish():
                 mod.show_viewport = True
                 bpy.ops.object.modifier_apply({"object": obj}, modifier=mod.name)
     else:
-        print(f"Object '{object_name}' not found.")
+        log.warning(f"Object '{object_name}' not found.")
 
     # Assign material "floors" to 'Floors_Intersect'
     floors_material = bpy.data.materials.get("Floors")
@@ -1831,7 +1816,7 @@ def close_holes_finish():
                 # no slots
                 obj.data.materials.append(floors_material)
     else:
-        print("Material 'Floors' not found.")
+        log.warning("Material 'Floors' not found.")
 
 ##############################
 # parking lots
@@ -1858,28 +1843,13 @@ def sort_spaces_numerically(space_object):
     number = re.search(r'\d+', space_object.name)
     return int(number.group(0)) if number else 0
 
-def get_bounding_box(obj):
-    bbox_min = [min(obj.bound_box[i][j] for i in range(8)) for j in range(3)]
-    bbox_max = [max(obj.bound_box[i][j] for i in range(8)) for j in range(3)]
-    return bbox_min, bbox_max
-
-def is_text_inside_space(text_obj, space_obj):
-    text_pos = text_obj.matrix_world.translation
-    bbox_corners = [mathutils.Vector(corner) for corner in space_obj.bound_box]
-    bbox_world_corners = [space_obj.matrix_world @ corner for corner in bbox_corners]
-
-    bbox_min = [min(corner[i] for corner in bbox_world_corners) for i in range(3)]
-    bbox_max = [max(corner[i] for corner in bbox_world_corners) for i in range(3)]
-
-    return bbox_min[0] <= text_pos[0] <= bbox_max[0] and bbox_min[1] <= text_pos[1] <= bbox_max[1]
-
 
 def rename_parking_floors():
     space_replacements = {}
     ifc_project_none = bpy.data.collections.get('IfcProject/None')
 
     if ifc_project_none is None:
-        print("IfcProject/None collection not found.")
+        log.warning("IfcProject/None collection not found.")
         return
 
     space_objects = []
@@ -1895,34 +1865,19 @@ def rename_parking_floors():
 
     total_texts_found = 0
 
-    for space in sorted_space_objects:
-        bbox_min, bbox_max = get_bounding_box(space)
-        x_length = bbox_max[0] - bbox_min[0]
-        y_length = bbox_max[1] - bbox_min[1]
-        size = x_length * y_length
-
-        #space_output = f"{space.name} - X length: {x_length:.2f}, Y length: {y_length:.2f}, Size: {size:.2f}"
+    # clean every text and locate every space once, each space only tests the texts nearby
+    matcher = SpaceTextMatcher(sorted_space_objects, text_objects, keywords)
+    for space, texts_found, matching_text in matcher.matches():
         space_output = f"{space.name} - "
 
-        texts_found = 0
-        matching_text = ""
-
-        for text_obj in text_objects:
-            cleaned_text = re.sub(r'[^A-Za-z0-9\s.]', '', text_obj.data.body.replace('\n', ' '))
-            cleaned_text = re.sub(r'\s{2,}', ' ', cleaned_text)  # Remove multiple consecutive whitespaces
-
-            if any(keyword in cleaned_text for keyword in keywords) and is_text_inside_space(text_obj, space):
-                texts_found += 1
-                matching_text = cleaned_text
-
         if texts_found == 1:
             space_output += f"{matching_text}"
-            print(space_output)
+            log.debug(space_output)
             total_texts_found += 1
             space_replacements[space.name] = matching_text
 
-    print(f"Total number of IFC spaces: {len(sorted_space_objects)}")
-    print(f"Total number of texts found in spaces: {total_texts_found}")
+    log.info(f"Total number of IFC spaces: {len(sorted_space_objects)}")
+    log.info(f"Total number of texts found in spaces: {total_texts_found}")
 
     replace_space_names_in_ifc(space_replacements)
           
@@ -1930,21 +1885,19 @@ def rename_parking_floors():
     return space_replacements
 
 def replace_space_names_in_ifc(space_replacements):
-    
-    #space_replacements
+    # rename the IFC elements and their objects together, resolved from the slab objects
+    renamed, space_replacements = ifc_rename.rename_objects(space_replacements, 'Floor_')
+
+    # objects without IFC element, index the 'Floor_' objects by the name after the last '/' once
+    floors = NameIndex('Floor_') if space_replacements else None
     for space_name, new_space_name in space_replacements.items():
         space_name_without_prefix = space_name.replace("IfcSlab/", "")
-        print(f"found {space_name_without_prefix} - {new_space_name}")
-        
-        #ifc
-        for obj in bpy.data.objects:
-            # Make sure the object is an IfcSpace                    
-            old_name = obj.name.split('/')[-1]  # Get the last part of the name after '/'
-            # Check if the name follows the expected format
-            if old_name.startswith('Floor_'):                                        
-                if old_name == space_name_without_prefix :            
-                    print("rename " + old_name + " to " + new_space_name)
-                    obj.name = obj.name.replace(old_name, new_space_name)    
+        log.debug(f"found {space_name_without_prefix} - {new_space_name}")
+
+        for obj in floors.rename(space_name_without_prefix, new_space_name):
+            log.debug("rename " + space_name_without_prefix + " to " + new_space_name)
+            renamed += 1
+    log.info(f"Renamed {renamed} floors.")
    
 
 def select_objects_from_collection(collection_name, parent_name=None):
@@ -1955,7 +1908,7 @@ def select_objects_from_collection(collection_name, parent_name=None):
     if parent_name:
         parent_col = bpy.data.collections.get(parent_name)
         if not parent_col:
-            print(f"No collection found with the name {parent_name}.")
+            log.warning(f"No collection found with the name {parent_name}.")
             return
         # Get the nested collection from the parent collection
         target_col = parent_col.children.get(collection_name)
@@ -1968,7 +1921,7 @@ def select_objects_from_collection(collection_name, parent_name=None):
         for obj in target_col.objects:
             obj.select_set(True)
     else:
-        print(f"No collection found with the name {collection_name}.")
+        log.warning(f"No collection found with the name {collection_name}.")
 
 
 